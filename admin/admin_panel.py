@@ -3,7 +3,11 @@ from admin.manage_students import ManageStudents
 from admin.manage_teachers import ManageTeachers  # Import the ManageTeachers class
 from admin.make_announcements import MakeAnnouncements
 from admin.subject_manager import SubjectManager
+from background import BackgroundLoader, show_skeleton
+from global_search import GlobalSearch
+from announcement_feed import AnnouncementFeed
 import sqlite3  # Used for database operations
+from database import connect_db, fetch_announcements_page
 
 
 class AdminPanel(ctk.CTk):
@@ -13,6 +17,9 @@ class AdminPanel(ctk.CTk):
         self.geometry("1920x1080")
         self.configure(bg="#1e1e1e")  # Set background color
 
+        # Runs dashboard queries off the Tk thread
+        self.loader = BackgroundLoader(self)
+
         # Sidebar
         self.sidebar = ctk.CTkFrame(self, corner_radius=15, bg_color="#2e2e2e", width=200, height=1080)
         self.sidebar.place(x=10, y=10)
@@ -21,6 +28,7 @@ class AdminPanel(ctk.CTk):
 
         buttons = [
             ("📊 Dashboard", self.show_dashboard),
+            ("🔎 Search", self.show_search),
             ("📅Manage Students", self.manage_students),
             ("📅Manage Teachers", self.manage_teachers),
             ("📝Manage Subjects", self.manage_subjects),
@@ -40,12 +48,14 @@ class AdminPanel(ctk.CTk):
         self.show_dashboard()
 
     def clear_main_area(self):
+        # Drop any load still running for the page we are leaving
+        self.loader.cancel_all()
         for widget in self.main_area.winfo_children():
             widget.destroy()
 
     def get_counts(self):
         """Fetch the count of students, teachers, and admins from the database."""
-        connection = sqlite3.connect("edutrack.db")  # Connects to your database
+        connection = connect_db()  # Connects to your database
         cursor = connection.cursor()
         try:
             # Query to get student count
@@ -70,24 +80,12 @@ class AdminPanel(ctk.CTk):
         return student_count, teacher_count, admin_count
 
     def get_announcements(self):
-        """Fetch announcements from the database."""
-        connection = sqlite3.connect("edutrack.db")  # Connects to your database
-        cursor = connection.cursor()
+        """Fetch the first page of the announcements feed; the rest loads as it is scrolled."""
         try:
-            # Query to fetch all announcements, ordered by the newest first
-            cursor.execute("""
-                SELECT announcement_text, created_at 
-                FROM announcements 
-                ORDER BY created_at DESC
-            """)
-            announcements = cursor.fetchall()  # Returns a list of tuples (announcement_text, created_at)
+            return fetch_announcements_page()
         except sqlite3.Error as e:
-            announcements = [("Error fetching announcements", "")]
             print(f"Database error: {e}")
-        finally:
-            connection.close()
-
-        return announcements
+            return [(None, "Error fetching announcements", "")], None
 
     def create_stat_card(self, parent, title, count, x, y, color):
         """Helper function to create a larger statistics card."""
@@ -98,20 +96,31 @@ class AdminPanel(ctk.CTk):
 
     def create_announcements_section(self, parent, announcements, x, y):
         """Helper function to create a scrollable announcements section."""
-        announcements_frame = ctk.CTkScrollableFrame(parent, width=1000, height=250, corner_radius=15, bg_color="#2e2e2e")
+        announcements_frame = ctk.CTkFrame(parent, width=1000, height=290, corner_radius=15, bg_color="#2e2e2e")
         announcements_frame.place(x=x, y=y)
+        announcements_frame.pack_propagate(False)
 
         ctk.CTkLabel(announcements_frame, text="Announcements", font=("Arial", 18, "bold"), text_color="white").pack(pady=10)
 
-        for announcement_text, created_at in announcements:
-            announcement_frame = ctk.CTkFrame(announcements_frame, width=950, height=50, corner_radius=15, bg_color="#393939")
-            announcement_frame.pack(pady=5, padx=10, fill="x")
-
-            ctk.CTkLabel(announcement_frame, text=announcement_text, font=("Arial", 14), text_color="white").pack(side="left", padx=10)
-            ctk.CTkLabel(announcement_frame, text=created_at, font=("Arial", 12), text_color="#aaaaaa").pack(side="right", padx=10)
+        # announcements is the feed's first page; older ones load as the list is scrolled
+        AnnouncementFeed(
+            announcements_frame, row_height=60, first_page=announcements, wraplength=900, fg_color="transparent"
+        ).pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
     def show_dashboard(self):
         self.clear_main_area()
+        show_skeleton(self.main_area)
+
+        # Fetch counts and announcements in the background
+        self.loader.submit(
+            lambda: (self.get_counts(), self.get_announcements()),
+            self.render_dashboard,
+            lambda error: print(f"Failed to load dashboard: {error}"),
+        )
+
+    def render_dashboard(self, data):
+        (student_count, teacher_count, admin_count), announcements = data
+        self.clear_main_area()
 
         # Center the title
         title_label = ctk.CTkLabel(
@@ -123,16 +132,12 @@ class AdminPanel(ctk.CTk):
         )
         title_label.place(x=600, y=30, anchor="center")  # Centered at the top of the main area
 
-        # Fetch counts
-        student_count, teacher_count, admin_count = self.get_counts()
-
         # Place the statistic cards statically and center them
         self.create_stat_card(self.main_area, "Total Students", student_count, 150, 150, "#00aaff")
         self.create_stat_card(self.main_area, "Total Teachers", teacher_count, 550, 150, "#00ff00")
         self.create_stat_card(self.main_area, "Total Admins", admin_count, 950, 150, "#ff4500")
 
-        # Fetch and display announcements
-        announcements = self.get_announcements()
+        # Display announcements
         self.create_announcements_section(self.main_area, announcements, x=100, y=400)
 
     def manage_students(self):
@@ -151,6 +156,12 @@ class AdminPanel(ctk.CTk):
         self.clear_main_area()
         MakeAnnouncements(self.main_area)
 
+    def show_search(self):
+        self.clear_main_area()
+        search = GlobalSearch(self.main_area, width=1200, height=700)
+        search.place(x=0, y=0, relwidth=1, relheight=1)
+        search.entry.focus_set()
+
     def show_settings(self):
         self.clear_main_area()
         ctk.CTkLabel(self.main_area, text="Settings (Coming Soon)", font=("Arial", 20), text_color="white").place(x=180, y=250)
@@ -1,5 +1,7 @@
 import customtkinter as ctk
-import sqlite3
+from database import connect_db
+from announcement_feed import AnnouncementFeed
+import change_feed
 from tkinter import messagebox
 
 
@@ -28,13 +30,9 @@ class MakeAnnouncements(ctk.CTkFrame):
         self.post_button = ctk.CTkButton(self, text="Post Announcement", command=self.post_announcement, width=200)
         self.post_button.pack(pady=10)
 
-        # Announcement Display Bar
-        self.announcement_listbox = ctk.CTkTextbox(self, height=300, width=600, font=("Calibri", 18))  # Increased font size to 12
-        self.announcement_listbox.pack(pady=20, padx=20)
-        self.announcement_listbox.configure(state="disabled")  # Make it read-only
-
-        # Load existing announcements
-        self.load_announcements()
+        # Announcement Display Bar; loads a page at a time as it is scrolled, newest first
+        self.announcement_feed = AnnouncementFeed(self, height=300, width=600, font=("Calibri", 18))
+        self.announcement_feed.pack(pady=20, padx=20)
 
     def set_placeholder(self, event=None):
         """Set placeholder text in the announcement entry."""
@@ -59,7 +57,7 @@ class MakeAnnouncements(ctk.CTkFrame):
 
         try:
             # Save the announcement to the database
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO announcements (announcement_text)
@@ -71,31 +69,11 @@ class MakeAnnouncements(ctk.CTkFrame):
             messagebox.showinfo("Success", "Announcement posted successfully.")
             self.announcement_entry.delete("1.0", "end")  # Clear the textbox
             self.set_placeholder()  # Reset placeholder
-            self.load_announcements()  # Refresh the announcements list
+            # The feed picks the new announcement up from the change log; no reload
+            change_feed.poll_now(self)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to post announcement: {str(e)}")
 
     def load_announcements(self):
-        # Clear the listbox
-        self.announcement_listbox.configure(state="normal")  # Enable writing to clear the listbox
-        self.announcement_listbox.delete("1.0", "end")
-
-        try:
-            # Fetch all announcements from the database
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, announcement_text, created_at
-                FROM announcements
-                ORDER BY created_at DESC
-            """)
-            announcements = cursor.fetchall()
-            conn.close()
-
-            # Display announcements in the listbox
-            for announcement in announcements:
-                self.announcement_listbox.insert("end", f"ID: {announcement[0]} | Date: {announcement[2]}\n{announcement[1]}\n{'-' * 80}\n")
-            self.announcement_listbox.configure(state="disabled")  # Make it read-only again
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load announcements: {str(e)}")
-            self.announcement_listbox.configure(state="disabled")  # Make it read-only again
\ No newline at end of file
+        # Start the feed again from the newest announcement; older pages load as it is scrolled
+        self.announcement_feed.reload()
@@ -1,13 +1,27 @@
 import customtkinter as ctk
 import sqlite3
+from background import BackgroundLoader
+from database import connect_db
+from virtual_list import VirtualList
 from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk
+from PIL import ImageTk
+from thumbnails import get_thumbnail, make_thumbnails
+
+
+def fetch_students():
+    """Every student row, for the list at the bottom of the page."""
+    conn = connect_db()
+    try:
+        return conn.execute("SELECT * FROM students").fetchall()
+    finally:
+        conn.close()
 
 
 class ManageStudents(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent)
         self.pack(fill="both", expand=True)
+        self.loader = BackgroundLoader(self)  # The student list is queried off the Tk thread
         self.create_widgets()
 
     def create_widgets(self):
@@ -29,8 +43,20 @@ class ManageStudents(ctk.CTkFrame):
         self.delete_student_widgets(self.delete_student_tab)  # Add widgets to delete student tab
 
         # --- Student List (Database Bar) ---
-        self.student_listbox = ctk.CTkTextbox(self, height=200, width=1000)  # Adjusted width for better alignment
+        # Only the visible rows are built, so long student lists stay cheap to show and scroll
+        self.student_listbox = VirtualList(
+            self, self.make_student_row, self.bind_student_row, row_height=28, height=200, width=1000
+        )
         self.student_listbox.pack(pady=20, padx=40, fill="x")  # Positioned at the bottom, spans width
+        self.load_students()
+
+    def make_student_row(self, parent):
+        label = ctk.CTkLabel(parent, text="", anchor="w")
+        label.pack(fill="both", expand=True, padx=10)
+        return label
+
+    def bind_student_row(self, label, row, index):
+        label.configure(text=f"ID: {row[0]} | Name: {row[1]} | Roll: {row[2]} | Email: {row[3]} | Phone: {row[4]} | Course: {row[5]} | Semester: {row[6]}")
 
     def create_student_widgets(self, tab):
         # --- Left Side: Entry Fields ---
@@ -89,8 +115,14 @@ class ManageStudents(ctk.CTkFrame):
     def upload_photo(self):
         file_path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.png *.jpeg")])
         if file_path:
+            try:
+                # Render every thumbnail size now so screens never decode the original
+                make_thumbnails(file_path)
+                img = get_thumbnail(file_path, "preview")
+            except OSError as e:
+                messagebox.showerror("Invalid Photo", f"Could not read the image: {e}")
+                return
             self.photo_path = file_path
-            img = Image.open(file_path).resize((100, 100))
             photo = ImageTk.PhotoImage(img)
             self.photo_label.configure(image=photo, text="")
             self.photo_label.image = photo
@@ -112,7 +144,7 @@ class ManageStudents(ctk.CTkFrame):
             return
 
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO students (name, roll_number, email, phone, course, semester)
@@ -170,7 +202,7 @@ class ManageStudents(ctk.CTkFrame):
             return
 
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO users (username, password, role, student_id)
@@ -193,7 +225,7 @@ class ManageStudents(ctk.CTkFrame):
             return
 
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
 
             # Check if the input is a valid student_id or roll_number
@@ -213,12 +245,15 @@ class ManageStudents(ctk.CTkFrame):
             messagebox.showerror("Error", str(e))
 
     def load_students(self):
-        self.student_listbox.delete("0.0", "end")
-        conn = sqlite3.connect("edutrack.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM students")
-        rows = cursor.fetchall()
-        conn.close()
-
-        for row in rows:
-            self.student_listbox.insert("end", f"ID: {row[0]} | Name: {row[1]} | Roll: {row[2]} | Email: {row[3]} | Phone: {row[4]} | Course: {row[5]} | Semester: {row[6]}\n")
\ No newline at end of file
+        """Reload the student list in the background."""
+        self.loader.cancel_all()  # Only the latest list is shown
+        self.loader.submit(
+            fetch_students,
+            self.student_listbox.set_items,
+            lambda error: messagebox.showerror("Error", f"Failed to load students: {str(error)}"),
+        )
+
+    def destroy(self):
+        # Results arriving after the page is gone have nowhere to go
+        self.loader.cancel_all()
+        super().destroy()
@@ -1,13 +1,26 @@
 import customtkinter as ctk
 import sqlite3
+from background import BackgroundLoader
+from database import connect_db
 from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk
+from PIL import ImageTk
+from thumbnails import get_thumbnail, make_thumbnails
+
+
+def fetch_teachers():
+    """Every teacher row, for the list at the bottom of the page."""
+    conn = connect_db()
+    try:
+        return conn.execute("SELECT * FROM teachers").fetchall()
+    finally:
+        conn.close()
 
 
 class ManageTeachers(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent)
         self.pack(fill="both", expand=True)
+        self.loader = BackgroundLoader(self)  # The teacher list is queried off the Tk thread
         self.create_widgets()
 
     def create_widgets(self):
@@ -31,6 +44,7 @@ class ManageTeachers(ctk.CTkFrame):
         # --- Teacher List (Database Bar) ---
         self.teacher_listbox = ctk.CTkTextbox(self, height=200, width=1000)  # Adjusted width for better alignment
         self.teacher_listbox.pack(pady=20, padx=40, fill="x")  # Positioned at the bottom, spans width
+        self.load_teachers()
 
     def add_teacher_widgets(self, tab):
         # --- Left Side: Entry Fields ---
@@ -85,8 +99,14 @@ class ManageTeachers(ctk.CTkFrame):
     def upload_photo(self):
         file_path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.png *.jpeg")])
         if file_path:
+            try:
+                # Render every thumbnail size now so screens never decode the original
+                make_thumbnails(file_path)
+                img = get_thumbnail(file_path, "preview")
+            except OSError as e:
+                messagebox.showerror("Invalid Photo", f"Could not read the image: {e}")
+                return
             self.photo_path = file_path
-            img = Image.open(file_path).resize((100, 100))
             photo = ImageTk.PhotoImage(img)
             self.photo_label.configure(image=photo, text="")
             self.photo_label.image = photo
@@ -106,7 +126,7 @@ class ManageTeachers(ctk.CTkFrame):
             return
 
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO teachers (name, email, phone, department)
@@ -164,7 +184,7 @@ class ManageTeachers(ctk.CTkFrame):
             return
 
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO users (username, password, role, teacher_id)
@@ -187,7 +207,7 @@ class ManageTeachers(ctk.CTkFrame):
             return
 
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
 
             # Check if the input is a valid teacher_id or email
@@ -207,12 +227,20 @@ class ManageTeachers(ctk.CTkFrame):
             messagebox.showerror("Error", str(e))
 
     def load_teachers(self):
+        """Reload the teacher list in the background."""
+        self.loader.cancel_all()  # Only the latest list is shown
+        self.loader.submit(
+            fetch_teachers,
+            self.show_teachers,
+            lambda error: messagebox.showerror("Error", f"Failed to load teachers: {str(error)}"),
+        )
+
+    def destroy(self):
+        # Results arriving after the page is gone have nowhere to go
+        self.loader.cancel_all()
+        super().destroy()
+
+    def show_teachers(self, rows):
         self.teacher_listbox.delete("0.0", "end")
-        conn = sqlite3.connect("edutrack.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM teachers")
-        rows = cursor.fetchall()
-        conn.close()
-
         for row in rows:
             self.teacher_listbox.insert("end", f"ID: {row[0]} | Name: {row[1]} | Email: {row[2]} | Phone: {row[3]} | Department: {row[4]}\n")
\ No newline at end of file
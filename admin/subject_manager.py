@@ -1,12 +1,28 @@
 import customtkinter as ctk
 import sqlite3
+from background import BackgroundLoader
+from database import connect_db
 from tkinter import messagebox
 
 
+def fetch_all_subjects():
+    """Every subject as (subject_id, subject_name, teacher_id, semester, course), by id."""
+    conn = connect_db()
+    try:
+        return conn.execute("""
+            SELECT subject_id, subject_name, teacher_id, semester, course
+            FROM subjects
+            ORDER BY subject_id
+        """).fetchall()
+    finally:
+        conn.close()
+
+
 class SubjectManager(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent)
         self.pack(fill="both", expand=True)
+        self.loader = BackgroundLoader(self)  # The subject list is queried off the Tk thread
         self.create_widgets()
 
     def create_widgets(self):
@@ -85,7 +101,7 @@ class SubjectManager(ctk.CTkFrame):
 
         try:
             # Insert subject into the database
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO subjects (subject_name, teacher_id, semester, course)
@@ -113,7 +129,7 @@ class SubjectManager(ctk.CTkFrame):
 
         try:
             # Delete subject from the database
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("DELETE FROM subjects WHERE subject_id = ?", (subject_id,))
             conn.commit()
@@ -128,32 +144,31 @@ class SubjectManager(ctk.CTkFrame):
             messagebox.showerror("Error", f"An unexpected error occurred: {e}")
 
     def load_subjects(self):
+        """Reload the subject list in the background."""
+        self.loader.cancel_all()  # Only the latest list is shown
+        self.loader.submit(
+            fetch_all_subjects,
+            self.show_subjects,
+            lambda error: messagebox.showerror("Error", f"Failed to load subjects: {error}"),
+        )
+
+    def destroy(self):
+        # Results arriving after the page is gone have nowhere to go
+        self.loader.cancel_all()
+        super().destroy()
+
+    def show_subjects(self, subjects):
         # Clear the display
         self.subject_display.configure(state="normal")
         self.subject_display.delete("1.0", "end")
 
-        try:
-            # Fetch all subjects from the database
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT subject_id, subject_name, teacher_id, semester, course
-                FROM subjects
-                ORDER BY subject_id
-            """)
-            subjects = cursor.fetchall()
-            conn.close()
-
-            # Display subjects
-            if subjects:
-                for subject in subjects:
-                    self.subject_display.insert("end", f"ID: {subject[0]} \t|\t Name: {subject[1]} \t|\t Teacher ID: {subject[2]} \t|\t Semester: {subject[3]} \t|\t Course: {subject[4]}\n{'-' * 135}\n")
-            else:
-                self.subject_display.insert("end", "No subjects found.\n")
-            self.subject_display.configure(state="disabled")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load subjects: {e}")
-            self.subject_display.configure(state="disabled")
+        # Display subjects
+        if subjects:
+            for subject in subjects:
+                self.subject_display.insert("end", f"ID: {subject[0]} \t|\t Name: {subject[1]} \t|\t Teacher ID: {subject[2]} \t|\t Semester: {subject[3]} \t|\t Course: {subject[4]}\n{'-' * 135}\n")
+        else:
+            self.subject_display.insert("end", "No subjects found.\n")
+        self.subject_display.configure(state="disabled")
 
     def clear_fields(self):
         """Clear all input fields."""
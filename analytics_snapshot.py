@@ -0,0 +1,214 @@
+"""
+Typed columnar snapshots of grades, attendance and exams for analytics.
+
+    python analytics_snapshot.py [--format parquet|arrow] [--out exports/snapshots] [--teacher ID]
+
+Each table is written as a Hive-partitioned dataset,
+
+    <out>/grades/semester=4/subject_id=11/part-0.parquet
+
+so readers can load one semester or subject without scanning the rest and
+get real integer, float and date columns instead of re-parsing xlsx files.
+Rows are streamed from SQLite in chunks into Arrow record batches. Every
+dataset is written into a scratch directory and swapped in when complete,
+so a nightly run never leaves a half-written snapshot behind. A
+_snapshot.json manifest records when the snapshot was taken and how many
+rows each dataset holds.
+
+pyarrow is imported only when a snapshot is written.
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import sys
+
+from database import connect_db
+from grade_export import CHUNK_SIZE, EXPORT_DIR, iter_chunks
+
+SNAPSHOT_DIR = os.path.join(EXPORT_DIR, "snapshots")
+
+# format name -> (pyarrow.dataset format, file extension)
+SNAPSHOT_FORMATS = {"parquet": ("parquet", "parquet"), "arrow": ("ipc", "arrow")}
+
+# Every dataset is partitioned on these columns, in this order
+PARTITION_COLUMNS = ("semester", "subject_id")
+
+# name -> (query, [(column, arrow type)]); the query's WHERE is filled in by build_query
+DATASETS = {
+    "grades": ("""
+        SELECT g.grade_id, g.exam_id, e.exam_type, e.date, sub.semester, sub.subject_id, sub.subject_name,
+               g.student_id, s.roll_number, s.course, g.marks_obtained, g.total_marks,
+               g.marks_obtained * 100.0 / NULLIF(g.total_marks, 0)
+        FROM grades g
+        JOIN exams e ON g.exam_id = e.exam_id
+        JOIN subjects sub ON e.subject_id = sub.subject_id
+        LEFT JOIN students s ON g.student_id = s.student_id
+        WHERE {where}
+        ORDER BY sub.semester, sub.subject_id, e.date, g.exam_id
+    """, [
+        ("grade_id", "int64"), ("exam_id", "int64"), ("exam_type", "string"), ("date", "date32"),
+        ("semester", "int32"), ("subject_id", "int64"), ("subject_name", "string"),
+        ("student_id", "int64"), ("roll_number", "string"), ("course", "string"),
+        ("marks_obtained", "int32"), ("total_marks", "int32"), ("percentage", "float64"),
+    ]),
+    "attendance": ("""
+        SELECT a.attendance_id, a.date, sub.semester, sub.subject_id, sub.subject_name, a.student_id, a.status,
+               a.status = 'Present'
+        FROM attendance a
+        JOIN subjects sub ON a.subject_id = sub.subject_id
+        WHERE {where}
+        ORDER BY sub.semester, sub.subject_id, a.date
+    """, [
+        ("attendance_id", "int64"), ("date", "date32"), ("semester", "int32"), ("subject_id", "int64"),
+        ("subject_name", "string"), ("student_id", "int64"), ("status", "string"), ("present", "bool_"),
+    ]),
+    "exams": ("""
+        SELECT e.exam_id, e.exam_type, e.date, sub.semester, sub.subject_id, sub.subject_name, sub.course,
+               sub.teacher_id
+        FROM exams e
+        JOIN subjects sub ON e.subject_id = sub.subject_id
+        WHERE {where}
+        ORDER BY sub.semester, sub.subject_id, e.date
+    """, [
+        ("exam_id", "int64"), ("exam_type", "string"), ("date", "date32"), ("semester", "int32"),
+        ("subject_id", "int64"), ("subject_name", "string"), ("course", "string"), ("teacher_id", "int64"),
+    ]),
+}
+
+
+def build_query(dataset, teacher_id=None, subject_id=None, semester=None):
+    """Return (sql, params) for one dataset; every dataset is joined to subjects as sub."""
+    sql, _ = DATASETS[dataset]
+    where, params = [], []
+    for column, value in (("sub.teacher_id", teacher_id), ("sub.subject_id", subject_id), ("sub.semester", semester)):
+        if value is not None:
+            where.append(f"{column} = ?")
+            params.append(value)
+    return sql.format(where=" AND ".join(where) or "1"), params
+
+
+def _to_date(value):
+    # Dates are stored as ISO text; anything unparseable becomes null instead of failing the snapshot
+    if value is None or isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _batches(pa, schema, chunks, counter):
+    # SQLite hands back dates as text and booleans as 0/1
+    converters = {}
+    for i, field in enumerate(schema):
+        if pa.types.is_date(field.type):
+            converters[i] = _to_date
+        elif pa.types.is_boolean(field.type):
+            converters[i] = lambda value: None if value is None else bool(value)
+    for rows in chunks:
+        columns = [list(column) for column in zip(*rows)]
+        for i, convert in converters.items():
+            columns[i] = [convert(value) for value in columns[i]]
+        counter[0] += len(rows)
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+        )
+
+
+def write_dataset(conn, dataset, out_dir, snapshot_format="parquet", chunk_size=CHUNK_SIZE, **filters):
+    """Stream one dataset into out_dir/<dataset>, replacing any previous snapshot; return its row count."""
+    import pyarrow as pa  # Only snapshot writers need pyarrow
+    import pyarrow.dataset as ds
+
+    _, columns = DATASETS[dataset]
+    schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in columns])
+    partitioning = ds.partitioning(pa.schema([schema.field(name) for name in PARTITION_COLUMNS]), flavor="hive")
+    file_format, extension = SNAPSHOT_FORMATS[snapshot_format]
+
+    target = os.path.join(out_dir, dataset)
+    partial = f"{target}.partial"
+    shutil.rmtree(partial, ignore_errors=True)
+
+    sql, params = build_query(dataset, **filters)
+    counter = [0]
+    try:
+        ds.write_dataset(
+            _batches(pa, schema, iter_chunks(conn, sql, params, chunk_size), counter),
+            partial,
+            schema=schema,
+            format=file_format,
+            partitioning=partitioning,
+            basename_template=f"part-{{i}}.{extension}",
+        )
+        os.makedirs(partial, exist_ok=True)  # An empty dataset still replaces the old one
+        # Swap the finished dataset in. A directory cannot be replaced in one
+        # rename, so between the two a reader finds no dataset at all, but
+        # never a half-written one
+        previous = f"{target}.old"
+        shutil.rmtree(previous, ignore_errors=True)
+        if os.path.exists(target):
+            os.replace(target, previous)
+        os.replace(partial, target)
+        shutil.rmtree(previous, ignore_errors=True)
+    finally:
+        shutil.rmtree(partial, ignore_errors=True)
+    return counter[0]
+
+
+def write_snapshot(out_dir=SNAPSHOT_DIR, snapshot_format="parquet", datasets=None, conn=None, **filters):
+    """Write every dataset (or the named ones) and the manifest; return {dataset: rows}."""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+        # One read transaction so grades, attendance and exams agree with each other
+        conn.execute("BEGIN")
+        try:
+            counts = {
+                dataset: write_dataset(conn, dataset, out_dir, snapshot_format, **filters)
+                for dataset in (datasets or DATASETS)
+            }
+        except Exception:
+            # A caller's connection must not be left inside our transaction
+            conn.rollback()
+            raise
+        conn.commit()
+    finally:
+        if own_conn:
+            conn.close()
+
+    manifest = {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "format": snapshot_format,
+        "partitioning": list(PARTITION_COLUMNS),
+        "filters": {key: value for key, value in filters.items() if value is not None},
+        "rows": counts,
+    }
+    with open(os.path.join(out_dir, "_snapshot.json"), "w", encoding="utf-8") as out:
+        json.dump(manifest, out, indent=2)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--format", choices=sorted(SNAPSHOT_FORMATS), default="parquet")
+    parser.add_argument("--out", default=SNAPSHOT_DIR, help=f"output directory (default: {SNAPSHOT_DIR})")
+    parser.add_argument("--dataset", action="append", choices=sorted(DATASETS), help="repeatable; default: all")
+    parser.add_argument("--teacher", type=int, help="only this teacher's subjects")
+    parser.add_argument("--semester", type=int)
+    args = parser.parse_args(argv)
+
+    counts = write_snapshot(
+        args.out, args.format, args.dataset, teacher_id=args.teacher, semester=args.semester
+    )
+    for dataset, rows in counts.items():
+        print(f"{dataset}: {rows} rows")
+    print(f"Snapshot written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
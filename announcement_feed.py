@@ -0,0 +1,140 @@
+import customtkinter as ctk
+
+import change_feed
+from background import BackgroundLoader
+from database import ANNOUNCEMENT_PAGE_SIZE, fetch_announcements_by_rowid, fetch_announcements_page
+from virtual_list import VirtualList
+
+
+class AnnouncementFeed(ctk.CTkFrame):
+    """
+    Newest-first announcements list that loads one page at a time as it is
+    scrolled (see database.fetch_announcements_page).
+
+    Pages are fetched on a background loader and appended to a VirtualList,
+    so neither the query nor the widgets grow with the announcement history.
+    first_page, a (rows, cursor) pair already fetched by the caller, saves
+    the initial query.
+
+    Announcements posted, edited or deleted anywhere (see change_feed) are
+    applied to the loaded rows one by one instead of reloading the feed.
+    """
+
+    def __init__(self, parent, row_height=70, page_size=ANNOUNCEMENT_PAGE_SIZE, first_page=None,
+                 font=("Arial", 14), wraplength=550, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.page_size = page_size
+        self.font = font
+        self.wraplength = wraplength
+        self.loader = BackgroundLoader(self)
+        self.cursor = None
+        self.exhausted = False
+        self.loading = False
+
+        self.list = VirtualList(self, self.make_row, self.bind_row, row_height=row_height, on_end=self.load_more)
+        self.list.pack(fill="both", expand=True)
+        self.empty_label = ctk.CTkLabel(self, text="No announcements yet.", text_color="#aaaaaa")
+
+        # Subscribed first, so an announcement posted while the first page loads is not missed
+        change_feed.subscribe(self, "announcements", self.apply_changes)
+        if first_page is not None:
+            self.show_page(first_page, reset=True)
+        else:
+            self.reload()
+
+    def reload(self):
+        """Drop the loaded pages and start again from the newest announcement."""
+        self.loader.cancel_all()
+        self.cursor = None
+        self.exhausted = False
+        self.loading = True
+        self.loader.submit(
+            lambda: fetch_announcements_page(limit=self.page_size),
+            lambda page: self.show_page(page, reset=True),
+            self.on_error,
+        )
+
+    def load_more(self):
+        if self.loading or self.exhausted:
+            return
+        self.loading = True
+        cursor = self.cursor
+        self.loader.submit(
+            lambda: fetch_announcements_page(cursor, self.page_size),
+            self.show_page,
+            self.on_error,
+        )
+
+    def show_page(self, page, reset=False):
+        rows, self.cursor = page
+        self.exhausted = self.cursor is None
+        # Cleared before appending, which may ask for the next page right away
+        self.loading = False
+        if reset:
+            self.empty_label.pack_forget()
+            if not rows:
+                self.empty_label.pack(pady=10, before=self.list)
+            self.list.set_items(rows)
+        else:
+            self.list.append_items(rows)
+
+    def apply_changes(self, changes):
+        rowids = {change.row_key for change in changes}
+        self.loader.submit(
+            lambda: fetch_announcements_by_rowid(rowids),
+            lambda rows: self.apply_rows(rowids, rows),
+            lambda error: print(f"Failed to update announcements: {error}"),
+        )
+
+    def apply_rows(self, rowids, rows):
+        """Bring the loaded announcements in rowids up to date with rows ({rowid: row}, deleted ones missing)."""
+        positions = {item[0]: index for index, item in enumerate(self.list.items)}
+        gone = [positions[rowid] for rowid in rowids if rowid in positions and rowid not in rows]
+        if gone:
+            self.list.remove_items(gone)
+
+        items = self.list.items
+        edited = False
+        for rowid, row in sorted(rows.items()):
+            index = next((i for i, item in enumerate(items) if item[0] == rowid), None)
+            if index is not None:
+                items[index] = row
+                edited = True
+                continue
+            # New rows older than the last loaded page arrive with the pages
+            index = next((i for i, item in enumerate(items) if _newer(row, item)), len(items))
+            if index < len(items) or self.exhausted:
+                self.empty_label.pack_forget()
+                self.list.insert_items(index, [row])
+        if edited:
+            self.list.refresh()
+
+    def on_error(self, error):
+        self.loading = False
+        print(f"Failed to load announcements: {error}")
+
+    def destroy(self):
+        # Results arriving after the feed is gone have nowhere to go
+        self.loader.cancel_all()
+        super().destroy()
+
+    def make_row(self, parent):
+        row = ctk.CTkFrame(parent, corner_radius=10)
+        row.pack(fill="both", expand=True, padx=5, pady=3)
+        row.date_label = ctk.CTkLabel(row, text="", font=("Arial", 11), text_color="#aaaaaa", anchor="w")
+        row.date_label.pack(fill="x", padx=10)
+        row.text_label = ctk.CTkLabel(row, text="", font=self.font, anchor="w", justify="left", wraplength=self.wraplength)
+        row.text_label.pack(fill="x", padx=10)
+        return row
+
+    def bind_row(self, row, announcement, index):
+        _, announcement_text, created_at = announcement
+        row.date_label.configure(text=f"Date: {created_at}")
+        row.text_label.configure(text=announcement_text)
+
+
+def _newer(a, b):
+    # Feed order: newest created_at first, undated announcements last, rowid breaking ties
+    if a[2] is None or b[2] is None:
+        return (a[2] is not None, a[0]) > (b[2] is not None, b[0])
+    return (a[2], a[0]) > (b[2], b[0])
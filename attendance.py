@@ -1,32 +1,11 @@
 import customtkinter as ctk
-import sqlite3
+from database import fetch_attendance_summary
 
 def show_attendance(parent, user_data):
     # Fetch attendance details from the database
-    conn = sqlite3.connect('edutrack.db')
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT subjects.subject_id, subjects.subject_name, attendance.status, COUNT(attendance.status) as count
-        FROM attendance
-        JOIN subjects ON attendance.subject_id = subjects.subject_id
-        WHERE attendance.student_id = ? AND (attendance.status = 'Present' OR attendance.status = 'Absent')
-        GROUP BY subjects.subject_id, subjects.subject_name, attendance.status
-    """, (user_data[4],))
-    
-    records = cursor.fetchall()
-    conn.close()
+    render_attendance(parent, fetch_attendance_summary(user_data[4]))
 
-    # Process the fetched data into a dictionary
-    attendance_data = {}
-    for record in records:
-        subject_id, subject_name, status, count = record
-        if subject_id not in attendance_data:
-            attendance_data[subject_id] = {"subject_name": subject_name, "present": 0, "total": 0}
-        if status == 'Present':
-            attendance_data[subject_id]["present"] = count
-        attendance_data[subject_id]["total"] += count
-    
+def render_attendance(parent, attendance_data):
     # Calculate overall attendance
     total_present = sum([data["present"] for data in attendance_data.values()])
     total_classes = sum([data["total"] for data in attendance_data.values()])
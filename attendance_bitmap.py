@@ -0,0 +1,208 @@
+"""
+Compact bitmap representation of the attendance log.
+
+Every (subject, term) gets a session calendar in attendance_sessions that
+numbers its class dates 0, 1, 2, ... and every (student, subject, term) gets
+two bitsets in attendance_bitmaps, where bit n stands for session n:
+
+    marked   the student has a mark for the session
+    present  the mark is Present
+
+A term of daily attendance for one student is a few dozen bytes instead of
+one row per day, counts are popcounts, and whole histories unpack straight
+into NumPy arrays for streak and trend calculations.
+
+These helpers take an open connection and never commit; callers own the
+transaction (see database.save_attendance and database.pack_attendance).
+"""
+from collections import defaultdict
+
+
+def term_for_date(date):
+    """Return the term a class date belongs to, e.g. '2025-S1' (Jan-Jun) or '2025-S2' (Jul-Dec)."""
+    text = str(date)
+    year = text[:4]
+    month = int(text[5:7]) if len(text) >= 7 and text[5:7].isdigit() else 1
+    return f"{year}-S{1 if month <= 6 else 2}"
+
+
+def to_blob(bits):
+    """Encode an int bitset as little-endian bytes."""
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def from_blob(blob):
+    """Decode little-endian bytes back into an int bitset."""
+    return int.from_bytes(blob or b"", "little")
+
+
+def session_number(conn, subject_id, term, date):
+    """Return the session number of a class date, adding it to the term's calendar if new."""
+    row = conn.execute(
+        "SELECT session_no FROM attendance_sessions WHERE subject_id = ? AND date = ?", (subject_id, date)
+    ).fetchone()
+    if row is not None:
+        return row[0]
+    session_no = conn.execute(
+        "SELECT COALESCE(MAX(session_no) + 1, 0) FROM attendance_sessions WHERE subject_id = ? AND term = ?",
+        (subject_id, term),
+    ).fetchone()[0]
+    conn.execute(
+        "INSERT INTO attendance_sessions (subject_id, term, session_no, date) VALUES (?, ?, ?, ?)",
+        (subject_id, term, session_no, date),
+    )
+    return session_no
+
+
+def record_session(conn, subject_id, date, statuses):
+    """Set one session's bits for every student in statuses ({student_id: 'Present' | 'Absent'})."""
+    term = term_for_date(date)
+    bit = 1 << session_number(conn, subject_id, term, date)
+
+    existing = {
+        student_id: (from_blob(marked), from_blob(present))
+        for student_id, marked, present in conn.execute(
+            "SELECT student_id, marked, present FROM attendance_bitmaps WHERE subject_id = ? AND term = ?",
+            (subject_id, term),
+        )
+    }
+    rows = []
+    for student_id, status in statuses.items():
+        marked, present = existing.get(student_id, (0, 0))
+        marked |= bit
+        present = present | bit if status == "Present" else present & ~bit
+        rows.append((student_id, subject_id, term, to_blob(marked), to_blob(present)))
+
+    conn.executemany("""
+        INSERT INTO attendance_bitmaps (student_id, subject_id, term, marked, present)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (student_id, subject_id, term) DO UPDATE SET
+            marked = excluded.marked,
+            present = excluded.present
+    """, rows)
+
+
+def pack(conn):
+    """Rebuild every calendar and bitmap from the attendance table and return what was written."""
+    conn.execute("DELETE FROM attendance_bitmaps")
+    conn.execute("DELETE FROM attendance_sessions")
+
+    sessions = {}  # (subject_id, date) -> (term, session_no)
+    next_session = defaultdict(int)  # (subject_id, term) -> next free session number
+    bitmaps = defaultdict(lambda: [0, 0])  # (student_id, subject_id, term) -> [marked, present]
+    log_rows = 0
+
+    # Dates are numbered in calendar order within each term
+    for student_id, subject_id, date, status in conn.execute("""
+        SELECT student_id, subject_id, date, status
+        FROM attendance
+        WHERE status IN ('Present', 'Absent') AND student_id IS NOT NULL AND subject_id IS NOT NULL
+        ORDER BY subject_id, date
+    """).fetchall():
+        log_rows += 1
+        session = sessions.get((subject_id, date))
+        if session is None:
+            term = term_for_date(date)
+            session = sessions[(subject_id, date)] = (term, next_session[(subject_id, term)])
+            next_session[(subject_id, term)] += 1
+        term, session_no = session
+
+        bits = bitmaps[(student_id, subject_id, term)]
+        bits[0] |= 1 << session_no
+        if status == "Present":
+            bits[1] |= 1 << session_no
+
+    conn.executemany(
+        "INSERT INTO attendance_sessions (subject_id, term, session_no, date) VALUES (?, ?, ?, ?)",
+        [(subject_id, term, session_no, date) for (subject_id, date), (term, session_no) in sessions.items()],
+    )
+    rows = [
+        (student_id, subject_id, term, to_blob(marked), to_blob(present))
+        for (student_id, subject_id, term), (marked, present) in bitmaps.items()
+    ]
+    conn.executemany(
+        "INSERT INTO attendance_bitmaps (student_id, subject_id, term, marked, present) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    return {
+        "log_rows": log_rows,
+        "sessions": len(sessions),
+        "bitmaps": len(rows),
+        "bitmap_bytes": sum(len(row[3]) + len(row[4]) for row in rows),
+    }
+
+
+def student_counts(conn, student_id):
+    """Return {subject_id: (subject_name, present, total)} for a student, summed over all terms."""
+    counts = {}
+    for subject_id, subject_name, marked, present in conn.execute("""
+        SELECT b.subject_id, s.subject_name, b.marked, b.present
+        FROM attendance_bitmaps b
+        JOIN subjects s ON b.subject_id = s.subject_id
+        WHERE b.student_id = ?
+    """, (student_id,)):
+        _, total_present, total = counts.get(subject_id, (subject_name, 0, 0))
+        counts[subject_id] = (
+            subject_name,
+            total_present + from_blob(present).bit_count(),
+            total + from_blob(marked).bit_count(),
+        )
+    return counts
+
+
+def subject_counts(conn, subject_id):
+    """Return {student_id: (present, total)} for a subject, summed over all terms."""
+    counts = {}
+    for student_id, marked, present in conn.execute(
+        "SELECT student_id, marked, present FROM attendance_bitmaps WHERE subject_id = ?", (subject_id,)
+    ):
+        total_present, total = counts.get(student_id, (0, 0))
+        counts[student_id] = (total_present + from_blob(present).bit_count(), total + from_blob(marked).bit_count())
+    return counts
+
+
+def history(conn, student_id, subject_id):
+    """
+    Return a student's sessions in a subject as NumPy arrays in date order:
+    (dates, marked, present), where marked and present are boolean arrays.
+    """
+    import numpy as np  # Imported lazily, only history readers need it
+
+    dates, marked, present = [], [], []
+    for term, marked_blob, present_blob in conn.execute("""
+        SELECT term, marked, present FROM attendance_bitmaps
+        WHERE student_id = ? AND subject_id = ?
+        ORDER BY term
+    """, (student_id, subject_id)).fetchall():
+        calendar = conn.execute(
+            "SELECT session_no, date FROM attendance_sessions WHERE subject_id = ? AND term = ? ORDER BY session_no",
+            (subject_id, term),
+        ).fetchall()
+        if not calendar:
+            continue
+        size = calendar[-1][0] + 1
+        term_dates = np.empty(size, dtype=object)
+        for session_no, date in calendar:
+            term_dates[session_no] = str(date)
+        dates.append(term_dates)
+        for blob, out in ((marked_blob, marked), (present_blob, present)):
+            # count= trims the padding bits of the last byte and zero-fills trailing sessions
+            bits = np.unpackbits(np.frombuffer(blob or b"", dtype=np.uint8), count=size, bitorder="little")
+            out.append(bits.astype(bool))
+
+    if not dates:
+        return np.array([], dtype=object), np.array([], dtype=bool), np.array([], dtype=bool)
+    dates, marked, present = np.concatenate(dates), np.concatenate(marked), np.concatenate(present)
+    order = np.argsort(dates, kind="stable")
+    return dates[order], marked[order], present[order]
+
+
+def current_streak(marked, present):
+    """Number of consecutive Present marks ending at the student's latest marked session."""
+    import numpy as np
+
+    attended = present[marked]
+    if attended.size == 0 or not attended[-1]:
+        return 0
+    misses = np.flatnonzero(~attended)
+    return int(attended.size - (misses[-1] + 1 if misses.size else 0))
@@ -0,0 +1,111 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import customtkinter as ctk
+
+# Worker threads shared by every window in the process
+MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide thread pool used for background loads."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="edutrack-load")
+        return _executor
+
+
+class LoadHandle:
+    """A single in-flight background load."""
+
+    def __init__(self, on_done, on_error):
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Drop the result; the query is skipped if it has not started yet."""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class BackgroundLoader:
+    """
+    Runs blocking loads (database queries, exports) on the shared thread pool
+    and hands their results back on the Tk main thread.
+
+    Worker threads never touch Tk: finished loads are queued, and the queue
+    is drained from an after() callback on the widget that owns the loader.
+    """
+
+    def __init__(self, widget, poll_ms=25):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._results = queue.Queue()
+        self._pending = set()
+        self._polling = False
+
+    def submit(self, load, on_done, on_error=None):
+        """Run load() in the background and call on_done(result) on the Tk thread."""
+        handle = LoadHandle(on_done, on_error)
+        self._pending.add(handle)
+        handle.future = get_executor().submit(load)
+        handle.future.add_done_callback(lambda future: self._results.put(handle))
+        self._schedule()
+        return handle
+
+    def cancel_all(self):
+        """Cancel every in-flight load, e.g. when the user navigates away; return True if any was running."""
+        cancelled = bool(self._pending)
+        for handle in self._pending:
+            handle.cancel()
+        self._pending.clear()
+        return cancelled
+
+    def _schedule(self):
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._drain)
+
+    def _drain(self):
+        self._polling = False
+        while True:
+            try:
+                handle = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.discard(handle)
+            if handle.cancelled or handle.future.cancelled():
+                continue
+
+            error = handle.future.exception()
+            if error is None:
+                handle.on_done(handle.future.result())
+            elif handle.on_error is not None:
+                handle.on_error(error)
+            else:
+                print(f"Background load error: {error}")
+
+        if self._pending:
+            self._schedule()
+
+
+def show_skeleton(parent, rows=3, text="Loading..."):
+    """Replace the contents of parent with a placeholder shown while data loads."""
+    for widget in parent.winfo_children():
+        widget.destroy()
+
+    skeleton = ctk.CTkFrame(parent, fg_color="transparent")
+    skeleton.pack(fill="both", expand=True, padx=40, pady=40)
+
+    ctk.CTkLabel(skeleton, text=text, font=("Arial", 18), text_color="#AAB6FE").pack(anchor="w", pady=(0, 20))
+    for _ in range(rows):
+        ctk.CTkFrame(skeleton, height=80, fg_color="#2A2A3B", corner_radius=10).pack(fill="x", pady=10)
+    return skeleton
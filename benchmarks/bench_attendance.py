@@ -0,0 +1,80 @@
+"""
+Benchmark bulk attendance submission against the old per-student INSERT loop.
+
+Submits one session for a large class on a throwaway copy of edutrack.db:
+
+    python benchmarks/bench_attendance.py [--students 1000] [--sessions 20]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_storage import seed
+from database import save_attendance
+from teacher.db_manager import DB_PATH, ConnectionPool
+from migrations import migrate
+
+
+def per_row(conn, subject_id, date, statuses):
+    """The old submit_attendance: one execute per student, then commit"""
+    cursor = conn.cursor()
+    for student_id, status in statuses.items():
+        cursor.execute("""
+            INSERT INTO attendance (student_id, subject_id, date, status)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (student_id, subject_id, date) DO UPDATE SET status = excluded.status
+        """, (student_id, subject_id, date, status))
+    conn.commit()
+
+
+def batched(conn, subject_id, date, statuses):
+    save_attendance(subject_id, date, statuses, conn=conn)
+
+
+def run(name, submit, db_path, student_ids, sessions):
+    pool = ConnectionPool(db_path)
+    conn = pool.acquire()
+    migrate(conn)
+    statuses = {sid: "Present" if sid % 4 else "Absent" for sid in student_ids}
+
+    timings = []
+    for day in range(sessions):
+        started = time.perf_counter()
+        submit(conn, 1, f"bench-{name}-{day}", statuses)
+        timings.append(time.perf_counter() - started)
+    # Resubmitting the same session must not add rows
+    submit(conn, 1, f"bench-{name}-0", statuses)
+    rows = conn.execute("SELECT COUNT(*) FROM attendance WHERE date LIKE ?", (f"bench-{name}-%",)).fetchone()[0]
+    pool.release(conn)
+    pool.close_all()
+
+    timings.sort()
+    print(
+        f"{name:>8}: median {timings[len(timings) // 2] * 1000:7.2f} ms  "
+        f"max {timings[-1] * 1000:7.2f} ms per {len(student_ids)}-student session  "
+        f"rows {rows} (expected {len(student_ids) * sessions})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=20)
+    args = parser.parse_args()
+
+    source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), DB_PATH)
+    for name, submit in (("per-row", per_row), ("batched", batched)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, DB_PATH)
+            shutil.copy(source, db_path)
+            student_ids = seed(db_path, args.students)
+            run(name, submit, db_path, student_ids, args.sessions)
+
+
+if __name__ == "__main__":
+    main()
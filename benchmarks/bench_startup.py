@@ -0,0 +1,83 @@
+"""
+Measure import cost at startup with python -X importtime.
+
+Each scenario imports a set of modules in a fresh interpreter and reports
+the median total import time (interpreter startup included), plus the
+slowest modules of the last run:
+
+    python benchmarks/bench_startup.py [--runs 5] [--top 10]
+
+"login" is what login.py imports now that role panels are loaded lazily;
+"login-eager" adds the two panels it used to import at module load.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lazy_imports import REGISTRY
+
+LOGIN_IMPORTS = ("customtkinter", "tkinter.messagebox", "database", "lazy_imports")
+
+SCENARIOS = {
+    "login": LOGIN_IMPORTS,
+    "login-eager": LOGIN_IMPORTS + ("admin.admin_panel", "teacher.teacher_panel"),
+    "student-panel": (REGISTRY["EduTrackApp"][0],),
+    "teacher-panel": (REGISTRY["TeacherPanelApp"][0],),
+    "admin-panel": (REGISTRY["AdminPanel"][0],),
+}
+for _name in ("numpy", "pandas", "matplotlib", "PIL", "tkcalendar"):
+    SCENARIOS[_name] = (REGISTRY[_name][0],)
+
+
+def import_times(modules):
+    """Import modules in a fresh interpreter; return [(name, depth, self_us, cumulative_us)]."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list per scenario")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    for scenario in args.scenarios or SCENARIOS:
+        totals = []
+        try:
+            for _ in range(args.runs):
+                rows = import_times(SCENARIOS[scenario])
+                # Depth 0 rows are what -c imported directly; their cumulative times add up to the total
+                totals.append(sum(cumulative for _, depth, _, cumulative in rows if depth == 0))
+        except RuntimeError as e:
+            print(f"{scenario:>14}: failed ({e})")
+            continue
+
+        print(f"{scenario:>14}: {statistics.median(totals) / 1000:8.1f} ms  ({len(rows)} modules)")
+        for name, _, self_us, cumulative in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+            print(f"{'':>16}{self_us / 1000:7.1f} ms self  {cumulative / 1000:7.1f} ms cumulative  {name}")
+
+
+if __name__ == "__main__":
+    main()
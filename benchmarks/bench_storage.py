@@ -0,0 +1,134 @@
+"""
+Benchmark the managed (WAL) storage mode against SQLite's default journal.
+
+Simulates several teachers submitting attendance while students load their
+dashboards, on a throwaway copy of edutrack.db:
+
+    python benchmarks/bench_storage.py [--students 300] [--seconds 5]
+
+Writers submit as fast as they can, so the numbers depend heavily on the
+machine (CPU cores, disk, SQLite version) and vary from run to run; WAL
+is not faster everywhere. Compare several runs of at least a few seconds
+on the machine the app is deployed to, and quote the header line printed
+with the results.
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from teacher.db_manager import DB_PATH, STORAGE_MODES, ConnectionPool
+
+DASHBOARD_QUERY = """
+    SELECT s.subject_name, a.date, a.status
+    FROM attendance a
+    INNER JOIN subjects s ON a.subject_id = s.subject_id
+    WHERE a.student_id = ?
+    ORDER BY a.date DESC LIMIT 5
+"""
+
+
+def seed(db_path, students):
+    """Add enough students to make an attendance submission non-trivial"""
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO students (name, roll_number, email, phone, course, semester) VALUES (?, ?, ?, ?, ?, ?)",
+        [(f"Bench Student {i}", f"B{i}", f"bench{i}@example.com", None, "Information Technology", 4)
+         for i in range(students)],
+    )
+    conn.commit()
+    ids = [row[0] for row in conn.execute("SELECT student_id FROM students")]
+    conn.close()
+    return ids
+
+
+def run(mode, db_path, student_ids, writers, readers, seconds):
+    pool = ConnectionPool(db_path, pragmas=STORAGE_MODES[mode])
+    stop = threading.Event()
+    stats = {"reads": 0, "writes": 0, "locked": 0, "read_wait": 0.0}
+    lock = threading.Lock()
+
+    def writer(subject_id):
+        day = 0
+        while not stop.is_set():
+            day += 1
+            conn = pool.acquire()
+            try:
+                # One attendance session per transaction, like submit_attendance
+                conn.executemany(
+                    "INSERT INTO attendance (student_id, subject_id, date, status) VALUES (?, ?, ?, 'Present')",
+                    [(sid, subject_id, f"bench-{subject_id}-{day}") for sid in student_ids],
+                )
+                conn.commit()
+                with lock:
+                    stats["writes"] += 1
+            except sqlite3.OperationalError:
+                with lock:
+                    stats["locked"] += 1
+            finally:
+                pool.release(conn)
+
+    def reader():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            started = time.perf_counter()
+            conn = pool.acquire()
+            try:
+                conn.execute(DASHBOARD_QUERY, (student_ids[i % len(student_ids)],)).fetchall()
+                with lock:
+                    stats["reads"] += 1
+                    stats["read_wait"] += time.perf_counter() - started
+            except sqlite3.OperationalError:
+                with lock:
+                    stats["locked"] += 1
+            finally:
+                pool.release(conn)
+
+    threads = [threading.Thread(target=writer, args=(n + 1,)) for n in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    pool.close_all()
+
+    avg_read_ms = stats["read_wait"] / stats["reads"] * 1000 if stats["reads"] else 0
+    print(
+        f"{mode:>8}: {stats['writes'] / seconds:8.1f} submissions/s  "
+        f"{stats['reads'] / seconds:9.1f} dashboard reads/s  "
+        f"avg read {avg_read_ms:6.2f} ms  locked errors {stats['locked']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--writers", type=int, default=3)
+    parser.add_argument("--readers", type=int, default=6)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"SQLite {sqlite3.sqlite_version}, Python {sys.version.split()[0]}, {os.cpu_count()} CPUs; "
+        f"{args.writers} writers (unthrottled), {args.readers} readers, {args.students} students, {args.seconds:g} s"
+    )
+    source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), DB_PATH)
+    for mode in ("default", "managed"):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, DB_PATH)
+            shutil.copy(source, db_path)
+            student_ids = seed(db_path, args.students)
+            run(mode, db_path, student_ids, args.writers, args.readers, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Change feed: tells open views which rows other windows (or this one) wrote.
+
+Triggers from migration 12 append a row to the changes log (see
+change_log.py) for every insert, update and delete on the tables in
+migrations.CHANGE_TABLES. Each Tk root gets one ChangeFeed that polls the
+log for entries newer than the last one it saw, a primary-key range read
+that costs next to nothing when nothing changed, and hands them to the
+views subscribed to that table and key:
+
+    change_feed.subscribe(self, "meetings", self.apply_meeting_changes, key=teacher_id)
+
+The callback runs on the Tk thread with the list of Change entries that
+matched, oldest first, and is expected to re-read only those rows. A
+subscription ends with its owner widget, or with unsubscribe().
+
+The log is shared through the database file, so windows in other
+processes see each other's writes within POLL_MS. A window that just
+wrote something calls poll_now() to show it right away.
+
+A feed starts from the end of the log as it was when the feed was created,
+so a view should subscribe before it loads its rows: a write landing
+between the two is then delivered as a change rather than lost. Entries
+older than change_log.KEEP_DAYS are pruned by the checkpoint scheduler in
+teacher/db_manager.py.
+"""
+import sqlite3
+
+from background import BackgroundLoader
+from change_log import BATCH_SIZE, fetch_changes, latest_change_id
+
+# How often every open window checks for new changes
+POLL_MS = 1000
+
+_feeds = {}
+
+
+def _start_id():
+    try:
+        return latest_change_id()
+    except sqlite3.OperationalError:
+        # Database has not been migrated yet
+        return 0
+
+
+def _poll(after_id):
+    try:
+        changes = fetch_changes(after_id)
+    except sqlite3.OperationalError:
+        # Database has not been migrated yet
+        return after_id, []
+    return (changes[-1].change_id if changes else after_id), changes
+
+
+def _exists(widget):
+    try:
+        return bool(widget.winfo_exists())
+    except Exception:
+        # Tcl raises once the interpreter behind the widget is gone
+        return False
+
+
+class Subscription:
+    def __init__(self, owner, table, key, callback):
+        self.owner = owner
+        self.table = table
+        self.key = key
+        self.callback = callback
+
+    def matches(self, change):
+        return change.table_name == self.table and (self.key is None or change.scope_key == self.key)
+
+    def alive(self):
+        return _exists(self.owner)
+
+
+class ChangeFeed:
+    """
+    Polls the changes log on a background loader and dispatches new entries
+    to subscriptions on the Tk thread. Polling stops while nothing is
+    subscribed.
+    """
+
+    def __init__(self, root, poll_ms=POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.loader = BackgroundLoader(root)
+        # Read once, up front: subscribers load their rows after this point,
+        # so every later change reaches them (one primary-key lookup)
+        self.last_id = _start_id()
+        self.subscriptions = []
+        self._after_id = None
+        self._polling = False
+        self._again = False
+
+    def subscribe(self, owner, table, callback, key=None):
+        """Call callback([Change]) whenever rows of table (with scope key, if given) change."""
+        subscription = Subscription(owner, table, key, callback)
+        self.subscriptions.append(subscription)
+        if self._after_id is None and not self._polling:
+            self._tick()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+
+    def poll_now(self):
+        """Check for changes right away, e.g. just after this window wrote something."""
+        if self._polling:
+            # Whatever was written may have missed the poll in flight
+            self._again = True
+            return
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._tick()
+
+    def _tick(self):
+        self._after_id = None
+        self.subscriptions = [subscription for subscription in self.subscriptions if subscription.alive()]
+        if not self.subscriptions:
+            return
+        self._polling = True
+        after_id = self.last_id
+        self.loader.submit(lambda: _poll(after_id), self._deliver, self._failed)
+
+    def _deliver(self, result):
+        self._polling = False
+        self.last_id, changes = result
+        for subscription in list(self.subscriptions):
+            matched = [change for change in changes if subscription.matches(change)]
+            if matched and subscription.alive():
+                try:
+                    subscription.callback(matched)
+                except Exception as e:
+                    print(f"Change feed callback error: {str(e)}")
+        # A full batch means more are waiting
+        self._schedule(0 if self._again or len(changes) >= BATCH_SIZE else self.poll_ms)
+
+    def _failed(self, error):
+        self._polling = False
+        print(f"Change feed poll error: {str(error)}")
+        self._schedule(self.poll_ms)
+
+    def _schedule(self, delay):
+        self._again = False
+        if self._after_id is None:
+            self._after_id = self.root.after(delay, self._tick)
+
+
+def get_feed(widget):
+    """Return the change feed of widget's Tk root, starting one if needed."""
+    root = widget._root()
+    # Forget feeds of windows that were closed, e.g. the login window
+    for other in [other for other in _feeds if other is not root and not _exists(other)]:
+        del _feeds[other]
+    feed = _feeds.get(root)
+    if feed is None:
+        feed = _feeds[root] = ChangeFeed(root)
+    return feed
+
+
+def subscribe(owner, table, callback, key=None):
+    """Subscribe owner (a widget) to changes of table, optionally only those with this scope key."""
+    return get_feed(owner).subscribe(owner, table, callback, key)
+
+
+def poll_now(widget):
+    """Deliver pending changes to widget's window without waiting for the next poll."""
+    get_feed(widget).poll_now()
@@ -0,0 +1,67 @@
+"""
+The changes log written by the triggers of migration 12: one row per
+insert, update and delete on the tables in migrations.CHANGE_TABLES.
+
+Data access only, with no Tk import, so headless tools such as
+`python maintenance.py prune-changes` can use it; change_feed.py polls it
+for the open windows.
+"""
+from collections import namedtuple
+
+from database import connect_db
+from teacher.db_manager import CHANGE_LOG_KEEP_DAYS
+
+# Most changes handed out per poll; the rest follow on the next one
+BATCH_SIZE = 500
+
+# Changes older than this are pruned by the checkpoint scheduler and by
+# `python maintenance.py prune-changes`
+KEEP_DAYS = CHANGE_LOG_KEEP_DAYS
+
+Change = namedtuple("Change", "change_id table_name row_key scope_key op")
+
+
+def latest_change_id(conn=None):
+    """Return the id of the newest logged change, 0 if there is none."""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        return conn.execute("SELECT COALESCE(MAX(change_id), 0) FROM changes").fetchone()[0]
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def fetch_changes(after_id, limit=BATCH_SIZE, conn=None):
+    """Return [Change] logged after change after_id, oldest first."""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        rows = conn.execute("""
+            SELECT change_id, table_name, row_key, scope_key, op
+            FROM changes
+            WHERE change_id > ?
+            ORDER BY change_id
+            LIMIT ?
+        """, (after_id, limit)).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    return [Change(*row) for row in rows]
+
+
+def prune_changes(keep_days=KEEP_DAYS, conn=None):
+    """Delete changes older than keep_days; return how many were removed."""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        with conn:
+            return conn.execute(
+                "DELETE FROM changes WHERE changed_at < datetime('now', ?)", (f"-{int(keep_days)} days",)
+            ).rowcount
+    finally:
+        if own_conn:
+            conn.close()
@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+
+import customtkinter as ctk
+from PIL import Image
+
+# Rendered charts kept in memory; the least recently used one is dropped first
+MAX_CACHED_CHARTS = 32
+
+
+class ChartRenderer:
+    """
+    Draws matplotlib charts off the Tk thread and caches the finished images.
+
+    Charts are drawn on a standalone Figure with the Agg canvas, which keeps
+    no pyplot global state and is safe to use from a worker thread. Each
+    chart is cached under a key describing the data it shows (for example
+    the exam id and the grades table version), so asking for unchanged data
+    again skips drawing entirely. Figures are cleared as soon as they have
+    been rasterized, so nothing accumulates between reports. matplotlib is
+    imported by the first render, on the worker thread, not at page load.
+    """
+
+    def __init__(self, max_cached=MAX_CACHED_CHARTS):
+        self.max_cached = max_cached
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, key, draw, figsize=(10, 6), dpi=100):
+        """Return the chart drawn by draw(fig) as a PIL image, reusing the cached one for key (None disables caching)."""
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize, dpi=dpi)
+        try:
+            canvas = FigureCanvasAgg(fig)
+            draw(fig)
+            fig.tight_layout()
+            canvas.draw()
+            width, height = canvas.get_width_height()
+            # copy() detaches the image from the canvas buffer before the figure is cleared
+            image = Image.frombuffer("RGBA", (width, height), canvas.buffer_rgba(), "raw", "RGBA", 0, 1).copy()
+        finally:
+            fig.clear()
+
+        if key is None:
+            return image
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_cached:
+                self._images.popitem(last=False)
+        return image
+
+    def clear(self):
+        """Drop every cached chart."""
+        with self._lock:
+            self._images.clear()
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer():
+    """Return the process-wide chart renderer."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = ChartRenderer()
+        return _renderer
+
+
+def show_chart(parent, image):
+    """Blit a rendered chart into parent; must be called on the Tk thread."""
+    chart = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+    label = ctk.CTkLabel(parent, image=chart, text="")
+    label.pack(fill="both", expand=True)
+    return label
@@ -1,7 +1,18 @@
+import datetime
 import sqlite3
+from typing import List, NamedTuple, Optional, Tuple
+import attendance_bitmap
+import query_cache
+from teacher.db_manager import DB_PATH, get_pool
+
+# Where attendance counts are read from: "summary" (attendance_summary table)
+# or "bitmap" (attendance_bitmaps, run `python maintenance.py pack-attendance`
+# once before switching). Both are kept current by save_attendance().
+ATTENDANCE_SOURCE = "summary"
 
 def connect_db():
-    conn = sqlite3.connect('edutrack.db')
+    # Borrow a connection from the shared pool; conn.close() hands it back
+    conn = get_pool(DB_PATH).connect()
     return conn
 
 def fetch_student(student_id):
@@ -17,20 +28,614 @@ def fetch_announcements():
     # For now, we'll return static data for demonstration purposes
     return "Mid-Sem Exams from April 10"
 
-def fetch_exams(student_id):
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-    SELECT subjects.subject_name, exams.date 
+def fetch_exams(student_id, upcoming=False, limit=None, conn=None):
+    # Exams for the student's semester as (subject_name, date, exam_type).
+    # Pass conn to run inside a caller's transaction instead of borrowing one.
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    query = """
+    SELECT subjects.subject_name, exams.date, exams.exam_type
     FROM exams 
     JOIN subjects ON exams.subject_id = subjects.subject_id 
     WHERE subjects.semester = (
         SELECT semester FROM students WHERE student_id = ?
-    )""", (student_id,))
+    )"""
+    params = [student_id]
+    if upcoming:
+        query += " AND exams.date >= ? ORDER BY exams.date ASC"
+        params.append(datetime.date.today().isoformat())
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    cursor = conn.cursor()
+    cursor.execute(query, params)
     exams = cursor.fetchall()
-    conn.close()
+    if own_conn:
+        conn.close()
     return exams
 
+# Announcements loaded per page of the feed
+ANNOUNCEMENT_PAGE_SIZE = 20
+
+ANNOUNCEMENT_FEED_QUERY = """
+    SELECT rowid, announcement_text, created_at
+    FROM announcements
+    WHERE {where}
+    ORDER BY created_at DESC, rowid DESC
+    LIMIT ?
+"""
+
+def fetch_announcements_page(cursor=None, limit=ANNOUNCEMENT_PAGE_SIZE, conn=None):
+    # One page of the announcements feed, newest first: ([(rowid, text, created_at)], next cursor).
+    # Keyset pagination on (created_at, rowid), served by idx_announcements_created_at
+    # (an index entry ends with the rowid), so every page costs the same however
+    # far down the feed it is. announcements.id is not a rowid alias and is
+    # mostly NULL, hence the rowid. The cursor is None once the feed is exhausted.
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        if cursor is None:
+            rows = conn.execute(ANNOUNCEMENT_FEED_QUERY.format(where="1"), (limit + 1,)).fetchall()
+        elif cursor[0] is None:
+            rows = conn.execute(
+                ANNOUNCEMENT_FEED_QUERY.format(where="created_at IS NULL AND rowid < ?"), (cursor[1], limit + 1)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                ANNOUNCEMENT_FEED_QUERY.format(where="(created_at, rowid) < (?, ?)"), (*cursor, limit + 1)
+            ).fetchall()
+            # Undated announcements sort after every dated one but fail the comparison
+            if len(rows) <= limit:
+                rows += conn.execute(
+                    ANNOUNCEMENT_FEED_QUERY.format(where="created_at IS NULL"), (limit + 1 - len(rows),)
+                ).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][2], rows[-1][0])
+
+def fetch_announcements_by_rowid(rowids, conn=None):
+    # {rowid: (rowid, text, created_at)} for the given announcements, as the
+    # feed rows above; deleted ones are simply missing. Used to apply changes.
+    rowids = list(rowids)
+    if not rowids:
+        return {}
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        rows = conn.execute(
+            f"SELECT rowid, announcement_text, created_at FROM announcements WHERE rowid IN ({', '.join('?' * len(rowids))})",
+            rowids,
+        ).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    return {row[0]: row for row in rows}
+
+def fetch_meetings(teacher_id, meeting_ids=None, conn=None):
+    # A teacher's meetings as (meeting_id, date, time, purpose, link) ordered
+    # by date and time, or only the given ones (to apply changes)
+    sql = "SELECT meeting_id, date, time, purpose, link FROM meetings WHERE teacher_id = ?"
+    params = [teacher_id]
+    if meeting_ids is not None:
+        meeting_ids = list(meeting_ids)
+        sql += f" AND meeting_id IN ({', '.join('?' * len(meeting_ids)) or 'NULL'})"
+        params.extend(meeting_ids)
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        return conn.execute(sql + " ORDER BY date, time", params).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+# Rows shown in each dashboard card
+DASHBOARD_LIMIT = 5
+
+class DashboardSnapshot(NamedTuple):
+    # Everything the student dashboard draws, read in one transaction
+    name: str
+    course: str
+    semester: int
+    photo_path: Optional[str]
+    announcements: List[str]
+    exams: List[Tuple[str, str, str]]  # (subject_name, date, exam_type)
+    attendance: List[Tuple[str, str, str]]  # (subject_name, date, status)
+
+def load_dashboard_snapshot(student_id, limit=DASHBOARD_LIMIT):
+    # Returns None when the student does not exist
+    conn = connect_db()
+    try:
+        # One read transaction so every card sees the same consistent snapshot
+        conn.execute("BEGIN")
+        student = conn.execute("""
+            SELECT s.name, s.course, s.semester,
+                   (SELECT p.photo_path FROM photostudent p WHERE p.student_id = s.student_id LIMIT 1)
+            FROM students s
+            WHERE s.student_id = ?
+        """, (student_id,)).fetchone()
+        if student is None:
+            return None
+
+        announcements = [row[1] for row in fetch_announcements_page(limit=limit, conn=conn)[0]]
+        exams = fetch_exams(student_id, upcoming=True, limit=limit, conn=conn)
+        attendance = conn.execute("""
+            SELECT s.subject_name, a.date, a.status
+            FROM attendance a
+            INNER JOIN subjects s ON a.subject_id = s.subject_id
+            WHERE a.student_id = ?
+            ORDER BY a.date DESC LIMIT ?
+        """, (student_id, limit)).fetchall()
+        conn.commit()
+    finally:
+        conn.close()
+
+    name, course, semester, photo_path = student
+    return DashboardSnapshot(name, course, semester, photo_path, announcements, exams, attendance)
+
+def fetch_attendance_summary(student_id):
+    # Per-subject attendance for a student:
+    # {subject_id: {"subject_name": ..., "present": ..., "total": ...}}
+    # Read from the trigger-maintained attendance_summary table (migration v8)
+    if ATTENDANCE_SOURCE == "bitmap":
+        conn = connect_db()
+        try:
+            counts = attendance_bitmap.student_counts(conn, student_id)
+        finally:
+            conn.close()
+        return {
+            subject_id: {"subject_name": subject_name, "present": present, "total": total}
+            for subject_id, (subject_name, present, total) in counts.items()
+            if total > 0
+        }
+
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT subjects.subject_id, subjects.subject_name, attendance_summary.present, attendance_summary.total
+        FROM attendance_summary
+        JOIN subjects ON attendance_summary.subject_id = subjects.subject_id
+        WHERE attendance_summary.student_id = ? AND attendance_summary.total > 0
+    """, (student_id,))
+    records = cursor.fetchall()
+    conn.close()
+
+    # Process the fetched data into a dictionary
+    attendance_data = {}
+    for subject_id, subject_name, present, total in records:
+        attendance_data[subject_id] = {"subject_name": subject_name, "present": present, "total": total}
+    return attendance_data
+
+def fetch_subject_attendance_counts(subject_id, conn=None):
+    # Present/total sessions for every student with attendance in a subject,
+    # read from attendance_summary: {student_id: (present, total)}.
+    # Pass conn to run inside a caller's transaction instead of borrowing one.
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        if ATTENDANCE_SOURCE == "bitmap":
+            rows = [
+                (student_id, present, total)
+                for student_id, (present, total) in attendance_bitmap.subject_counts(conn, subject_id).items()
+                if total > 0
+            ]
+        else:
+            rows = conn.execute("""
+                SELECT student_id, present, total
+                FROM attendance_summary
+                WHERE subject_id = ? AND total > 0
+            """, (subject_id,)).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    return {student_id: (present, total) for student_id, present, total in rows}
+
+def fetch_subjects(conn=None):
+    # Every subject as (subject_id, subject_name); served from the query cache
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        return query_cache.cached_query(
+            conn, "SELECT subject_id, subject_name FROM subjects", tables=("subjects",)
+        )
+    finally:
+        if own_conn:
+            conn.close()
+
+def fetch_teacher_subjects(teacher_id, conn=None):
+    # A teacher's subjects as (subject_id, subject_name, course, semester)
+    # ordered by name; served from the query cache
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        return query_cache.cached_query(conn, """
+            SELECT subject_id, subject_name, course, semester
+            FROM subjects
+            WHERE teacher_id = ?
+            ORDER BY subject_name
+        """, (teacher_id,), tables=("subjects",))
+    finally:
+        if own_conn:
+            conn.close()
+
+def fetch_teacher_exams(teacher_id, conn=None):
+    # Exams of a teacher's subjects as (exam_id, exam_type, subject_name, date),
+    # latest first; served from the query cache
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        return query_cache.cached_query(conn, """
+            SELECT e.exam_id, e.exam_type, s.subject_name, e.date
+            FROM exams e
+            JOIN subjects s ON e.subject_id = s.subject_id
+            WHERE s.teacher_id = ?
+            ORDER BY e.date DESC
+        """, (teacher_id,), tables=("exams", "subjects"))
+    finally:
+        if own_conn:
+            conn.close()
+
+# Students enrolled in :subject_id. Course names are free text ("IT" vs
+# "Information Technology"), so enrollments can miss: a subject nobody is
+# enrolled in, and a student enrolled in nothing, both fall back to their
+# semester. The fallback is per student as well as per subject, so one
+# student whose course does match does not empty the rest of the class.
+ROSTER_CTE = """
+    WITH roster (student_id) AS (
+        SELECT student_id FROM enrollments WHERE subject_id = :subject_id
+        UNION ALL
+        SELECT s.student_id
+        FROM subjects sub
+        JOIN students s ON s.semester = sub.semester
+        WHERE sub.subject_id = :subject_id
+            AND (
+                NOT EXISTS (SELECT 1 FROM enrollments WHERE subject_id = :subject_id)
+                OR NOT EXISTS (SELECT 1 FROM enrollments e WHERE e.student_id = s.student_id)
+            )
+    )
+"""
+
+def fetch_subject_roster(subject_id, conn=None):
+    # Students enrolled in a subject as (student_id, name, roll_number, course),
+    # ordered by name
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        students = conn.execute(ROSTER_CTE + """
+            SELECT s.student_id, s.name, s.roll_number, s.course
+            FROM roster r
+            JOIN students s ON s.student_id = r.student_id
+            ORDER BY s.name
+        """, {"subject_id": subject_id}).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    return students
+
+def fetch_grading_sheet(exam_id, conn=None):
+    # The exam's roster with any marks already entered, as
+    # (student_id, name, roll_number, course, marks_obtained or None) ordered
+    # by name, from one LEFT JOIN. Returns None when the exam does not exist.
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        exam = conn.execute("SELECT subject_id FROM exams WHERE exam_id = ?", (exam_id,)).fetchone()
+        if exam is None:
+            return None
+        sheet = conn.execute(ROSTER_CTE + """
+            SELECT s.student_id, s.name, s.roll_number, s.course, g.marks_obtained
+            FROM roster r
+            JOIN students s ON s.student_id = r.student_id
+            LEFT JOIN grades g ON g.student_id = s.student_id AND g.exam_id = :exam_id
+            ORDER BY s.name
+        """, {"subject_id": exam[0], "exam_id": exam_id}).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    return sheet
+
+def fetch_exam_marks(exam_id, conn=None):
+    # {student_id: marks_obtained} of one exam, via idx_grades_exam
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        return dict(conn.execute(
+            "SELECT student_id, marks_obtained FROM grades WHERE exam_id = ?", (exam_id,)
+        ).fetchall())
+    finally:
+        if own_conn:
+            conn.close()
+
+def format_attendance_percentage(present, total):
+    # "87.50%" style label used by the attendance screens
+    if total == 0:
+        return "0%"  # Avoid division by zero
+    return f"{(present / total) * 100:.2f}%"
+
+ATTENDANCE_STATUSES = ("Present", "Absent")
+
+def format_errors(errors, limit=10):
+    # One dialog's worth of validation errors
+    message = "\n".join(errors[:limit])
+    if len(errors) > limit:
+        message += f"\n...and {len(errors) - limit} more"
+    return message
+
+def validate_attendance(marks):
+    # marks: {student_id: (present, absent)} as ticked on the attendance screen.
+    # Checks the whole roster and returns ({student_id: status}, errors) so
+    # every problem can be reported at once; nothing is saved here.
+    statuses = {}
+    errors = []
+    for student_id, (present, absent) in marks.items():
+        if present and absent:
+            errors.append(f"Student ID {student_id} cannot be both Present and Absent.")
+        elif present:
+            statuses[student_id] = "Present"
+        elif absent:
+            statuses[student_id] = "Absent"
+        else:
+            errors.append(f"Please mark attendance for Student ID {student_id}.")
+    return statuses, errors
+
+def save_attendance(subject_id, date, statuses, conn=None):
+    # Write one session's attendance ({student_id: status}) in a single
+    # transaction. Re-submitting the same day overwrites the earlier marks
+    # instead of adding rows. Returns the number of rows written.
+    if isinstance(date, datetime.date):
+        date = date.isoformat()
+    rows = [(student_id, subject_id, date, status) for student_id, status in statuses.items()]
+    for row in rows:
+        if row[3] not in ATTENDANCE_STATUSES:
+            raise ValueError(f"Invalid attendance status for Student ID {row[0]}: {row[3]}")
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        with conn:
+            conn.executemany("""
+                INSERT INTO attendance (student_id, subject_id, date, status)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (student_id, subject_id, date) DO UPDATE SET status = excluded.status
+            """, rows)
+            # Same session in the compact bitmap store
+            attendance_bitmap.record_session(conn, subject_id, date, statuses)
+    finally:
+        if own_conn:
+            conn.close()
+    return len(rows)
+
+def validate_grades(entries, total_marks):
+    # entries: {student_id: text typed in the marks box}. Blank boxes are
+    # skipped. Checks every row and returns ({student_id: marks}, errors) so
+    # all problems can be reported at once; nothing is saved here.
+    marks = {}
+    errors = []
+    for student_id, text in entries.items():
+        text = str(text).strip()
+        if not text:
+            continue
+        try:
+            mark = int(text)
+        except ValueError:
+            errors.append(f"Invalid mark for student {student_id}: must be a number")
+            continue
+        if mark < 0 or mark > total_marks:
+            errors.append(f"Invalid mark for student {student_id}: must be between 0 and {total_marks}")
+            continue
+        marks[student_id] = mark
+    return marks, errors
+
+GRADES_UPSERT = """
+    INSERT INTO grades (student_id, exam_id, marks_obtained, total_marks)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (student_id, exam_id) DO UPDATE SET
+        marks_obtained = excluded.marks_obtained,
+        total_marks = excluded.total_marks
+"""
+
+def save_grades(exam_id, marks, total_marks, conn=None):
+    # Write an exam's marks ({student_id: marks_obtained}) in a single
+    # transaction. A student who already has a grade for the exam is updated
+    # in place. Returns the number of rows written.
+    rows = [(student_id, exam_id, mark, total_marks) for student_id, mark in marks.items()]
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        with conn:
+            conn.executemany(GRADES_UPSERT, rows)
+            # Triggers already updated the running sums; bring the percentiles up to date too
+            refresh_exam_percentiles([exam_id], conn=conn)
+    finally:
+        if own_conn:
+            conn.close()
+    return len(rows)
+
+EXAM_PERCENTILES_UPDATE = """
+    UPDATE exam_stats SET p25 = ?, median = ?, p75 = ?, p90 = ?, percentiles_stale = 0
+    WHERE exam_id = ?
+"""
+
+def refresh_exam_percentiles(exam_ids=None, conn=None):
+    # Recompute the quartiles, median and 90th percentile of exams whose
+    # grades changed since they were last computed (all such exams when
+    # exam_ids is None). Runs inside the caller's transaction when conn is given.
+    import numpy as np  # Only needed here, keep it off the import path of every screen
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        query = "SELECT exam_id FROM exam_stats WHERE percentiles_stale = 1"
+        params = []
+        if exam_ids is not None:
+            exam_ids = list(exam_ids)
+            if not exam_ids:
+                return
+            query += f" AND exam_id IN ({', '.join('?' * len(exam_ids))})"
+            params = exam_ids
+        stale = [row[0] for row in conn.execute(query, params)]
+
+        updates = []
+        for exam_id in stale:
+            scores = np.array([row[0] for row in conn.execute("""
+                SELECT COALESCE(marks_obtained * 100.0 / NULLIF(total_marks, 0), 0)
+                FROM grades WHERE exam_id = ?
+            """, (exam_id,))], dtype=float)
+            if scores.size:
+                p25, median, p75, p90 = np.percentile(scores, [25, 50, 75, 90]).tolist()
+            else:
+                p25 = median = p75 = p90 = None
+            updates.append((p25, median, p75, p90, exam_id))
+
+        if own_conn:
+            with conn:
+                conn.executemany(EXAM_PERCENTILES_UPDATE, updates)
+        else:
+            conn.executemany(EXAM_PERCENTILES_UPDATE, updates)
+    finally:
+        if own_conn:
+            conn.close()
+
+def fetch_student_exam_report(student_id, teacher_id, conn=None):
+    # A student's grades in the teacher's subjects joined with each exam's
+    # class statistics, most recent exam first, as rows of
+    # (exam_type, subject_name, marks_obtained, total_marks, date,
+    #  class_mean, class_stddev, class_median, class_count)
+
+    # Percentiles are recomputed lazily, in their own transaction
+    refresh_exam_percentiles()
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        rows = conn.execute("""
+            SELECT e.exam_type, s.subject_name, g.marks_obtained, g.total_marks, e.date,
+                   st.mean, st.variance, st.median, st.count
+            FROM grades g
+            JOIN exams e ON g.exam_id = e.exam_id
+            JOIN subjects s ON e.subject_id = s.subject_id
+            LEFT JOIN exam_statistics st ON st.exam_id = g.exam_id
+            WHERE g.student_id = ? AND s.teacher_id = ?
+            ORDER BY e.date DESC
+        """, (student_id, teacher_id)).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    report = []
+    for *grade, variance, median, count in rows:
+        stddev = variance ** 0.5 if variance is not None else None
+        report.append(tuple(grade) + (stddev, median, count))
+    return report
+
+# attendance_summary as it should be, recomputed from the attendance log
+ATTENDANCE_SUMMARY_SOURCE = """
+    SELECT student_id, subject_id, SUM(status = 'Present'), COUNT(*)
+    FROM attendance
+    WHERE status IN ('Present', 'Absent') AND student_id IS NOT NULL AND subject_id IS NOT NULL
+    GROUP BY student_id, subject_id
+"""
+
+def verify_attendance_summary(conn=None):
+    # Compare attendance_summary with the attendance log and return the
+    # mismatching (student_id, subject_id) pairs; an empty list means it is correct
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        rows = conn.execute(f"""
+            SELECT student_id, subject_id FROM (
+                {ATTENDANCE_SUMMARY_SOURCE}
+                EXCEPT
+                SELECT student_id, subject_id, present, total FROM attendance_summary WHERE total > 0
+            )
+            UNION
+            SELECT student_id, subject_id FROM (
+                SELECT student_id, subject_id, present, total FROM attendance_summary WHERE total > 0
+                EXCEPT
+                {ATTENDANCE_SUMMARY_SOURCE}
+            )
+        """).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    return rows
+
+def rebuild_attendance_summary(conn=None):
+    # Recompute attendance_summary from the attendance log in one transaction
+    # and return the number of (student, subject) rows written
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        with conn:
+            conn.execute("DELETE FROM attendance_summary")
+            cursor = conn.execute(
+                "INSERT INTO attendance_summary (student_id, subject_id, present, total)" + ATTENDANCE_SUMMARY_SOURCE
+            )
+        return cursor.rowcount
+    finally:
+        if own_conn:
+            conn.close()
+
+def pack_attendance(conn=None):
+    # Convert the whole attendance table into the bitmap store in one
+    # transaction, replacing whatever was there; returns attendance_bitmap.pack()'s stats
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        with conn:
+            return attendance_bitmap.pack(conn)
+    finally:
+        if own_conn:
+            conn.close()
+
+def fetch_attendance_streak(student_id, subject_id):
+    # Consecutive Present marks up to the student's latest session in a subject
+    conn = connect_db()
+    try:
+        dates, marked, present = attendance_bitmap.history(conn, student_id, subject_id)
+    finally:
+        conn.close()
+    return attendance_bitmap.current_streak(marked, present)
+
+def fetch_table_versions(tables):
+    # Current write counter for each table, maintained by triggers (migration v4)
+    tables = list(tables)
+    if not tables:
+        return {}
+    conn = connect_db()
+    try:
+        rows = conn.execute(
+            f"SELECT table_name, version FROM table_versions WHERE table_name IN ({', '.join('?' * len(tables))})",
+            tables,
+        ).fetchall()
+    except sqlite3.OperationalError:
+        # Database has not been migrated yet
+        rows = []
+    finally:
+        conn.close()
+    return dict(rows)
+
 def fetch_assignments(student_id):
     # This function should fetch assignments from the database
     # For now, we'll return static data for demonstration purposes
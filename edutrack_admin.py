@@ -1,10 +1,12 @@
 import customtkinter as ctk
 import sqlite3
+from database import connect_db
+from search import search_students, search_teachers
 
 # ---------------------- Database ----------------------
 class Database:
     def __init__(self):
-        self.conn = sqlite3.connect("edutrack.db")
+        self.conn = connect_db()
         self.cursor = self.conn.cursor()
 
     def search_student(self, search_type, value):
@@ -12,6 +14,32 @@ class Database:
         self.cursor.execute(query, (value,))
         return self.cursor.fetchall()
 
+    def find_students(self, value):
+        """Student rows matching an ID exactly, or name, roll number or email by prefix, best first."""
+        if value.strip().isdigit():
+            results = self.search_student("student_id", value.strip())
+            if results:
+                return results
+        ids = [row[0] for row in search_students(value, conn=self.conn)]
+        return self.rows_by_id("students", "student_id", ids)
+
+    def find_teachers(self, value):
+        """Teacher rows matching an ID exactly, or name, email or department by prefix, best first."""
+        if value.strip().isdigit():
+            results = self.rows_by_id("teachers", "teacher_id", [value.strip()])
+            if results:
+                return results
+        ids = [row[0] for row in search_teachers(value, conn=self.conn)]
+        return self.rows_by_id("teachers", "teacher_id", ids)
+
+    def rows_by_id(self, table, id_column, ids):
+        """Full rows for ids, in the order given."""
+        if not ids:
+            return []
+        self.cursor.execute(f"SELECT * FROM {table} WHERE {id_column} IN ({', '.join('?' * len(ids))})", ids)
+        rows = {str(row[0]): row for row in self.cursor.fetchall()}
+        return [rows[str(row_id)] for row_id in ids if str(row_id) in rows]
+
     def add_student(self, name, roll, email, phone, course, semester):
         try:
             self.cursor.execute("INSERT INTO students (name, roll_number, email, phone, course, semester) VALUES (?, ?, ?, ?, ?, ?)", 
@@ -49,7 +77,7 @@ class StudentManagement:
 
     def search_student(self):
         value = self.search_entry.get()
-        results = self.db.search_student("name", value) or self.db.search_student("student_id", value)
+        results = self.db.find_students(value)
 
         if results:
             self.result_label.configure(text=f"Found: {results[0][1]}")
@@ -99,9 +127,7 @@ class TeacherManagement:
 
     def search_teacher(self):
         value = self.search_entry.get()
-        query = f"SELECT * FROM teachers WHERE name = ? OR teacher_id = ?"
-        self.db.cursor.execute(query, (value, value))
-        results = self.db.cursor.fetchall()
+        results = self.db.find_teachers(value)
 
         if results:
             self.result_label.configure(text=f"Found: {results[0][1]}")
@@ -1,13 +1,47 @@
 import customtkinter as ctk
 from tkinter import messagebox
-import sqlite3
+from database import connect_db
+from search import SUBJECT_MATCH, match_query
+from background import BackgroundLoader
 import datetime  # To calculate day of the week
 
 
+def fetch_scheduled_exams(subject_match=None, exam_type="All"):
+    """Exams as (date, subject_name, exam_type) ordered by date, optionally filtered."""
+    query = """
+        SELECT exams.date, subjects.subject_name, exams.exam_type
+        FROM exams
+        INNER JOIN subjects ON exams.subject_id = subjects.subject_id
+        WHERE 1=1
+    """
+    params = []
+
+    # Apply subject name filter (prefix match through the subject search index)
+    if subject_match:
+        query += f" AND {SUBJECT_MATCH}"
+        params.append(subject_match)
+
+    # Apply exam type filter
+    if exam_type != "All":
+        query += " AND exams.exam_type = ?"
+        params.append(exam_type)
+
+    # Add sorting by date
+    query += " ORDER BY exams.date ASC"
+
+    conn = connect_db()
+    try:
+        return conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+
 class StudentExam(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent)
         self.pack(fill="both", expand=True)  # Ensure the frame fills the parent area
+        self.loader = BackgroundLoader(self)  # Exams are queried off the Tk thread
+        self.filters = (None, "All")  # (subject match, exam type) of the search on screen
         self.create_widgets()
 
     def create_widgets(self):
@@ -81,47 +115,30 @@ class StudentExam(ctk.CTkFrame):
 
     def load_exams(self, *args, default=False):
         """Load and display the scheduled exams for the student."""
+        if default:
+            self.filters = (None, "All")
+        else:
+            # Read the filters on the Tk thread; the query runs in the background
+            self.filters = (match_query(self.subject_filter_entry.get()), self.exam_type_menu.get())
+        self.refresh()
+
+    def refresh(self):
+        """Run the last search again, e.g. after exams changed."""
+        subject_match, exam_type = self.filters
+        self.loader.cancel_all()  # Only the latest search is shown
+        self.loader.submit(
+            lambda: fetch_scheduled_exams(subject_match, exam_type),
+            self.show_exams,
+            lambda error: messagebox.showerror("Error", f"Failed to load exams: {str(error)}"),
+        )
+
+    def show_exams(self, exams):
+        """Display the scheduled exams as cards."""
         try:
             # Clear previous exam entries
             for widget in self.exams_frame.winfo_children():
                 widget.destroy()
 
-            # Connect to the database
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-
-            # By default, fetch all exams
-            query = """
-                SELECT exams.date, subjects.subject_name, exams.exam_type
-                FROM exams
-                INNER JOIN subjects ON exams.subject_id = subjects.subject_id
-            """
-            params = []
-
-            if not default:
-                # Build query with filters if not default
-                query += " WHERE 1=1"
-
-                # Apply subject name filter
-                subject_name = self.subject_filter_entry.get().strip()
-                if subject_name:
-                    query += " AND subjects.subject_name LIKE ?"
-                    params.append(f"%{subject_name}%")
-
-                # Apply exam type filter
-                exam_type = self.exam_type_menu.get()
-                if exam_type != "All":
-                    query += " AND exams.exam_type = ?"
-                    params.append(exam_type)
-
-            # Add sorting by date
-            query += " ORDER BY exams.date ASC"
-
-            # Execute the query
-            cursor.execute(query, params)
-            exams = cursor.fetchall()
-            conn.close()
-
             # Display the exams
             if exams:
                 for exam in exams:
@@ -164,7 +181,7 @@ class StudentExam(ctk.CTkFrame):
                 )
                 no_exam_label.pack(anchor="center", padx=10, pady=10)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load exams: {str(e)}")
+            messagebox.showerror("Error", f"Failed to display exams: {str(e)}")
 
 
 if __name__ == "__main__":
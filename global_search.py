@@ -0,0 +1,73 @@
+import customtkinter as ctk
+
+from background import BackgroundLoader
+from search import search_all
+
+# Wait this long after the last keystroke before searching
+DEBOUNCE_MS = 150
+
+# Heading and one-line description for each kind of result
+RESULT_KINDS = {
+    "student": ("Students", lambda row: f"{row[1]}  |  Roll: {row[2]}  |  {row[3]}  |  {row[4]} - Sem {row[5]}"),
+    "teacher": ("Teachers", lambda row: f"{row[1]}  |  {row[2]}  |  {row[3]}"),
+    "subject": ("Subjects", lambda row: f"{row[1]}  |  {row[2]} - Sem {row[3]}"),
+    "announcement": ("Announcements", lambda row: f"{row[3]}  ({row[2]})"),
+}
+
+
+class GlobalSearch(ctk.CTkFrame):
+    """Search box over students, teachers, subjects and announcements that updates as you type."""
+
+    def __init__(self, parent, limit=5, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.limit = limit
+        self.loader = BackgroundLoader(self)
+        self._pending = None
+
+        self.entry = ctk.CTkEntry(self, width=500, placeholder_text="Search students, teachers, subjects, announcements")
+        self.entry.pack(fill="x", padx=10, pady=10)
+        self.entry.bind("<KeyRelease>", self.on_key)
+
+        self.results_frame = ctk.CTkScrollableFrame(self, fg_color="transparent")
+        self.results_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    def destroy(self):
+        self.loader.cancel_all()
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        super().destroy()
+
+    def on_key(self, event=None):
+        # Only search once typing pauses
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after(DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        self._pending = None
+        text = self.entry.get()
+        self.loader.cancel_all()
+        self.loader.submit(
+            lambda: search_all(text, self.limit),
+            self.show_results,
+            lambda error: print(f"Search failed: {error}"),
+        )
+
+    def show_results(self, results):
+        for widget in self.results_frame.winfo_children():
+            widget.destroy()
+
+        if not any(results.values()):
+            if self.entry.get().strip():
+                ctk.CTkLabel(self.results_frame, text="No matches", text_color="#aaaaaa").pack(anchor="w", pady=5)
+            return
+
+        for kind, (heading, describe) in RESULT_KINDS.items():
+            rows = results.get(kind)
+            if not rows:
+                continue
+            ctk.CTkLabel(self.results_frame, text=heading, font=("Arial", 16, "bold")).pack(anchor="w", pady=(10, 2))
+            for row in rows:
+                ctk.CTkLabel(self.results_frame, text=describe(row), anchor="w", justify="left").pack(
+                    anchor="w", padx=15, pady=1
+                )
@@ -0,0 +1,136 @@
+"""
+Streaming grade export.
+
+Rows are read from an open SQLite cursor CHUNK_SIZE at a time and written
+straight to the output file, CSV with the csv module and XLSX through an
+openpyxl write-only workbook, so memory stays flat however many exams are
+exported. One query covers the whole selection (a list of exams, a
+subject, a semester or everything a teacher teaches), ordered by exam and
+student, so every scope is exported in a single pass.
+
+The writers take a connection and block; run them off the Tk thread.
+"""
+import csv
+import os
+
+from database import connect_db
+
+EXPORT_DIR = "exports"
+
+# Rows fetched from the cursor per round trip
+CHUNK_SIZE = 500
+
+COLUMNS = (
+    "Exam ID", "Exam", "Date", "Subject", "Semester",
+    "Student ID", "Student Name", "Roll Number", "Course",
+    "Marks Obtained", "Total Marks", "Percentage",
+)
+
+EXPORT_QUERY = """
+    SELECT e.exam_id, e.exam_type, e.date, sub.subject_name, sub.semester,
+           s.student_id, s.name, s.roll_number, s.course,
+           g.marks_obtained, g.total_marks,
+           ROUND(g.marks_obtained * 100.0 / NULLIF(g.total_marks, 0), 2)
+    FROM grades g
+    JOIN exams e ON g.exam_id = e.exam_id
+    JOIN subjects sub ON e.subject_id = sub.subject_id
+    JOIN students s ON g.student_id = s.student_id
+    WHERE {where}
+    ORDER BY e.date, e.exam_id, s.name
+"""
+
+FORMATS = {"CSV": ".csv", "Excel": ".xlsx"}
+
+
+def build_query(teacher_id=None, exam_ids=None, subject_id=None, semester=None):
+    """Return (sql, params) selecting grades for any combination of filters."""
+    where, params = [], []
+    if teacher_id is not None:
+        where.append("sub.teacher_id = ?")
+        params.append(teacher_id)
+    if exam_ids is not None:
+        exam_ids = list(exam_ids)
+        where.append(f"e.exam_id IN ({', '.join('?' * len(exam_ids)) or 'NULL'})")
+        params.extend(exam_ids)
+    if subject_id is not None:
+        where.append("e.subject_id = ?")
+        params.append(subject_id)
+    if semester is not None:
+        where.append("sub.semester = ?")
+        params.append(semester)
+    return EXPORT_QUERY.format(where=" AND ".join(where) or "1"), params
+
+
+def iter_chunks(conn, sql, params, chunk_size=CHUNK_SIZE):
+    """Yield lists of at most chunk_size rows; SQLite steps the query as rows are fetched."""
+    cursor = conn.execute(sql, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+
+def write_csv(path, chunks):
+    """Write the header and every chunk to a CSV file; return the number of rows written."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(COLUMNS)
+        for rows in chunks:
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def write_xlsx(path, chunks):
+    """Write the header and every chunk to an XLSX file; return the number of rows written."""
+    from openpyxl import Workbook  # Only Excel exports need it
+
+    # Write-only workbooks stream rows to disk instead of keeping cells in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Grades")
+    sheet.append(COLUMNS)
+    count = 0
+    for rows in chunks:
+        for row in rows:
+            sheet.append(row)
+        count += len(rows)
+    workbook.save(path)
+    return count
+
+
+WRITERS = {"CSV": write_csv, "Excel": write_xlsx}
+
+
+def safe_filename(text):
+    """Turn exam or subject names into a filename fragment."""
+    return str(text).replace(" ", "_").replace(":", "-").replace("/", "-")
+
+
+def export_grades(path, export_format="CSV", conn=None, chunk_size=CHUNK_SIZE, **filters):
+    """
+    Stream the grades selected by filters (see build_query) into path.
+
+    Returns the number of rows written. Nothing is left at path if the
+    export fails or selects no rows.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    sql, params = build_query(**filters)
+    # Write next to the target and rename, so a failed export never leaves half a file
+    partial = f"{path}.partial"
+    try:
+        count = WRITERS[export_format](partial, iter_chunks(conn, sql, params, chunk_size))
+        if count:
+            os.replace(partial, path)
+        return count
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+        if own_conn:
+            conn.close()
@@ -1,6 +1,38 @@
 import customtkinter as ctk
 from tkinter import messagebox
-import sqlite3
+from database import connect_db
+from background import BackgroundLoader
+
+
+def fetch_graded_subjects(student_id):
+    """Names of the subjects the student has grades in."""
+    conn = connect_db()
+    try:
+        subjects = conn.execute("""
+            SELECT DISTINCT subjects.subject_name
+            FROM grades
+            INNER JOIN exams ON grades.exam_id = exams.exam_id
+            INNER JOIN subjects ON exams.subject_id = subjects.subject_id
+            WHERE grades.student_id = ?
+        """, (student_id,)).fetchall()
+    finally:
+        conn.close()
+    return [subject[0] for subject in subjects]
+
+
+def fetch_subject_grades(student_id, subject_name):
+    """The student's (exam_type, marks_obtained, total_marks) in one subject."""
+    conn = connect_db()
+    try:
+        return conn.execute("""
+            SELECT exams.exam_type, grades.marks_obtained, grades.total_marks
+            FROM grades
+            INNER JOIN exams ON grades.exam_id = exams.exam_id
+            INNER JOIN subjects ON exams.subject_id = subjects.subject_id
+            WHERE grades.student_id = ? AND subjects.subject_name = ?
+        """, (student_id, subject_name)).fetchall()
+    finally:
+        conn.close()
 
 
 class StudentGrades(ctk.CTkFrame):
@@ -9,6 +41,7 @@ class StudentGrades(ctk.CTkFrame):
         super().__init__(parent)
         self.student_id = student_id  # Store the logged-in student's ID
         self.pack(fill="both", expand=True)
+        self.loader = BackgroundLoader(self)  # Grades are queried off the Tk thread
         self.create_widgets()
 
     def create_widgets(self):
@@ -49,49 +82,41 @@ class StudentGrades(ctk.CTkFrame):
 
     def load_subjects(self):
         """Load the list of subjects into the dropdown menu."""
-        try:
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT DISTINCT subjects.subject_name
-                FROM grades
-                INNER JOIN exams ON grades.exam_id = exams.exam_id
-                INNER JOIN subjects ON exams.subject_id = subjects.subject_id
-                WHERE grades.student_id = ?
-            """, (self.student_id,))
-            subjects = cursor.fetchall()
-            conn.close()
-
-            subject_list = [subject[0] for subject in subjects]
-            self.subject_menu.configure(values=subject_list)
-            if subject_list:
-                self.subject_menu.set(subject_list[0])  # Set the first subject as default
-                self.load_grades(subject_list[0])  # Load grades for the default subject
-            else:
-                self.subject_menu.set("No Subjects Available")
-                messagebox.showinfo("No Subjects", "No subjects found for this student.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load subjects: {str(e)}")
+        self.loader.cancel_all()
+        self.loader.submit(
+            lambda: fetch_graded_subjects(self.student_id),
+            self.show_subjects,
+            lambda error: messagebox.showerror("Error", f"Failed to load subjects: {str(error)}"),
+        )
+
+    def show_subjects(self, subject_list):
+        # Keep the subject the student was looking at when it is still there
+        selected = self.subject_menu.get()
+        self.subject_menu.configure(values=subject_list)
+        if subject_list:
+            if selected not in subject_list:
+                selected = subject_list[0]  # Set the first subject as default
+            self.subject_menu.set(selected)
+            self.load_grades(selected)  # Load grades for the selected subject
+        else:
+            self.subject_menu.set("No Subjects Available")
+            messagebox.showinfo("No Subjects", "No subjects found for this student.")
 
     def load_grades(self, selected_subject):
         """Load and display the student's grades for the selected subject."""
+        self.loader.cancel_all()  # Only the latest subject is shown
+        self.loader.submit(
+            lambda: fetch_subject_grades(self.student_id, selected_subject),
+            self.show_grades,
+            lambda error: messagebox.showerror("Error", f"Failed to load grades: {str(error)}"),
+        )
+
+    def show_grades(self, grades):
         try:
             # Clear previous grades
             for widget in self.grades_frame.winfo_children():
                 widget.destroy()
 
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT exams.exam_type, grades.marks_obtained, grades.total_marks
-                FROM grades
-                INNER JOIN exams ON grades.exam_id = exams.exam_id
-                INNER JOIN subjects ON exams.subject_id = subjects.subject_id
-                WHERE grades.student_id = ? AND subjects.subject_name = ?
-            """, (self.student_id, selected_subject))
-            grades = cursor.fetchall()
-            conn.close()
-
             if grades:
                 for grade in grades:
                     exam_type, marks_obtained, total_marks = grade
@@ -124,7 +149,7 @@ class StudentGrades(ctk.CTkFrame):
                 )
                 no_grades_label.pack(anchor="center", padx=10, pady=10)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load grades: {str(e)}")
+            messagebox.showerror("Error", f"Failed to display grades: {str(e)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+"""
+Registry of modules that are imported on first use instead of at startup.
+
+Role panels pull in pandas, matplotlib, numpy, tkcalendar and PIL through
+their pages, none of which the login window needs. Code asks the registry
+for a name (load("TeacherPanelApp")) and the module behind it is imported
+the first time, then served from sys.modules. warm() imports names on a
+background thread ahead of time, e.g. the chosen role's panel while the
+"Login Success" box is open.
+"""
+import importlib
+import threading
+import time
+
+# name -> (module, attribute); attribute None means the module itself
+REGISTRY = {
+    # Role panels
+    "EduTrackApp": ("main", "EduTrackApp"),
+    "TeacherPanelApp": ("teacher.teacher_panel", "TeacherPanelApp"),
+    "AdminPanel": ("admin.admin_panel", "AdminPanel"),
+
+    # Teacher pages
+    "TeacherTimetable": ("teacher.teacher_timetable", "TeacherTimetable"),
+    "TeacherAttendance": ("teacher.teacher_attendance", "TeacherAttendance"),
+    "TeacherMeeting": ("teacher.teacher_meeting", "TeacherMeeting"),
+    "TeacherGrades": ("teacher.teacher_grades1", "TeacherGrades"),
+    "TeacherExam": ("teacher.teacher_exam", "TeacherExam"),
+    "TeacherPerformance": ("teacher.teacher_performance", "TeacherPerformance"),
+
+    # Heavy libraries
+    "numpy": ("numpy", None),
+    "pandas": ("pandas", None),
+    "matplotlib": ("matplotlib.figure", None),
+    "PIL": ("PIL.Image", None),
+    "tkcalendar": ("tkcalendar", None),
+}
+
+# Panel to import for each login role
+ROLE_PANELS = {
+    "Student": "EduTrackApp",
+    "Teacher": "TeacherPanelApp",
+    "Admin": "AdminPanel",
+}
+
+# Seconds spent importing each name, for startup reporting
+import_times = {}
+
+_lock = threading.Lock()
+
+
+def load(name):
+    """Return the registered object, importing its module on first use."""
+    module_name, attribute = REGISTRY[name]
+    started = time.perf_counter()
+    # The import system serializes concurrent imports of one module, so a
+    # load() racing a warm() of the same name waits for it instead of re-running it
+    module = importlib.import_module(module_name)
+    with _lock:
+        import_times.setdefault(name, time.perf_counter() - started)
+    return module if attribute is None else getattr(module, attribute)
+
+
+def warm(names):
+    """Import names on a daemon thread; errors are left for the real load() to raise."""
+    def run():
+        for name in names:
+            try:
+                load(name)
+            except Exception as e:
+                print(f"Warm-up of {name} failed: {e}")
+
+    thread = threading.Thread(target=run, name="lazy-import-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -1,12 +1,14 @@
 import customtkinter as ctk
 from tkinter import messagebox
-import sqlite3
-from admin.admin_panel import AdminPanel
-from teacher.teacher_panel import TeacherPanelApp
+from database import connect_db
+import lazy_imports
+
+# Start importing the chosen role's panel while the success message is open
+WARM_PANEL_ON_LOGIN = True
 
 def verify_login(username, password, user_type):
     # Connect to SQLite database
-    conn = sqlite3.connect('edutrack.db')
+    conn = connect_db()
     cursor = conn.cursor()
     
     # Query to check if the user exists and the password matches
@@ -26,6 +28,8 @@ def login():
     
     user_data = verify_login(username, password, user_type)
     if user_data:
+        if WARM_PANEL_ON_LOGIN:
+            lazy_imports.warm([lazy_imports.ROLE_PANELS[user_type]])
         messagebox.showinfo("Login Success", f"Logged in as {user_type}")
         
         if user_type == "Student":
@@ -34,6 +38,7 @@ def login():
             start_teacher_app(user_data)
         elif user_type == "Admin":
             root.destroy()
+            AdminPanel = lazy_imports.load("AdminPanel")  # Imported on first use
             app = AdminPanel()
             app.mainloop()
     else:
@@ -41,12 +46,13 @@ def login():
 
 def start_teacher_app(user_data):
     root.destroy()
+    TeacherPanelApp = lazy_imports.load("TeacherPanelApp")  # Imported on first use
     app = TeacherPanelApp(user_data)
     app.mainloop()
 
 def start_main_app(user_data):
     root.destroy()
-    from main import EduTrackApp  
+    EduTrackApp = lazy_imports.load("EduTrackApp")  # Imported on first use
     app = EduTrackApp(user_data)
     app.mainloop()
 
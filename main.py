@@ -1,12 +1,16 @@
 import customtkinter as ctk
 from sidebar import create_sidebar
-from attendance import show_attendance
+from attendance import render_attendance
 from exams import StudentExam
 from timetable import StudentTimetable
+from timetable_engine import TIMETABLE_TABLES
 from grades import StudentGrades
 from meeting import StudentMeeting
-from dashboard import show_dashboard
-from settings import create_settings  # Updated settings import
+from dashboard import load_dashboard, render_dashboard
+from database import fetch_attendance_summary
+from background import BackgroundLoader, show_skeleton
+from view_manager import ViewManager
+from settings import load_settings, render_settings
 from auth import logout
 import sqlite3
 from tkinter import messagebox  # For logout confirmation dialogs
@@ -21,6 +25,9 @@ class EduTrackApp(ctk.CTk):
 
         self.user_data = user_data
 
+        # Runs page queries off the Tk thread
+        self.loader = BackgroundLoader(self)
+
         # Grid configuration
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -29,6 +36,9 @@ class EduTrackApp(ctk.CTk):
         self.content_frame = ctk.CTkFrame(self)
         self.content_frame.grid(row=0, column=1, sticky="nsew")
 
+        # Built pages are kept and re-shown instead of rebuilt on every click
+        self.views = ViewManager(self.content_frame)
+
         # Create Sidebar with proper function calls
         self.sidebar = create_sidebar(
             self,
@@ -47,30 +57,65 @@ class EduTrackApp(ctk.CTk):
 
     def navigate(self, page):
         """Navigate to the selected page."""
-        # Clear existing content
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        if page == "logout":
+            self.logout_confirmation()
+            return
 
-        # Load the selected page
+        # Drop any load still running for the page we are leaving; that page
+        # only holds a skeleton now, so it must reload next time
+        if self.loader.cancel_all() and self.views.current is not None:
+            self.views.invalidate(self.views.current)
+
+        # Show the selected page, building it the first time it is opened;
+        # when its tables change, its data is reloaded in place
+        student_id = self.user_data[4]
         if page == "dashboard":
-            show_dashboard(self.content_frame, self.user_data)
+            self.show_page(
+                page, lambda: load_dashboard(student_id), render_dashboard,
+                tables=("students", "photostudent", "announcements", "exams", "attendance", "subjects"),
+            )
         elif page == "attendance":
-            show_attendance(self.content_frame, self.user_data)
+            self.show_page(page, lambda: fetch_attendance_summary(student_id), render_attendance,
+                           tables=("attendance", "subjects"))
         elif page == "exams":
-            StudentExam(self.content_frame)
+            self.views.show(page, StudentExam, tables=("exams", "subjects"), refresh=lambda view: view.refresh())
         elif page == "timetable":
-            StudentTimetable(self.content_frame)
+            self.views.show(page, lambda host: StudentTimetable(host, student_id), tables=TIMETABLE_TABLES,
+                            refresh=lambda view: view.load_timetable())
         elif page == "grades":
-            StudentGrades(self.content_frame, self.user_data[4])
+            self.views.show(page, lambda host: StudentGrades(host, student_id),
+                            tables=("grades", "exams", "subjects"), refresh=lambda view: view.load_subjects())
         elif page == "meeting":
-            StudentMeeting(self.content_frame)
-        elif page == "settings": 
-            create_settings(self.content_frame, self.user_data)
-        elif page == "logout":
-            self.logout_confirmation()
+            self.views.show(page, StudentMeeting, tables=("meetings",),
+                            refresh=lambda view: view.load_all_meetings(view.filter_date))
+        elif page == "settings":
+            user_id = self.user_data[0]
+            self.show_page(page, lambda: load_settings(user_id), render_settings, tables=("users", "students"))
         else:
             raise ValueError(f"Unknown page: {page}")
 
+    def show_page(self, page, load, render, tables):
+        """Show a page rendered from load(); a refresh keeps it on screen until the new data arrives."""
+        self.views.show(
+            page,
+            lambda host: self.load_page(host, load, render),
+            tables=tables,
+            refresh=lambda host: self.reload_page(host, load, render),
+        )
+
+    def load_page(self, host, load, render):
+        """Show a skeleton right away and render the page once load() finishes in the background."""
+        show_skeleton(host)
+        self.reload_page(host, load, render)
+        return host
+
+    def reload_page(self, host, load, render):
+        self.loader.submit(
+            load,
+            lambda data: render(host, data),
+            lambda error: messagebox.showerror("Error", f"Failed to load page: {error}"),
+        )
+
     def logout_confirmation(self):
         if messagebox.askyesno("Logout", "Are you sure you want to log out?"):
             self.quit()  # Close the app
@@ -0,0 +1,74 @@
+"""
+Maintenance commands for edutrack.db's derived tables.
+
+    python maintenance.py verify-attendance-summary
+    python maintenance.py rebuild-attendance-summary
+    python maintenance.py pack-attendance
+    python maintenance.py rebuild-search-index
+    python maintenance.py prune-changes
+"""
+import argparse
+import sys
+
+from database import pack_attendance, rebuild_attendance_summary, verify_attendance_summary
+from search import rebuild_search_indexes
+from change_log import KEEP_DAYS, prune_changes
+
+
+def verify_summary(args):
+    mismatches = verify_attendance_summary()
+    if not mismatches:
+        print("attendance_summary is consistent with attendance.")
+        return 0
+    print(f"attendance_summary has {len(mismatches)} mismatched (student_id, subject_id) pairs:")
+    for student_id, subject_id in mismatches[:20]:
+        print(f"  student {student_id}, subject {subject_id}")
+    print("Run 'python maintenance.py rebuild-attendance-summary' to fix it.")
+    return 1
+
+
+def rebuild_summary(args):
+    rows = rebuild_attendance_summary()
+    print(f"Rebuilt attendance_summary: {rows} rows.")
+    return 0
+
+
+def pack(args):
+    stats = pack_attendance()
+    print(
+        f"Packed {stats['log_rows']} attendance rows into {stats['bitmaps']} bitmaps "
+        f"over {stats['sessions']} sessions ({stats['bitmap_bytes']} bytes of bitsets)."
+    )
+    return 0
+
+
+def rebuild_search(args):
+    indexes = rebuild_search_indexes()
+    print(f"Rebuilt {len(indexes)} search indexes: {', '.join(indexes)}.")
+    return 0
+
+
+def prune(args):
+    removed = prune_changes()
+    print(f"Removed {removed} change log entries older than {KEEP_DAYS} days.")
+    return 0
+
+
+COMMANDS = {
+    "verify-attendance-summary": verify_summary,
+    "rebuild-attendance-summary": rebuild_summary,
+    "pack-attendance": pack,
+    "rebuild-search-index": rebuild_search,
+    "prune-changes": prune,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
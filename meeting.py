@@ -1,14 +1,37 @@
 import customtkinter as ctk
 from tkinter import messagebox
-import sqlite3
+from database import connect_db
+from background import BackgroundLoader
 import webbrowser
 from tkcalendar import DateEntry  # For date filtering
 
 
+def fetch_all_meetings(filter_date=None):
+    """Meetings as (meeting_id, date, time, purpose, link, teacher_id), optionally on one date."""
+    conn = connect_db()
+    try:
+        if filter_date:
+            return conn.execute("""
+                SELECT meeting_id, date, time, purpose, link, teacher_id
+                FROM meetings
+                WHERE date = ?
+                ORDER BY date, time
+            """, (filter_date,)).fetchall()
+        return conn.execute("""
+            SELECT meeting_id, date, time, purpose, link, teacher_id
+            FROM meetings
+            ORDER BY date, time
+        """).fetchall()
+    finally:
+        conn.close()
+
+
 class StudentMeeting(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent)
         self.pack(fill="both", expand=True)  # Ensure the frame fills the parent area
+        self.loader = BackgroundLoader(self)  # Meetings are queried off the Tk thread
+        self.filter_date = None
         self.create_widgets()
 
     def create_widgets(self):
@@ -49,32 +72,20 @@ class StudentMeeting(ctk.CTkFrame):
 
     def load_all_meetings(self, filter_date=None):
         """Load and display all scheduled meetings."""
+        self.filter_date = filter_date
+        self.loader.cancel_all()  # Only the latest filter is shown
+        self.loader.submit(
+            lambda: fetch_all_meetings(filter_date),
+            self.show_meetings,
+            lambda error: messagebox.showerror("Error", f"Failed to load meetings: {str(error)}"),
+        )
+
+    def show_meetings(self, meetings):
         try:
             # Clear previous meeting entries
             for widget in self.meetings_frame.winfo_children():
                 widget.destroy()
 
-            # Connect to the database and fetch meetings
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-
-            if filter_date:
-                cursor.execute("""
-                    SELECT meeting_id, date, time, purpose, link, teacher_id
-                    FROM meetings
-                    WHERE date = ?
-                    ORDER BY date, time
-                """, (filter_date,))
-            else:
-                cursor.execute("""
-                    SELECT meeting_id, date, time, purpose, link, teacher_id
-                    FROM meetings
-                    ORDER BY date, time
-                """)
-            
-            meetings = cursor.fetchall()
-            conn.close()
-
             # Display the meetings
             if meetings:
                 for meeting in meetings:
@@ -108,7 +119,7 @@ class StudentMeeting(ctk.CTkFrame):
                 )
                 no_meeting_label.pack(anchor="center", padx=10, pady=10)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load meetings: {str(e)}")
+            messagebox.showerror("Error", f"Failed to display meetings: {str(e)}")
 
     def filter_meetings(self):
         """Filter meetings by the selected date."""
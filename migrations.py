@@ -0,0 +1,619 @@
+"""
+Versioned schema migrations for edutrack.db.
+
+The schema version is tracked with SQLite's PRAGMA user_version. Each
+migration runs inside its own write transaction and bumps the version, so
+running migrate() again (or from a second process at the same time) is a
+no-op once the database is current.
+"""
+import sqlite3
+
+# Tables whose writes bump a counter in table_versions so cached views and
+# query results can tell when their data changed, even across processes
+VERSIONED_TABLES = [
+    "students", "teachers", "subjects", "attendance", "exams", "grades",
+    "meetings", "announcements", "users", "photostudent", "phototeacher", "timetable",
+]
+
+
+def _table_version_statements():
+    statements = [
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+    ]
+    for table in VERSIONED_TABLES:
+        statements.append(f"INSERT OR IGNORE INTO table_versions (table_name) VALUES ('{table}')")
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            statements.append(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            """)
+    return statements
+
+
+# Students are enrolled in every subject of their course and semester.
+# Course names are typed by hand, so they are matched case-insensitively.
+ENROLLMENT_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS enrollments (
+        student_id INTEGER NOT NULL,
+        subject_id INTEGER NOT NULL,
+        PRIMARY KEY (student_id, subject_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_enrollments_subject_student ON enrollments (subject_id, student_id)",
+    "CREATE INDEX IF NOT EXISTS idx_students_semester_course ON students (semester, course COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_subjects_semester_course ON subjects (semester, course COLLATE NOCASE)",
+    """
+    INSERT OR IGNORE INTO enrollments (student_id, subject_id)
+    SELECT students.student_id, subjects.subject_id
+    FROM students JOIN subjects
+        ON subjects.semester = students.semester AND subjects.course = students.course COLLATE NOCASE
+    """,
+    # Keep enrollments in step with the students and subjects tables
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_students_insert_enroll AFTER INSERT ON students
+    BEGIN
+        INSERT OR IGNORE INTO enrollments (student_id, subject_id)
+        SELECT NEW.student_id, subject_id FROM subjects
+        WHERE subjects.semester = NEW.semester AND subjects.course = NEW.course COLLATE NOCASE;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_students_update_enroll AFTER UPDATE OF course, semester ON students
+    BEGIN
+        DELETE FROM enrollments WHERE student_id = OLD.student_id;
+        INSERT OR IGNORE INTO enrollments (student_id, subject_id)
+        SELECT NEW.student_id, subject_id FROM subjects
+        WHERE subjects.semester = NEW.semester AND subjects.course = NEW.course COLLATE NOCASE;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_students_delete_enroll AFTER DELETE ON students
+    BEGIN
+        DELETE FROM enrollments WHERE student_id = OLD.student_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_subjects_insert_enroll AFTER INSERT ON subjects
+    BEGIN
+        INSERT OR IGNORE INTO enrollments (student_id, subject_id)
+        SELECT student_id, NEW.subject_id FROM students
+        WHERE students.semester = NEW.semester AND students.course = NEW.course COLLATE NOCASE;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_subjects_update_enroll AFTER UPDATE OF course, semester ON subjects
+    BEGIN
+        DELETE FROM enrollments WHERE subject_id = OLD.subject_id;
+        INSERT OR IGNORE INTO enrollments (student_id, subject_id)
+        SELECT student_id, NEW.subject_id FROM students
+        WHERE students.semester = NEW.semester AND students.course = NEW.course COLLATE NOCASE;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_subjects_delete_enroll AFTER DELETE ON subjects
+    BEGIN
+        DELETE FROM enrollments WHERE subject_id = OLD.subject_id;
+    END
+    """,
+]
+
+# Percentage score of a grade row, 0 when total_marks is missing or zero
+_PCT = "COALESCE({row}.marks_obtained * 100.0 / NULLIF({row}.total_marks, 0), 0)"
+
+# Per-exam running count, sum and sum of squares of percentage scores, kept
+# current by triggers on grades so mean and variance never need a full scan.
+# Median and percentiles cannot be maintained that way; they are recomputed
+# by database.refresh_exam_percentiles() whenever percentiles_stale is set.
+EXAM_STATS_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS exam_stats (
+        exam_id INTEGER PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0,
+        total REAL NOT NULL DEFAULT 0,
+        total_sq REAL NOT NULL DEFAULT 0,
+        p25 REAL,
+        median REAL,
+        p75 REAL,
+        p90 REAL,
+        percentiles_stale INTEGER NOT NULL DEFAULT 1
+    )
+    """,
+    f"""
+    INSERT OR REPLACE INTO exam_stats (exam_id, count, total, total_sq)
+    SELECT exam_id, COUNT(*), SUM({_PCT.format(row="grades")}), SUM({_PCT.format(row="grades")} * {_PCT.format(row="grades")})
+    FROM grades
+    WHERE exam_id IS NOT NULL
+    GROUP BY exam_id
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_grades_insert_stats AFTER INSERT ON grades
+    WHEN NEW.exam_id IS NOT NULL
+    BEGIN
+        INSERT OR IGNORE INTO exam_stats (exam_id) VALUES (NEW.exam_id);
+        UPDATE exam_stats
+        SET count = count + 1,
+            total = total + {_PCT.format(row="NEW")},
+            total_sq = total_sq + {_PCT.format(row="NEW")} * {_PCT.format(row="NEW")},
+            percentiles_stale = 1
+        WHERE exam_id = NEW.exam_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_grades_delete_stats AFTER DELETE ON grades
+    WHEN OLD.exam_id IS NOT NULL
+    BEGIN
+        UPDATE exam_stats
+        SET count = count - 1,
+            total = total - {_PCT.format(row="OLD")},
+            total_sq = total_sq - {_PCT.format(row="OLD")} * {_PCT.format(row="OLD")},
+            percentiles_stale = 1
+        WHERE exam_id = OLD.exam_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_grades_update_stats AFTER UPDATE OF exam_id, marks_obtained, total_marks ON grades
+    BEGIN
+        UPDATE exam_stats
+        SET count = count - 1,
+            total = total - {_PCT.format(row="OLD")},
+            total_sq = total_sq - {_PCT.format(row="OLD")} * {_PCT.format(row="OLD")},
+            percentiles_stale = 1
+        WHERE exam_id = OLD.exam_id;
+        INSERT OR IGNORE INTO exam_stats (exam_id) SELECT NEW.exam_id WHERE NEW.exam_id IS NOT NULL;
+        UPDATE exam_stats
+        SET count = count + 1,
+            total = total + {_PCT.format(row="NEW")},
+            total_sq = total_sq + {_PCT.format(row="NEW")} * {_PCT.format(row="NEW")},
+            percentiles_stale = 1
+        WHERE exam_id = NEW.exam_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_exams_delete_stats AFTER DELETE ON exams
+    BEGIN
+        DELETE FROM exam_stats WHERE exam_id = OLD.exam_id;
+    END
+    """,
+    # Mean and population variance of percentage scores; stddev is sqrt(variance)
+    """
+    CREATE VIEW IF NOT EXISTS exam_statistics AS
+    SELECT exam_id, count,
+           CASE WHEN count > 0 THEN total / count END AS mean,
+           CASE WHEN count > 0 THEN MAX(total_sq / count - (total / count) * (total / count), 0) END AS variance,
+           p25, median, p75, p90, percentiles_stale
+    FROM exam_stats
+    """,
+]
+
+# Migration 11 replaces the grade triggers above. They created the exam's
+# stats row with INSERT OR IGNORE, but the ON CONFLICT clause of save_grades'
+# upsert overrides the conflict policy of statements in the triggers it
+# fires, so resubmitting an exam failed on exam_stats.exam_id. A NOT EXISTS
+# guard does not depend on the conflict policy.
+_ENSURE_EXAM_STATS = (
+    "INSERT INTO exam_stats (exam_id) SELECT NEW.exam_id WHERE NEW.exam_id IS NOT NULL "
+    "AND NOT EXISTS (SELECT 1 FROM exam_stats WHERE exam_id = NEW.exam_id);"
+)
+
+GRADES_INSERT_STATS_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS trg_grades_insert_stats AFTER INSERT ON grades
+    WHEN NEW.exam_id IS NOT NULL
+    BEGIN
+        {_ENSURE_EXAM_STATS}
+        UPDATE exam_stats
+        SET count = count + 1,
+            total = total + {_PCT.format(row="NEW")},
+            total_sq = total_sq + {_PCT.format(row="NEW")} * {_PCT.format(row="NEW")},
+            percentiles_stale = 1
+        WHERE exam_id = NEW.exam_id;
+    END
+"""
+
+GRADES_UPDATE_STATS_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS trg_grades_update_stats AFTER UPDATE OF exam_id, marks_obtained, total_marks ON grades
+    BEGIN
+        UPDATE exam_stats
+        SET count = count - 1,
+            total = total - {_PCT.format(row="OLD")},
+            total_sq = total_sq - {_PCT.format(row="OLD")} * {_PCT.format(row="OLD")},
+            percentiles_stale = 1
+        WHERE exam_id = OLD.exam_id;
+        {_ENSURE_EXAM_STATS}
+        UPDATE exam_stats
+        SET count = count + 1,
+            total = total + {_PCT.format(row="NEW")},
+            total_sq = total_sq + {_PCT.format(row="NEW")} * {_PCT.format(row="NEW")},
+            percentiles_stale = 1
+        WHERE exam_id = NEW.exam_id;
+    END
+"""
+
+# Present/total counts per student per subject, updated by triggers in the
+# same transaction as every attendance write. Only Present and Absent marks
+# count towards the total.
+ATTENDANCE_SUMMARY_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS attendance_summary (
+        student_id INTEGER NOT NULL,
+        subject_id INTEGER NOT NULL,
+        present INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (student_id, subject_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_attendance_summary_subject ON attendance_summary (subject_id)",
+    """
+    INSERT OR REPLACE INTO attendance_summary (student_id, subject_id, present, total)
+    SELECT student_id, subject_id, SUM(status = 'Present'), COUNT(*)
+    FROM attendance
+    WHERE status IN ('Present', 'Absent') AND student_id IS NOT NULL AND subject_id IS NOT NULL
+    GROUP BY student_id, subject_id
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_attendance_insert_summary AFTER INSERT ON attendance
+    WHEN NEW.status IN ('Present', 'Absent')
+    BEGIN
+        INSERT INTO attendance_summary (student_id, subject_id, present, total)
+        VALUES (NEW.student_id, NEW.subject_id, NEW.status = 'Present', 1)
+        ON CONFLICT (student_id, subject_id) DO UPDATE SET
+            present = present + excluded.present,
+            total = total + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_attendance_delete_summary AFTER DELETE ON attendance
+    WHEN OLD.status IN ('Present', 'Absent')
+    BEGIN
+        UPDATE attendance_summary
+        SET present = present - (OLD.status = 'Present'), total = total - 1
+        WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_attendance_update_summary
+    AFTER UPDATE OF student_id, subject_id, status ON attendance
+    BEGIN
+        UPDATE attendance_summary
+        SET present = present - (OLD.status = 'Present'), total = total - 1
+        WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id
+            AND OLD.status IN ('Present', 'Absent');
+        INSERT INTO attendance_summary (student_id, subject_id, present, total)
+        SELECT NEW.student_id, NEW.subject_id, NEW.status = 'Present', 1
+        WHERE NEW.status IN ('Present', 'Absent')
+        ON CONFLICT (student_id, subject_id) DO UPDATE SET
+            present = present + excluded.present,
+            total = total + 1;
+    END
+    """,
+]
+
+# Migration 14 replaces the attendance_summary triggers above: attendance
+# allows a NULL student_id or subject_id, which the summary's NOT NULL key
+# rejected, failing the attendance write itself. Such marks are not counted,
+# as in the backfill.
+ATTENDANCE_INSERT_SUMMARY_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS trg_attendance_insert_summary AFTER INSERT ON attendance
+    WHEN NEW.status IN ('Present', 'Absent') AND NEW.student_id IS NOT NULL AND NEW.subject_id IS NOT NULL
+    BEGIN
+        INSERT INTO attendance_summary (student_id, subject_id, present, total)
+        VALUES (NEW.student_id, NEW.subject_id, NEW.status = 'Present', 1)
+        ON CONFLICT (student_id, subject_id) DO UPDATE SET
+            present = present + excluded.present,
+            total = total + 1;
+    END
+"""
+
+ATTENDANCE_DELETE_SUMMARY_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS trg_attendance_delete_summary AFTER DELETE ON attendance
+    WHEN OLD.status IN ('Present', 'Absent') AND OLD.student_id IS NOT NULL AND OLD.subject_id IS NOT NULL
+    BEGIN
+        UPDATE attendance_summary
+        SET present = present - (OLD.status = 'Present'), total = total - 1
+        WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id;
+    END
+"""
+
+# The old row and the new one are guarded separately: moving a mark to a
+# NULL student or subject still takes it off the old counts
+ATTENDANCE_UPDATE_SUMMARY_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS trg_attendance_update_summary
+    AFTER UPDATE OF student_id, subject_id, status ON attendance
+    BEGIN
+        UPDATE attendance_summary
+        SET present = present - (OLD.status = 'Present'), total = total - 1
+        WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id
+            AND OLD.status IN ('Present', 'Absent');
+        INSERT INTO attendance_summary (student_id, subject_id, present, total)
+        SELECT NEW.student_id, NEW.subject_id, NEW.status = 'Present', 1
+        WHERE NEW.status IN ('Present', 'Absent') AND NEW.student_id IS NOT NULL AND NEW.subject_id IS NOT NULL
+        ON CONFLICT (student_id, subject_id) DO UPDATE SET
+            present = present + excluded.present,
+            total = total + 1;
+    END
+"""
+
+# Full-text indexes: fts table -> (source table, its rowid column, indexed columns).
+# They are external-content FTS5 tables, so the text is stored only once, in
+# the source table, and triggers keep the index in step with every write.
+# announcements.id is not a rowid alias (and is mostly NULL), so that index is
+# keyed on the implicit rowid.
+SEARCH_INDEXES = {
+    "search_announcements": ("announcements", "rowid", ["announcement_text"]),
+    "search_subjects": ("subjects", "subject_id", ["subject_name", "course"]),
+    "search_students": ("students", "student_id", ["name", "roll_number", "email"]),
+    "search_teachers": ("teachers", "teacher_id", ["name", "email", "department"]),
+}
+
+
+def _search_index_statements():
+    statements = []
+    for fts, (table, rowid, columns) in SEARCH_INDEXES.items():
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"NEW.{column}" for column in columns)
+        old_values = ", ".join(f"OLD.{column}" for column in columns)
+        # prefix='2 3' adds prefix indexes so short "abc*" queries avoid a full term scan
+        statements.append(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {column_list},
+                content='{table}', content_rowid='{rowid}',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+        statements.append(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+        statements.append(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_insert_search AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.{rowid}, {new_values});
+            END
+        """)
+        statements.append(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_delete_search AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', OLD.{rowid}, {old_values});
+            END
+        """)
+        statements.append(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_update_search AFTER UPDATE ON {table}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', OLD.{rowid}, {old_values});
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.{rowid}, {new_values});
+            END
+        """)
+    return statements
+
+
+# Tables whose row changes are logged for the change feed (see change_feed.py):
+# table -> (row key column, subscription key column or None). Views subscribe
+# by table and subscription key, e.g. grades of one exam or one teacher's meetings.
+CHANGE_TABLES = {
+    "announcements": ("rowid", None),
+    "grades": ("grade_id", "exam_id"),
+    "meetings": ("meeting_id", "teacher_id"),
+}
+
+
+def _change_log_statements():
+    statements = [
+        """
+        CREATE TABLE IF NOT EXISTS changes (
+            change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_key INTEGER,
+            scope_key INTEGER,
+            op TEXT NOT NULL,
+            changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]
+    for table, (row_key, scope_key) in CHANGE_TABLES.items():
+        new_scope = f"NEW.{scope_key}" if scope_key else "NULL"
+        old_scope = f"OLD.{scope_key}" if scope_key else "NULL"
+        log = "INSERT INTO changes (table_name, row_key, scope_key, op)"
+        statements.append(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_insert_change AFTER INSERT ON {table}
+            BEGIN
+                {log} VALUES ('{table}', NEW.{row_key}, {new_scope}, 'insert');
+            END
+        """)
+        statements.append(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_delete_change AFTER DELETE ON {table}
+            BEGIN
+                {log} VALUES ('{table}', OLD.{row_key}, {old_scope}, 'delete');
+            END
+        """)
+        # A row moved to another key is a delete for subscribers of the old one
+        statements.append(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_update_change AFTER UPDATE ON {table}
+            BEGIN
+                {log} SELECT '{table}', OLD.{row_key}, {old_scope}, 'delete'
+                    WHERE OLD.{row_key} IS NOT NEW.{row_key} OR {old_scope} IS NOT {new_scope};
+                {log} VALUES ('{table}', NEW.{row_key}, {new_scope}, 'update');
+            END
+        """)
+    return statements
+
+
+# The IT semester 4 timetable the timetable screens used to hard-code, one
+# list of slots per period: (subject_name, room) for lectures, plain text
+# for labelled slots without a subject (remedial lectures, batch practicals),
+# which are shown on every grid.
+_LEGACY_PERIODS = [
+    ("08:30", "09:30"), ("09:30", "10:30"), ("10:30", "11:30"), ("11:30", "12:30"),
+    ("13:30", "14:30"), ("14:30", "15:30"), ("15:30", "16:30"),
+]
+_LEGACY_LABS = {
+    "Monday": ["S21 UL AK (1003)", "S22 PL NRJ (1003)", "S23 PL ABK (1004)"],
+    "Tuesday": ["S21 MPL MI (906)", "S22 NL SKP (1003)", "S23 MPL ABM (906)"],
+    "Wednesday": ["S21 PL SP (1003)", "S22 UL AK (1003)", "S23 NL SKP (1004)"],
+    "Thursday": ["S21 NL SKP (1003)", "S22 PL NRJ (1004)", "S23 PL ABK (1004)"],
+    "Friday": ["S21 PL SP (1004)", "S22 MPL RM (906)", "S23 UL AK (1003)"],
+}
+_LEGACY_TIMETABLE = {
+    "Monday": [["Remedial Lecture"], ["Remedial Lecture"], [("EM 4", "1001")], [("AT", "1001")],
+               [("OS", "1001")], _LEGACY_LABS["Monday"], _LEGACY_LABS["Monday"]],
+    "Tuesday": [["Remedial Lecture"], ["Mini Project Meet"], _LEGACY_LABS["Tuesday"], _LEGACY_LABS["Tuesday"],
+                [("COA", "1104")], [("EM 4", "1001")], [("CNND", "1001")]],
+    "Wednesday": [["Remedial Lecture"], ["Mini Project Meet"], [("CNND", "1104")], [("AT", "1104")],
+                  [("COA", "1104")], _LEGACY_LABS["Wednesday"], _LEGACY_LABS["Wednesday"]],
+    "Thursday": [["Remedial Lecture"], ["EM-IV Tutorial"], _LEGACY_LABS["Thursday"], _LEGACY_LABS["Thursday"],
+                 [("CNND", "1104")], [("EM 4", "1104")], [("OS", "1104")]],
+    "Friday": [["EM-IV Tutorial"], ["EM-IV Tutorial"], [("AT", "1001")], [("OS", "1001")],
+               [("COA", "1104")], _LEGACY_LABS["Friday"], _LEGACY_LABS["Friday"]],
+}
+
+
+def _sql_text(value):
+    return "NULL" if value is None else "'" + str(value).replace("'", "''") + "'"
+
+
+def _timetable_statements():
+    values = []
+    for day, periods in _LEGACY_TIMETABLE.items():
+        for (start, end), slots in zip(_LEGACY_PERIODS, periods):
+            for slot in slots:
+                subject, room, label = (slot[0], slot[1], None) if isinstance(slot, tuple) else (None, None, slot)
+                values.append(f"({', '.join(_sql_text(v) for v in (subject, day, start, end, room, label))})")
+    return [
+        "ALTER TABLE timetable ADD COLUMN room TEXT",
+        # Shown instead of a subject for slots that have none
+        "ALTER TABLE timetable ADD COLUMN label TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_timetable_day_start ON timetable (day_of_week, start_time)",
+        "CREATE INDEX IF NOT EXISTS idx_timetable_subject ON timetable (subject_id)",
+        # Move the hard-coded grid into the table, unless it already holds a
+        # real timetable or the subjects it refers to do not exist
+        f"""
+        WITH legacy (subject_name, day_of_week, start_time, end_time, room, label) AS (
+            VALUES {", ".join(values)}
+        )
+        INSERT INTO timetable (subject_id, day_of_week, start_time, end_time, room, label)
+        SELECT s.subject_id, l.day_of_week, l.start_time, l.end_time, l.room, l.label
+        FROM legacy l
+        LEFT JOIN subjects s ON s.subject_name = l.subject_name AND s.course = 'IT' AND s.semester = 4
+        WHERE (l.subject_name IS NULL OR s.subject_id IS NOT NULL)
+          AND NOT EXISTS (SELECT 1 FROM timetable t JOIN subjects USING (subject_id))
+          AND EXISTS (SELECT 1 FROM subjects WHERE course = 'IT' AND semester = 4)
+        """,
+    ]
+
+
+# (version, description, statements) in the order they must be applied
+MIGRATIONS = [
+    (1, "Indexes for the hot query predicates", [
+        "CREATE INDEX IF NOT EXISTS idx_attendance_student_subject_status ON attendance (student_id, subject_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_grades_exam ON grades (exam_id)",
+        "CREATE INDEX IF NOT EXISTS idx_exams_subject_date ON exams (subject_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_exams_date ON exams (date)",
+        "CREATE INDEX IF NOT EXISTS idx_meetings_teacher_date_time ON meetings (teacher_id, date, time)",
+        "CREATE INDEX IF NOT EXISTS idx_announcements_created_at ON announcements (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_subjects_teacher ON subjects (teacher_id)",
+    ]),
+    (2, "One grade per student per exam, one attendance mark per student per subject per day", [
+        # Resubmissions used to insert extra rows; keep only the latest one
+        """
+        DELETE FROM grades WHERE grade_id NOT IN (
+            SELECT MAX(grade_id) FROM grades GROUP BY student_id, exam_id
+        )
+        """,
+        """
+        DELETE FROM attendance WHERE attendance_id NOT IN (
+            SELECT MAX(attendance_id) FROM attendance GROUP BY student_id, subject_id, date
+        )
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_grades_student_exam ON grades (student_id, exam_id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_attendance_student_subject_date ON attendance (student_id, subject_id, date)",
+    ]),
+    (3, "Recent attendance lookup for the dashboard snapshot", [
+        "CREATE INDEX IF NOT EXISTS idx_attendance_student_date ON attendance (student_id, date)",
+    ]),
+    (4, "Per-table write counters maintained by triggers", _table_version_statements()),
+    (5, "Per-subject attendance aggregate for the teacher roster", [
+        "CREATE INDEX IF NOT EXISTS idx_attendance_subject_student_status ON attendance (subject_id, student_id, status)",
+    ]),
+    (6, "Student-to-subject enrollments derived from course and semester", ENROLLMENT_STATEMENTS),
+    (7, "Per-exam score statistics maintained from grades", EXAM_STATS_STATEMENTS),
+    (8, "Per-student, per-subject attendance counts maintained from attendance", ATTENDANCE_SUMMARY_STATEMENTS),
+    (9, "Compact bitmap attendance storage (see attendance_bitmap.py)", [
+        """
+        CREATE TABLE IF NOT EXISTS attendance_sessions (
+            subject_id INTEGER NOT NULL,
+            term TEXT NOT NULL,
+            session_no INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            PRIMARY KEY (subject_id, term, session_no),
+            UNIQUE (subject_id, date)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS attendance_bitmaps (
+            student_id INTEGER NOT NULL,
+            subject_id INTEGER NOT NULL,
+            term TEXT NOT NULL,
+            marked BLOB NOT NULL,
+            present BLOB NOT NULL,
+            PRIMARY KEY (student_id, subject_id, term)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_attendance_bitmaps_subject_term ON attendance_bitmaps (subject_id, term)",
+    ]),
+    (10, "FTS5 search over announcements, subjects, students and teachers", _search_index_statements()),
+    (11, "Exam stats triggers that survive grade upserts", [
+        "DROP TRIGGER IF EXISTS trg_grades_insert_stats",
+        GRADES_INSERT_STATS_TRIGGER,
+        "DROP TRIGGER IF EXISTS trg_grades_update_stats",
+        GRADES_UPDATE_STATS_TRIGGER,
+    ]),
+    (12, "Change log written by triggers for the change feed", _change_log_statements()),
+    (13, "Timetable rooms and labels, indexed by slot and subject", _timetable_statements()),
+    (14, "Attendance summary triggers that skip marks without a student or subject", [
+        "DROP TRIGGER IF EXISTS trg_attendance_insert_summary",
+        ATTENDANCE_INSERT_SUMMARY_TRIGGER,
+        "DROP TRIGGER IF EXISTS trg_attendance_delete_summary",
+        ATTENDANCE_DELETE_SUMMARY_TRIGGER,
+        "DROP TRIGGER IF EXISTS trg_attendance_update_summary",
+        ATTENDANCE_UPDATE_SUMMARY_TRIGGER,
+    ]),
+]
+
+
+def current_version(conn):
+    """Return the schema version recorded in the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every pending migration and return the resulting schema version"""
+    # Nothing to migrate until testing.py has created the base schema
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'attendance'").fetchone():
+        return current_version(conn)
+
+    for version, description, statements in MIGRATIONS:
+        if current_version(conn) >= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-check under the write lock in case another process got here first
+            if current_version(conn) < version:
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+    return current_version(conn)
+
+
+if __name__ == "__main__":
+    from teacher.db_manager import DB_PATH
+
+    conn = sqlite3.connect(DB_PATH)
+    print(f"edutrack.db schema version: {migrate(conn)}")
+    conn.close()
@@ -0,0 +1,124 @@
+"""
+Read-through cache for query results that rarely change.
+
+    rows = query_cache.cached_query(conn, sql, params, tables=("subjects",))
+
+Results are keyed by the SQL text and its parameters. Each entry remembers
+the table_versions counters (migration 4) of the tables it was read from;
+the triggers bump those on every write, from any process, so a lookup
+whose tables moved on runs the query again instead of serving stale rows.
+Checking costs one primary-key read of table_versions instead of the
+query itself.
+
+Entries are evicted least recently used first once there are more than
+MAX_ENTRIES of them or they hold more than MAX_ROWS rows between them.
+stats() reports hits, misses, stale entries and evictions.
+"""
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Bounds on what the cache keeps in memory
+MAX_ENTRIES = 256
+MAX_ROWS = 50000
+
+
+class QueryCache:
+    def __init__(self, max_entries=MAX_ENTRIES, max_rows=MAX_ROWS):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries = OrderedDict()  # key -> (versions, rows)
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def query(self, conn, sql, params=(), tables=()):
+        """Return the rows of sql, from the cache while none of tables has been written to."""
+        key = (" ".join(sql.split()), tuple(params))
+        versions = _table_versions(conn, tables)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if versions is not None and entry[0] == versions:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(entry[1])
+                self.stale += 1
+                self._remove(key)
+            self.misses += 1
+
+        # Versions were read first, so a write landing now only makes the entry stale early
+        rows = conn.execute(sql, params).fetchall()
+        if versions is not None and len(rows) <= self.max_rows:
+            with self._lock:
+                self._remove(key)
+                self._entries[key] = (versions, rows)
+                self._rows += len(rows)
+                self._evict()
+        return list(rows)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "rows": self._rows,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._rows -= len(entry[1])
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+            _, (_, rows) = self._entries.popitem(last=False)
+            self._rows -= len(rows)
+            self.evictions += 1
+
+
+def _table_versions(conn, tables):
+    # None means the versions cannot be read (not migrated yet), so nothing is cached
+    tables = sorted(set(tables))
+    if not tables:
+        return None
+    try:
+        rows = conn.execute(
+            f"SELECT table_name, version FROM table_versions WHERE table_name IN ({', '.join('?' * len(tables))}) "
+            "ORDER BY table_name",
+            tables,
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return None
+    # An untracked table would never invalidate the entry
+    return tuple(rows) if len(rows) == len(tables) else None
+
+
+_cache = QueryCache()
+
+
+def cached_query(conn, sql, params=(), tables=()):
+    """Run sql on conn through the process-wide cache; tables lists every table it reads."""
+    return _cache.query(conn, sql, params, tables)
+
+
+def stats():
+    return _cache.stats()
+
+
+def clear():
+    _cache.clear()
@@ -0,0 +1,132 @@
+"""
+Full-text search over announcements, subjects, students and teachers.
+
+Backed by the external-content FTS5 tables created in migration 10 (see
+migrations.SEARCH_INDEXES), which triggers keep in sync with their source
+tables. Every word typed is matched as a prefix, so "ary pat" finds
+"Aryan Pathak", and results come back ranked by bm25 with name-like columns
+weighted above the rest.
+"""
+import re
+
+from database import connect_db
+from migrations import SEARCH_INDEXES
+
+DEFAULT_LIMIT = 20
+
+_WORD = re.compile(r"\w+")
+
+# kind -> query; the ? placeholders are (match query, limit)
+_QUERIES = {
+    "announcement": """
+        SELECT a.rowid, a.announcement_text, a.created_at,
+               snippet(search_announcements, 0, '[', ']', '...', 12)
+        FROM search_announcements f
+        JOIN announcements a ON a.rowid = f.rowid
+        WHERE search_announcements MATCH ?
+        ORDER BY bm25(search_announcements)
+        LIMIT ?
+    """,
+    "subject": """
+        SELECT s.subject_id, s.subject_name, s.course, s.semester
+        FROM search_subjects f
+        JOIN subjects s ON s.subject_id = f.rowid
+        WHERE search_subjects MATCH ?
+        ORDER BY bm25(search_subjects, 10.0, 1.0)
+        LIMIT ?
+    """,
+    "student": """
+        SELECT s.student_id, s.name, s.roll_number, s.email, s.course, s.semester
+        FROM search_students f
+        JOIN students s ON s.student_id = f.rowid
+        WHERE search_students MATCH ?
+        ORDER BY bm25(search_students, 10.0, 5.0, 1.0)
+        LIMIT ?
+    """,
+    "teacher": """
+        SELECT t.teacher_id, t.name, t.email, t.department
+        FROM search_teachers f
+        JOIN teachers t ON t.teacher_id = f.rowid
+        WHERE search_teachers MATCH ?
+        ORDER BY bm25(search_teachers, 10.0, 1.0, 1.0)
+        LIMIT ?
+    """,
+}
+
+# SQL condition for "subject matches the search", bound to one match_query() parameter
+SUBJECT_MATCH = "subjects.subject_id IN (SELECT rowid FROM search_subjects WHERE search_subjects MATCH ?)"
+
+
+def match_query(text):
+    """
+    Turn free text into an FTS5 query where every word must match as a prefix.
+
+    Words are quoted, so FTS5 operators and punctuation typed by the user
+    are never interpreted. Returns None when the text has no words.
+    """
+    words = _WORD.findall(text or "")
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search(kind, text, limit=DEFAULT_LIMIT, conn=None):
+    """Return the best matches of one kind ('announcement', 'subject', 'student' or 'teacher')."""
+    query = match_query(text)
+    if query is None:
+        return []
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        return conn.execute(_QUERIES[kind], (query, limit)).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def search_announcements(text, limit=DEFAULT_LIMIT, conn=None):
+    """[(rowid, announcement_text, created_at, snippet)], best match first."""
+    return search("announcement", text, limit, conn)
+
+
+def search_subjects(text, limit=DEFAULT_LIMIT, conn=None):
+    """[(subject_id, subject_name, course, semester)], best match first."""
+    return search("subject", text, limit, conn)
+
+
+def search_students(text, limit=DEFAULT_LIMIT, conn=None):
+    """[(student_id, name, roll_number, email, course, semester)], best match first."""
+    return search("student", text, limit, conn)
+
+
+def search_teachers(text, limit=DEFAULT_LIMIT, conn=None):
+    """[(teacher_id, name, email, department)], best match first."""
+    return search("teacher", text, limit, conn)
+
+
+def search_all(text, limit=5, conn=None):
+    """Return {kind: rows} with the top matches of every kind, on one connection."""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        return {kind: search(kind, text, limit, conn) for kind in _QUERIES}
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def rebuild_search_indexes(conn=None):
+    """Rebuild every FTS index from its source table, e.g. after VACUUM renumbered announcement rowids."""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        with conn:
+            for fts in SEARCH_INDEXES:
+                conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+        return list(SEARCH_INDEXES)
+    finally:
+        if own_conn:
+            conn.close()
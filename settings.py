@@ -1,5 +1,6 @@
 import customtkinter as ctk
 import sqlite3
+from database import connect_db
 from tkinter import messagebox
 import re  # For password validation
 
@@ -20,7 +21,7 @@ def validate_password(password):
 def change_password(user_id, current_password, new_password, confirm_password):
     """Handle password change functionality."""
     try:
-        conn = sqlite3.connect("edutrack.db")
+        conn = connect_db()
         cursor = conn.cursor()
 
         # Verify current password
@@ -53,84 +54,95 @@ def change_password(user_id, current_password, new_password, confirm_password):
 
 
 def create_settings(parent, user_data):
+    render_settings(parent, load_settings(user_data[0]))
+
+
+def load_settings(user_id):
+    """Fetch what the settings page shows: (user_id, username, role, student_details or None)."""
+    conn = connect_db()
     try:
-        # Database connection
-        conn = sqlite3.connect("edutrack.db")
         cursor = conn.cursor()
 
         # Fetch user details
-        user_id = user_data[0]  # Get user_id from user_data
         cursor.execute("SELECT username, role, student_id FROM users WHERE user_id = ?", (user_id,))
         user_details = cursor.fetchone()
-
         if not user_details:
-            messagebox.showerror("Error", "User details not found.")
-            return
+            return None
 
         username, role, student_id = user_details
-
-        # Create Header for Settings
-        title_label = ctk.CTkLabel(parent, text="Settings", font=("Arial", 24, "bold"))
-        title_label.pack(pady=20)
-
-        # Create a frame for user and student details with padding and border
-        details_frame = ctk.CTkFrame(parent, fg_color="gray20", corner_radius=10)
-        details_frame.pack(pady=20, padx=20, fill="both", expand=False)
-
-        # Display User Details
-        user_info = f"Username: {username}\nRole: {role}"
-        user_label = ctk.CTkLabel(details_frame, text=user_info, font=("Arial", 20))
-        user_label.pack(pady=10)
-
+        student_details = None
         if role == "Student" and student_id:
             # Fetch Student Details
             cursor.execute("SELECT name, roll_number, email, phone, course, semester FROM students WHERE student_id = ?", (student_id,))
             student_details = cursor.fetchone()
-
-            if student_details:
-                student_info = (
-                    f"Name: {student_details[0]}\n"
-                    f"Roll Number: {student_details[1]}\n"
-                    f"Email: {student_details[2]}\n"
-                    f"Phone: {student_details[3]}\n"
-                    f"Course: {student_details[4]}\n"
-                    f"Semester: {student_details[5]}"
-                )
-                student_label = ctk.CTkLabel(details_frame, text=student_info, font=("Calibri", 20))
-                student_label.pack(pady=10)
-            else:
-                student_label = ctk.CTkLabel(details_frame, text="No student details found.", font=("Calibri", 24))
-                student_label.pack(pady=10)
-
-        # Create Change Password Section
-        password_frame = ctk.CTkFrame(parent, fg_color="gray20", corner_radius=10)
-        password_frame.pack(pady=20, padx=20, fill="both", expand=False)
-
-        change_password_label = ctk.CTkLabel(password_frame, text="Change Password", font=("Arial", 20, "bold"))
-        change_password_label.pack(pady=10)
-
-        current_password_entry = ctk.CTkEntry(password_frame, placeholder_text="Current Password", show="*")
-        current_password_entry.pack(pady=5)
-
-        new_password_entry = ctk.CTkEntry(password_frame, placeholder_text="New Password", show="*")
-        new_password_entry.pack(pady=5)
-
-        confirm_password_entry = ctk.CTkEntry(password_frame, placeholder_text="Confirm New Password", show="*")
-        confirm_password_entry.pack(pady=5)
-
-        def handle_change_password():
-            current_password = current_password_entry.get()
-            new_password = new_password_entry.get()
-            confirm_password = confirm_password_entry.get()
-
-            result = change_password(user_id, current_password, new_password, confirm_password)
-            messagebox.showinfo("Change Password", result)
-
-        change_password_button = ctk.CTkButton(password_frame, text="Change Password", command=handle_change_password)
-        change_password_button.pack(pady=10)
-
-    except sqlite3.Error as e:
-        messagebox.showerror("Database Error", f"An error occurred: {e}")
+        return user_id, username, role, student_details
     finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+        conn.close()
+
+
+def render_settings(parent, settings):
+    # Clear the loading placeholder or a previous render
+    for widget in parent.winfo_children():
+        widget.destroy()
+
+    if not settings:
+        messagebox.showerror("Error", "User details not found.")
+        return
+
+    user_id, username, role, student_details = settings
+
+    # Create Header for Settings
+    title_label = ctk.CTkLabel(parent, text="Settings", font=("Arial", 24, "bold"))
+    title_label.pack(pady=20)
+
+    # Create a frame for user and student details with padding and border
+    details_frame = ctk.CTkFrame(parent, fg_color="gray20", corner_radius=10)
+    details_frame.pack(pady=20, padx=20, fill="both", expand=False)
+
+    # Display User Details
+    user_info = f"Username: {username}\nRole: {role}"
+    user_label = ctk.CTkLabel(details_frame, text=user_info, font=("Arial", 20))
+    user_label.pack(pady=10)
+
+    if role == "Student":
+        if student_details:
+            student_info = (
+                f"Name: {student_details[0]}\n"
+                f"Roll Number: {student_details[1]}\n"
+                f"Email: {student_details[2]}\n"
+                f"Phone: {student_details[3]}\n"
+                f"Course: {student_details[4]}\n"
+                f"Semester: {student_details[5]}"
+            )
+            student_label = ctk.CTkLabel(details_frame, text=student_info, font=("Calibri", 20))
+            student_label.pack(pady=10)
+        else:
+            student_label = ctk.CTkLabel(details_frame, text="No student details found.", font=("Calibri", 24))
+            student_label.pack(pady=10)
+
+    # Create Change Password Section
+    password_frame = ctk.CTkFrame(parent, fg_color="gray20", corner_radius=10)
+    password_frame.pack(pady=20, padx=20, fill="both", expand=False)
+
+    change_password_label = ctk.CTkLabel(password_frame, text="Change Password", font=("Arial", 20, "bold"))
+    change_password_label.pack(pady=10)
+
+    current_password_entry = ctk.CTkEntry(password_frame, placeholder_text="Current Password", show="*")
+    current_password_entry.pack(pady=5)
+
+    new_password_entry = ctk.CTkEntry(password_frame, placeholder_text="New Password", show="*")
+    new_password_entry.pack(pady=5)
+
+    confirm_password_entry = ctk.CTkEntry(password_frame, placeholder_text="Confirm New Password", show="*")
+    confirm_password_entry.pack(pady=5)
+
+    def handle_change_password():
+        current_password = current_password_entry.get()
+        new_password = new_password_entry.get()
+        confirm_password = confirm_password_entry.get()
+
+        result = change_password(user_id, current_password, new_password, confirm_password)
+        messagebox.showinfo("Change Password", result)
+
+    change_password_button = ctk.CTkButton(password_frame, text="Change Password", command=handle_change_password)
+    change_password_button.pack(pady=10)
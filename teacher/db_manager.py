@@ -1,26 +1,265 @@
 import sqlite3
+import threading
+import time
+
+DB_PATH = "edutrack.db"
+
+# Storage settings for edutrack.db, applied once to every pooled connection
+# when it is first opened. "managed" turns on WAL so readers no longer queue
+# behind attendance/grade writers; "default" is SQLite's stock rollback
+# journal and is kept as the benchmark baseline.
+STORAGE_MODES = {
+    "default": {
+        "busy_timeout": 5000,
+        # Set explicitly: the journal mode is stored in the file, so a database
+        # that was once opened in WAL would otherwise stay in WAL
+        "journal_mode": "DELETE",
+    },
+    "managed": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",  # Safe with WAL, fsyncs only at checkpoints
+        "cache_size": -16000,  # ~16 MB page cache per connection
+        "mmap_size": 268435456,  # 256 MB of memory-mapped reads
+        "temp_store": "MEMORY",
+    },
+}
+STORAGE_MODE = "managed"
+PRAGMAS = STORAGE_MODES[STORAGE_MODE]
+
+# Seconds between background WAL checkpoints (0 disables the scheduler)
+CHECKPOINT_INTERVAL = 30
+CHECKPOINT_MODE = "PASSIVE"
+
+# Seconds between prunes of the change log (see change_log.py) by the same
+# scheduler, and how many days of changes are kept
+PRUNE_INTERVAL = 3600
+CHANGE_LOG_KEEP_DAYS = 7
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled sqlite3 connection.
+
+    Behaves like the connection it wraps, except that close() hands the
+    connection back to its pool instead of closing it, so existing
+    connect/close call sites keep working unchanged.
+    """
+
+    def __init__(self, pool, conn):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_conn", conn)
+
+    def __getattr__(self, name):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+    def close(self):
+        """Return the connection to the pool"""
+        conn = object.__getattribute__(self, "_conn")
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            self._pool.release(conn)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of SQLite connections.
+
+    Connections are opened lazily, configured once with the pool's pragmas and
+    kept on an idle list when released, so page loads reuse an already open
+    connection (and its parsed schema and statement cache) instead of paying
+    for sqlite3.connect on every query.
+    """
+
+    def __init__(self, db_path=DB_PATH, max_idle=8, pragmas=None):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.pragmas = dict(PRAGMAS if pragmas is None else pragmas)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _open(self):
+        """Open and configure a new connection"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def acquire(self):
+        """Take an idle connection, opening a new one if none is free"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._open()
+
+    def release(self, conn):
+        """Give a connection back to the pool, discarding any uncommitted work"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def connect(self):
+        """Return a pooled connection whose close() releases it back to the pool"""
+        return PooledConnection(self, self.acquire())
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class CheckpointScheduler:
+    """
+    Background thread that periodically checkpoints the WAL file and prunes
+    the change log.
+
+    SQLite's automatic checkpoint runs inside whichever writer happens to
+    cross the threshold; doing it on a timer keeps the WAL short and moves
+    that cost off the UI thread. Databases without WAL are only pruned.
+    """
+
+    def __init__(self, pool, interval=CHECKPOINT_INTERVAL, mode=CHECKPOINT_MODE, wal=True,
+                 prune_interval=PRUNE_INTERVAL, keep_days=CHANGE_LOG_KEEP_DAYS):
+        self.pool = pool
+        self.interval = interval
+        self.mode = mode
+        self.wal = wal
+        self.prune_interval = prune_interval
+        self.keep_days = keep_days
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the scheduler thread if it is not already running"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="wal-checkpoint", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def checkpoint(self):
+        """Run a single checkpoint and return (busy, log_frames, checkpointed_frames)"""
+        conn = self.pool.acquire()
+        try:
+            return conn.execute(f"PRAGMA wal_checkpoint({self.mode})").fetchone()
+        finally:
+            self.pool.release(conn)
+
+    def prune(self):
+        """Delete change log entries older than keep_days and return how many were removed"""
+        conn = self.pool.acquire()
+        try:
+            with conn:
+                return conn.execute(
+                    "DELETE FROM changes WHERE changed_at < datetime('now', ?)", (f"-{int(self.keep_days)} days",)
+                ).rowcount
+        finally:
+            self.pool.release(conn)
+
+    def _run(self):
+        # First prune on the first tick, so a log left over from earlier sessions is trimmed early
+        next_prune = time.monotonic()
+        while not self._stop.wait(self.interval):
+            if self.wal:
+                try:
+                    self.checkpoint()
+                except sqlite3.Error as e:
+                    print(f"WAL checkpoint error: {str(e)}")
+            if self.prune_interval > 0 and time.monotonic() >= next_prune:
+                next_prune = time.monotonic() + self.prune_interval
+                try:
+                    self.prune()
+                except sqlite3.Error as e:
+                    print(f"Change log prune error: {str(e)}")
+
+
+_pools = {}
+_schedulers = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=DB_PATH):
+    """Return the shared connection pool for db_path"""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = _pools[db_path] = ConnectionPool(db_path)
+
+            # Bring the schema up to date once per process, before first use
+            from migrations import migrate
+            conn = pool.acquire()
+            try:
+                migrate(conn)
+            finally:
+                pool.release(conn)
+
+            # WAL databases get background checkpoints; every database gets its change log pruned
+            wal = str(pool.pragmas.get("journal_mode", "")).upper() == "WAL"
+            if CHECKPOINT_INTERVAL > 0 and (wal or PRUNE_INTERVAL > 0):
+                scheduler = _schedulers[db_path] = CheckpointScheduler(pool, wal=wal)
+                scheduler.start()
+        return pool
+
 
 class DatabaseManager:
     """
     Simple database manager class to handle connections and operations
     with the SQLite database.
     """
-    
-    def __init__(self, db_path="edutrack.db"):
+
+    def __init__(self, db_path=DB_PATH):
         """Initialize database connection and cursor"""
+        self.conn = None
         try:
-            # Connect to database
-            self.conn = sqlite3.connect(db_path)
-            self.conn.row_factory = sqlite3.Row  # Enable row access by name
+            # Borrow a connection from the shared pool
+            self.conn = get_pool(db_path).connect()
             self.cursor = self.conn.cursor()
+            self.cursor.row_factory = sqlite3.Row  # Enable row access by name
         except sqlite3.Error as e:
             print(f"Database connection error: {str(e)}")
-    
+
     def close(self):
-        """Close the database connection"""
+        """Return the database connection to the pool"""
         if self.conn:
             self.conn.close()
-    
+            self.conn = None
+
     def get_class_list(self):
         """Get list of class names"""
         try:
@@ -28,7 +267,7 @@ class DatabaseManager:
             return [row[0] for row in self.cursor.fetchall()]
         except sqlite3.Error:
             return ["Error loading classes"]
-    
+
     def execute_query(self, query, params=None):
         """Execute a query with optional parameters"""
         try:
@@ -40,7 +279,7 @@ class DatabaseManager:
         except sqlite3.Error as e:
             print(f"Query error: {str(e)}")
             return None
-    
+
     def execute_and_commit(self, query, params=None):
         """Execute a query and commit changes"""
         try:
@@ -1,7 +1,35 @@
 import customtkinter as ctk
-import sqlite3
+from database import (
+    fetch_subject_attendance_counts, fetch_subject_roster, fetch_teacher_subjects,
+    format_attendance_percentage, format_errors, save_attendance, validate_attendance,
+)
+from virtual_list import VirtualList
 import datetime
 from tkinter import messagebox
+from background import BackgroundLoader
+
+
+def fetch_attendance_sheet(subject_id):
+    """The subject's roster as [(student, attendance percentage)]; runs on a worker thread."""
+    # Fetch the subject's roster from the database
+    students = fetch_subject_roster(subject_id)
+
+    # Present/total counts for the whole class in one grouped query
+    try:
+        attendance_counts = fetch_subject_attendance_counts(subject_id)
+    except Exception as e:
+        print(f"Failed to load attendance counts: {str(e)}")
+        attendance_counts = None
+
+    rows = []
+    for student in students:
+        # Current attendance percentage
+        if attendance_counts is None:
+            attendance_percentage = "Error"
+        else:
+            attendance_percentage = format_attendance_percentage(*attendance_counts.get(student[0], (0, 0)))
+        rows.append((student, attendance_percentage))
+    return rows
 
 
 class TeacherAttendance(ctk.CTkFrame):
@@ -10,8 +38,11 @@ class TeacherAttendance(ctk.CTkFrame):
         self.pack(fill="both", expand=True)  # Ensure the frame fills the parent area
         self.teacher_id = teacher_id
         self.subject_id = None  # This can be dynamically selected based on the subject taught by the teacher
-        self.date = datetime.date.today()
         self.student_checkboxes = {}  # Dictionary to store student_id and selected attendance
+        self.subject_mapping = {}
+        self.shown_subject_id = None  # Subject whose roster is on screen
+        self.roster_load = None
+        self.loader = BackgroundLoader(self)  # Subjects and rosters are queried off the Tk thread
         self.create_widgets()
 
     def create_widgets(self):
@@ -24,7 +55,7 @@ class TeacherAttendance(ctk.CTkFrame):
         self.subject_dropdown = ctk.CTkOptionMenu(
             self,
             variable=self.subject_var,
-            values=self.get_teacher_subjects(),
+            values=[],
             command=self.load_students
         )
         self.subject_dropdown.pack(pady=10)
@@ -33,6 +64,10 @@ class TeacherAttendance(ctk.CTkFrame):
         self.student_list_frame = ctk.CTkFrame(self)
         self.student_list_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
+        # Only the rows on screen are built; scrolling rebinds them to other students
+        self.student_list = VirtualList(self.student_list_frame, self.make_student_row, self.bind_student_row, row_height=44)
+        self.student_list.pack(fill="both", expand=True)
+
         # Submit Attendance Button
         self.submit_button = ctk.CTkButton(
             self,
@@ -43,155 +78,111 @@ class TeacherAttendance(ctk.CTkFrame):
         )
         self.submit_button.pack(pady=20)
 
-    def get_teacher_subjects(self):
-        """Fetch the subjects taught by the teacher."""
-        conn = sqlite3.connect("edutrack.db")
-        cursor = conn.cursor()
-
-        # Ensure teacher_id is passed correctly
-        cursor.execute("""
-            SELECT subject_name || " (" || course || " - Sem " || semester || ")" AS subject_display, subject_id
-            FROM subjects
-            WHERE teacher_id=?
-        """, (self.teacher_id,))
-        subjects = cursor.fetchall()
-        conn.close()
-        self.subject_mapping = {subject[0]: subject[1] for subject in subjects}  # Map display name to subject_id
-
-        return list(self.subject_mapping.keys())
-
-    def get_attendance_percentage(self, subject_id, student_id):
-        """Calculate and return the attendance percentage for a given student in the selected subject."""
-        try:
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-
-            # Total sessions for the student in the subject
-            cursor.execute("""
-                SELECT COUNT(*) FROM attendance
-                WHERE student_id = ? AND subject_id = ?
-            """, (student_id, subject_id))
-            total_sessions = cursor.fetchone()[0]
-
-            # Sessions attended by the student in the subject
-            cursor.execute("""
-                SELECT COUNT(*) FROM attendance
-                WHERE student_id = ? AND subject_id = ? AND status = 'Present'
-            """, (student_id, subject_id))
-            attended_sessions = cursor.fetchone()[0]
-
-            conn.close()
-
-            # Calculate attendance percentage
-            if total_sessions == 0:
-                return "0%"  # Avoid division by zero
-            percentage = (attended_sessions / total_sessions) * 100
-            return f"{percentage:.2f}%"
-        except Exception as e:
-            return "Error"
+        self.load_subjects()
+
+    def load_subjects(self):
+        """Fetch the subjects taught by the teacher in the background."""
+        self.loader.submit(
+            lambda: fetch_teacher_subjects(self.teacher_id),
+            self.show_subjects,
+            lambda error: messagebox.showerror("Error", f"Failed to load subjects: {str(error)}"),
+        )
+
+    def show_subjects(self, subjects):
+        # Map display name to subject_id
+        self.subject_mapping = {
+            f"{name} ({course} - Sem {semester})": subject_id for subject_id, name, course, semester in subjects
+        }
+        self.subject_dropdown.configure(values=list(self.subject_mapping.keys()))
 
     def load_students(self, selected_subject):
-        """Load all students in the database and display their current attendance percentage."""
+        """Load the students enrolled in the subject and display their current attendance percentage."""
         self.subject_id = self.subject_mapping[selected_subject]
+        self.load_roster(self.subject_id)
+
+    def load_roster(self, subject_id):
+        if self.roster_load is not None:
+            self.roster_load.cancel()  # Only the latest subject is shown
+        self.roster_load = self.loader.submit(
+            lambda: fetch_attendance_sheet(subject_id),
+            lambda rows: self.show_students(subject_id, rows),
+            lambda error: messagebox.showerror("Error", f"Failed to load students: {str(error)}"),
+        )
 
-        # Clear the student list frame
-        for widget in self.student_list_frame.winfo_children():
-            widget.destroy()
-
-        # Fetch all students from the database
-        conn = sqlite3.connect("edutrack.db")
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT student_id, name, roll_number
-            FROM students
-        """)
-        students = cursor.fetchall()
-        conn.close()
-
-        # Display students with checkboxes for attendance and their current attendance percentage
+    def refresh(self):
+        """Reload the subjects and the open roster, keeping the boxes ticked so far."""
+        self.load_subjects()
+        if self.subject_id is not None:
+            self.load_roster(self.subject_id)
+
+    def show_students(self, subject_id, rows):
+        self.roster_load = None
+        # Checkbox state lives in these variables, not in the recycled row widgets;
+        # reloading the same subject keeps the marks already ticked
+        previous = self.student_checkboxes if subject_id == self.shown_subject_id else {}
+        self.shown_subject_id = subject_id
         self.student_checkboxes = {}  # Reset the dictionary
-        for student in students:
-            student_frame = ctk.CTkFrame(self.student_list_frame)
-            student_frame.pack(fill="x", pady=5)
-
-            # Fetch current attendance percentage
-            attendance_percentage = self.get_attendance_percentage(self.subject_id, student[0])
-
-            # Student Name, Roll Number, and Attendance Percentage
-            student_label = ctk.CTkLabel(
-                student_frame,
-                text=f"{student[2]} - {student[1]} (Attendance: {attendance_percentage})",
-                font=("Arial", 14)
-            )
-            student_label.pack(side="left", padx=10)
-
-            # Checkbox for Present
-            present_var = ctk.BooleanVar(value=False)  # Default to not checked
-            present_checkbox = ctk.CTkCheckBox(
-                student_frame,
-                text="Present",
-                variable=present_var,
-                onvalue=True,
-                offvalue=False
-            )
-            present_checkbox.pack(side="right", padx=5)
-
-            # Checkbox for Absent
-            absent_var = ctk.BooleanVar(value=False)  # Default to not checked
-            absent_checkbox = ctk.CTkCheckBox(
-                student_frame,
-                text="Absent",
-                variable=absent_var,
-                onvalue=True,
-                offvalue=False
-            )
-            absent_checkbox.pack(side="right", padx=5)
-
-            # Store both checkboxes in the dictionary
-            self.student_checkboxes[student[0]] = {
-                "present": present_var,
-                "absent": absent_var
+        for student, _ in rows:
+            self.student_checkboxes[student[0]] = previous.get(student[0]) or {
+                "present": ctk.BooleanVar(value=False),  # Default to not checked
+                "absent": ctk.BooleanVar(value=False)
             }
 
+        self.student_list.set_items(rows)
+
+    def make_student_row(self, parent):
+        """Build one empty student row: label plus Present/Absent checkboxes."""
+        student_frame = ctk.CTkFrame(parent)
+        student_frame.pack(fill="both", expand=True, pady=2)
+
+        student_frame.label = ctk.CTkLabel(student_frame, text="", font=("Arial", 14))
+        student_frame.label.pack(side="left", padx=10)
+
+        student_frame.present_checkbox = ctk.CTkCheckBox(student_frame, text="Present", onvalue=True, offvalue=False)
+        student_frame.present_checkbox.pack(side="right", padx=5)
+
+        student_frame.absent_checkbox = ctk.CTkCheckBox(student_frame, text="Absent", onvalue=True, offvalue=False)
+        student_frame.absent_checkbox.pack(side="right", padx=5)
+        return student_frame
+
+    def bind_student_row(self, student_frame, row, index):
+        """Point a recycled row at a student and that student's attendance variables."""
+        student, attendance_percentage = row
+        attendance_vars = self.student_checkboxes[student[0]]
+
+        # Student Name, Roll Number, and Attendance Percentage
+        student_frame.label.configure(text=f"{student[2]} - {student[1]} (Attendance: {attendance_percentage})")
+        student_frame.present_checkbox.configure(variable=attendance_vars["present"])
+        student_frame.absent_checkbox.configure(variable=attendance_vars["absent"])
+
     def submit_attendance(self):
         """Submit attendance for all students."""
         if not self.subject_id:
             messagebox.showwarning("Warning", "Please select a subject to mark attendance.")
             return
+        # The boxes on screen belong to shown_subject_id; never save them under another subject
+        if self.subject_id != self.shown_subject_id:
+            messagebox.showwarning("Warning", "The students of the selected subject have not loaded yet.")
+            return
+
+        # Validate the whole roster before writing anything
+        marks = {
+            student_id: (attendance_vars["present"].get(), attendance_vars["absent"].get())
+            for student_id, attendance_vars in self.student_checkboxes.items()
+        }
+        statuses, errors = validate_attendance(marks)
+        if errors:
+            messagebox.showerror("Error", format_errors(errors))
+            return
 
         try:
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-
-            for student_id, attendance_vars in self.student_checkboxes.items():
-                present_status = attendance_vars["present"].get()
-                absent_status = attendance_vars["absent"].get()
-
-                # Determine attendance status
-                if present_status and absent_status:
-                    messagebox.showerror("Error", f"Student ID {student_id} cannot be both Present and Absent.")
-                    return
-                elif present_status:
-                    attendance_status = "Present"
-                elif absent_status:
-                    attendance_status = "Absent"
-                else:
-                    messagebox.showerror("Error", f"Please mark attendance for Student ID {student_id}.")
-                    return
-
-                # Insert a new attendance record for the current session (no overwriting)
-                cursor.execute("""
-                    INSERT INTO attendance (student_id, subject_id, date, status)
-                    VALUES (?, ?, ?, ?)
-                """, (student_id, self.subject_id, self.date, attendance_status))
-
-            conn.commit()
-            conn.close()
+            # One transaction for the session; resubmitting today's session overwrites it.
+            # Dated on submit, since the page stays open across days
+            save_attendance(self.shown_subject_id, datetime.date.today(), statuses)
             messagebox.showinfo("Success", "Attendance submitted successfully.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to submit attendance: {str(e)}")
 
-
 if __name__ == "__main__":
     # Test the attendance marking interface as a standalone application
     app = ctk.CTk()
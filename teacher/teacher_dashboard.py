@@ -1,10 +1,13 @@
 import customtkinter as ctk
-import sqlite3
-from PIL import Image
+from database import connect_db, fetch_announcements_page
+from thumbnails import get_thumbnail
 
 def show_teacher_dashboard(parent, user_data):
-    # Fetch teacher details from the database
-    conn = sqlite3.connect('edutrack.db')
+    render_teacher_dashboard(parent, load_teacher_dashboard(user_data[5]))
+
+def load_teacher_dashboard(teacher_id):
+    """Fetch everything the teacher dashboard shows, on a single pooled connection."""
+    conn = connect_db()
     cursor = conn.cursor()
 
     # Fetch Teacher Info
@@ -12,7 +15,7 @@ def show_teacher_dashboard(parent, user_data):
         SELECT name, department 
         FROM teachers 
         WHERE teacher_id=?
-    """, (user_data[5],))
+    """, (teacher_id,))
     teacher_details = cursor.fetchone()
 
     # Fetch Teacher Photo
@@ -20,11 +23,37 @@ def show_teacher_dashboard(parent, user_data):
         SELECT photo_path 
         FROM phototeacher 
         WHERE teacher_id=?
-    """, (user_data[5],))
+    """, (teacher_id,))
     photo_result = cursor.fetchone()
 
+    # Fetch announcements from DB
+    rows = [(row[1],) for row in fetch_announcements_page(limit=5, conn=conn)[0]]
+
+    # Fetch upcoming exams from DB
+    cursor.execute("SELECT exam_type, date FROM exams ORDER BY date ASC")
+    exam_rows = cursor.fetchall()
+
+    # Fetch meetings from DB
+    cursor.execute("""
+        SELECT date, time, purpose, link 
+        FROM meetings 
+        WHERE teacher_id=? 
+        ORDER BY date, time LIMIT 5
+    """, (teacher_id,))
+    meetings_data = cursor.fetchall()
+
     conn.close()
 
+    if photo_result:
+        try:
+            get_thumbnail(photo_result[0])  # Decode off the Tk thread; render hits the cache
+        except OSError as e:
+            print("Error loading image:", e)
+    return teacher_details, photo_result, rows, exam_rows, meetings_data
+
+def render_teacher_dashboard(parent, data):
+    teacher_details, photo_result, rows, exam_rows, meetings_data = data
+
     # Clear existing widgets
     for widget in parent.winfo_children():
         widget.destroy()
@@ -61,7 +90,7 @@ def show_teacher_dashboard(parent, user_data):
 
         try:
             # Load the Image
-            image = ctk.CTkImage(light_image=Image.open(photo_path), size=(150, 150))
+            image = ctk.CTkImage(light_image=get_thumbnail(photo_path), size=(150, 150))
 
             # Display Image in a Label
             photo_label = ctk.CTkLabel(photo_section, image=image, text="")
@@ -79,13 +108,6 @@ def show_teacher_dashboard(parent, user_data):
     ann_title = ctk.CTkLabel(announcements, text="📢 Announcements", font=("Arial", 20, "bold"))
     ann_title.place(x=80, y=10)
 
-    # Fetch announcements from DB
-    conn = sqlite3.connect('edutrack.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT announcement_text FROM announcements ORDER BY created_at DESC LIMIT 5")
-    rows = cursor.fetchall()
-    conn.close()
-
     # Display announcements
     if rows:
         y_position = 50
@@ -111,13 +133,6 @@ def show_teacher_dashboard(parent, user_data):
     exam_title = ctk.CTkLabel(exams, text="📝 Exams", font=("Arial", 20, "bold"))
     exam_title.place(x=100, y=10)
 
-    # Fetch upcoming exams from DB
-    conn = sqlite3.connect('edutrack.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT exam_type, date FROM exams ORDER BY date ASC")
-    exam_rows = cursor.fetchall()
-    conn.close()
-
     # Display exams
     if exam_rows:
         y_position = 50
@@ -136,18 +151,6 @@ def show_teacher_dashboard(parent, user_data):
     meet_label = ctk.CTkLabel(meetings, text="📅 Meetings", font=("Arial", 20, "bold"))
     meet_label.place(x=100, y=10)
 
-    # Fetch meetings from DB
-    conn = sqlite3.connect('edutrack.db')
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT date, time, purpose, link 
-        FROM meetings 
-        WHERE teacher_id=? 
-        ORDER BY date, time LIMIT 5
-    """, (user_data[5],))
-    meetings_data = cursor.fetchall()
-    conn.close()
-
     # Display meetings
     if meetings_data:
         y_position = 50
@@ -1,14 +1,29 @@
 import customtkinter as ctk
 from tkinter import messagebox
-import sqlite3
+from database import connect_db, fetch_subjects
+from background import BackgroundLoader
 from tkcalendar import DateEntry  # For date selection
 
 
+def fetch_all_exams():
+    """Every exam as (exam_id, subject_id, exam_type, date), ordered by date."""
+    conn = connect_db()
+    try:
+        return conn.execute("""
+            SELECT exam_id, subject_id, exam_type, date
+            FROM exams
+            ORDER BY date
+        """).fetchall()
+    finally:
+        conn.close()
+
+
 class TeacherExam(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent)
         self.pack(fill="both", expand=True)  # Ensure the frame fills the parent area
         self.subject_map = {}  # To store subject_name -> subject_id mapping
+        self.loader = BackgroundLoader(self)  # Subjects and exams are queried off the Tk thread
         self.create_widgets()
 
     def create_widgets(self):
@@ -45,32 +60,28 @@ class TeacherExam(ctk.CTkFrame):
         # Show the default view
         self.update_view("Add Exam")
 
-    def fetch_subjects(self):
-        """Fetch the list of subjects from the database."""
-        try:
-            # Connect to the database
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-
-            # Correct the query to fetch subject_id and subject_name
-            cursor.execute("SELECT subject_id, subject_name FROM subjects")
-            subjects = cursor.fetchall()
-
-            # Close the connection
-            conn.close()
-
-            # Debugging: Print the fetched subjects
-            print("Fetched subjects:", subjects)
+    def load_subjects(self):
+        """Fetch the list of subjects in the background and fill the subject dropdown."""
+        # (subject_id, subject_name) rows, from the query cache unless subjects changed
+        self.loader.submit(
+            fetch_subjects,
+            self.show_subjects,
+            lambda error: messagebox.showerror("Error", f"Failed to load subjects: {str(error)}"),
+        )
 
-            # Map subject names to their IDs
-            self.subject_map = {subject[1]: subject[0] for subject in subjects}
+    def refresh(self):
+        """Reload the subjects, and the exam list when it is open."""
+        self.load_subjects()
+        if self.option_menu.get() == "View Exams":
+            self.load_exams()
 
-            # Return the list of subject names
-            return list(self.subject_map.keys())
-        except Exception as e:
-            # Handle any errors and display an error message
-            messagebox.showerror("Error", f"Failed to load subjects: {str(e)}")
-            return []
+    def show_subjects(self, subjects):
+        # Map subject names to their IDs
+        self.subject_map = {subject[1]: subject[0] for subject in subjects}
+        subject_names = list(self.subject_map.keys()) or ["No Subjects Available"]
+        self.subject_menu.configure(values=subject_names)
+        if self.subject_menu.get() not in subject_names:
+            self.subject_menu.set(subject_names[0])
 
     def add_exam_widgets(self):
         """Define the widgets for adding an exam."""
@@ -80,13 +91,10 @@ class TeacherExam(ctk.CTkFrame):
         self.subject_label = ctk.CTkLabel(self.add_exam_frame, text="Subject:", font=("Arial", 14))
         self.subject_label.pack(pady=5)
 
-        # Fetch subjects and populate dropdown
-        subject_names = self.fetch_subjects()
-        if not subject_names:
-            subject_names = ["No Subjects Available"]
-
-        self.subject_menu = ctk.CTkOptionMenu(self.add_exam_frame, values=subject_names)
+        # Populated once the subjects are fetched
+        self.subject_menu = ctk.CTkOptionMenu(self.add_exam_frame, values=["Loading..."])
         self.subject_menu.pack(pady=5)
+        self.load_subjects()
 
         # Exam Type
         self.exam_type_label = ctk.CTkLabel(self.add_exam_frame, text="Exam Type:", font=("Arial", 14))
@@ -221,7 +229,7 @@ class TeacherExam(ctk.CTkFrame):
             return
 
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO exams (subject_id, exam_type, date)
@@ -236,20 +244,17 @@ class TeacherExam(ctk.CTkFrame):
 
     def load_exams(self):
         """Load and display all exams."""
+        self.loader.submit(
+            fetch_all_exams,
+            self.show_exams,
+            lambda error: messagebox.showerror("Error", f"Failed to load exams: {str(error)}"),
+        )
+
+    def show_exams(self, exams):
         try:
             for widget in self.exams_frame.winfo_children():
                 widget.destroy()
 
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT exam_id, subject_id, exam_type, date
-                FROM exams
-                ORDER BY date
-            """)
-            exams = cursor.fetchall()
-            conn.close()
-
             if exams:
                 for exam in exams:
                     exam_label = ctk.CTkLabel(
@@ -266,7 +271,7 @@ class TeacherExam(ctk.CTkFrame):
                 )
                 no_exam_label.pack(anchor="center", padx=10, pady=10)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load exams: {str(e)}")
+            messagebox.showerror("Error", f"Failed to display exams: {str(e)}")
 
     def edit_exam(self):
         """Edit an existing exam."""
@@ -279,7 +284,7 @@ class TeacherExam(ctk.CTkFrame):
             return
 
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE exams
@@ -303,7 +308,7 @@ class TeacherExam(ctk.CTkFrame):
             return
 
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 DELETE FROM exams
@@ -1,7 +1,8 @@
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
-import sqlite3
-import pandas as pd
+from database import connect_db, fetch_subject_roster, format_errors, save_grades, validate_grades
+from background import BackgroundLoader
+from grade_export import export_grades
 
 
 class TeacherGrades(ctk.CTkFrame):
@@ -9,6 +10,7 @@ class TeacherGrades(ctk.CTkFrame):
         
         super().__init__(parent)
         self.teacher_id = teacher_id  # Store the logged-in teacher's ID
+        self.loader = BackgroundLoader(self)  # Exports run off the Tk thread
         self.pack(fill="both", expand=True)
         self.create_widgets()
 
@@ -101,7 +103,7 @@ class TeacherGrades(ctk.CTkFrame):
     def load_exams(self, for_view=False):
         """Load exams into the dropdown menu for the logged-in teacher."""
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT exam_id, exam_type, date
@@ -129,24 +131,27 @@ class TeacherGrades(ctk.CTkFrame):
             messagebox.showerror("Error", f"Failed to load exams: {str(e)}")
 
     def load_students(self, *args):
-        """Load all students for the teacher to input grades."""
+        """Load the students enrolled in the selected exam's subject for the teacher to input grades."""
         try:
             # Clear the students list frame
             for widget in self.students_frame.winfo_children():
                 widget.destroy()
 
-            # Fetch students from the database
-            conn = sqlite3.connect("edutrack.db")
+            selected_exam = self.exam_menu.get()
+            if not selected_exam:
+                return
+            exam_id = selected_exam.split(" - ")[0]
+
+            # Fetch the roster of the exam's subject from the database
+            conn = connect_db()
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT student_id, name, roll_number, course
-                FROM students
-            """)
-            students = cursor.fetchall()
+            cursor.execute("SELECT subject_id FROM exams WHERE exam_id = ?", (exam_id,))
+            exam = cursor.fetchone()
+            students = fetch_subject_roster(exam[0], conn=conn) if exam else []
             conn.close()
 
             if not students:
-                messagebox.showwarning("No Students", "No students found in the database.")
+                messagebox.showwarning("No Students", "No students are enrolled for this exam.")
                 return
 
             # Display students with entry fields for marks
@@ -200,37 +205,21 @@ class TeacherGrades(ctk.CTkFrame):
         try:
             # Validate out_of_marks
             out_of_marks = int(out_of_marks)
+        except ValueError:
+            messagebox.showerror("Validation Error", "Out Of Marks must be a number.")
+            return
 
-            # Connect to the database
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-
-            # Insert grades for each student
-            for student_id, marks_entry in self.student_marks_entries.items():
-                marks_obtained = marks_entry.get().strip()
-
-                if not marks_obtained:
-                    continue  # Skip if no marks entered
-
-                marks_obtained = int(marks_obtained)
-
-                # Ensure marks are within range
-                if marks_obtained > out_of_marks:
-                    messagebox.showerror("Validation Error", f"Marks for student ID {student_id} exceed Out Of Marks.")
-                    return
-
-                # Insert grade into the database
-                cursor.execute("""
-                    INSERT INTO grades (student_id, exam_id, marks_obtained, total_marks)
-                    VALUES (?, ?, ?, ?)
-                """, (student_id, exam_id, marks_obtained, out_of_marks))
-
-            conn.commit()
-            conn.close()
+        # Validate every student's marks before writing anything
+        entries = {student_id: marks_entry.get() for student_id, marks_entry in self.student_marks_entries.items()}
+        marks, errors = validate_grades(entries, out_of_marks)
+        if errors:
+            messagebox.showerror("Validation Error", format_errors(errors))
+            return
 
+        try:
+            # Upsert the whole exam in one transaction; resubmitting updates existing grades
+            save_grades(exam_id, marks, out_of_marks)
             messagebox.showinfo("Success", "Grades submitted successfully!")
-        except ValueError:
-            messagebox.showerror("Validation Error", "Invalid marks entered. Please enter numeric values.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to submit grades: {str(e)}")
 
@@ -240,7 +229,7 @@ class TeacherGrades(ctk.CTkFrame):
         exam_id = selected_exam.split(" - ")[0]
 
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT students.name, grades.marks_obtained, grades.total_marks
@@ -259,32 +248,29 @@ class TeacherGrades(ctk.CTkFrame):
             messagebox.showerror("Error", f"Failed to load grades: {str(e)}")
 
     def export_grades(self):
-        """Export grades to a CSV file."""
+        """Export grades to a CSV file, streamed on a worker thread."""
         selected_exam = self.view_exam_menu.get()
         exam_id = selected_exam.split(" - ")[0]
+        # Exams are listed as "<exam_id> - <type> (<date>)"; anything else is the empty menu's placeholder
+        if not exam_id.isdigit():
+            messagebox.showwarning("Validation Error", "Please select an Exam to export.")
+            return
 
-        try:
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT students.name, grades.marks_obtained, grades.total_marks
-                FROM grades
-                INNER JOIN students ON grades.student_id = students.student_id
-                WHERE grades.exam_id = ?
-            """, (exam_id,))
-            grades = cursor.fetchall()
-            conn.close()
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
+        if not file_path:
+            return
 
-            # Convert to DataFrame
-            df = pd.DataFrame(grades, columns=["Student Name", "Marks Obtained", "Total Marks"])
+        def done(count):
+            if count:
+                messagebox.showinfo("Success", f"Exported {count} grades successfully!")
+            else:
+                messagebox.showwarning("Warning", "No grades to export.")
 
-            # Save to CSV
-            file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
-            if file_path:
-                df.to_csv(file_path, index=False)
-                messagebox.showinfo("Success", "Grades exported successfully!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export grades: {str(e)}")
+        self.loader.submit(
+            lambda: export_grades(file_path, "CSV", exam_ids=[int(exam_id)]),
+            done,
+            lambda error: messagebox.showerror("Error", f"Failed to export grades: {str(error)}"),
+        )
 
     def update_view(self, selected_option):
         """Show the appropriate section based on the selected option."""
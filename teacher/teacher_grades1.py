@@ -1,14 +1,78 @@
 import customtkinter as ctk
 from tkinter import messagebox
+import os
 import sqlite3
-import pandas as pd
 from teacher.db_manager import DatabaseManager
+from database import (
+    connect_db, fetch_exam_marks, fetch_grading_sheet, fetch_table_versions, fetch_teacher_exams, format_errors, save_grades,
+    validate_grades,
+)
+import change_feed
+from virtual_list import VirtualList
+from background import BackgroundLoader
+from grade_export import EXPORT_DIR, FORMATS, export_grades as stream_grades, safe_filename
+from analytics_snapshot import SNAPSHOT_DIR, write_snapshot
+
+# Export formats that write a columnar snapshot of all the teacher's subjects
+SNAPSHOT_EXPORTS = {"Parquet Snapshot": "parquet", "Arrow Snapshot": "arrow"}
+# Tables the Add Grades sheet is built from
+GRADING_TABLES = ("grades", "exams", "students", "subjects")
+
+
+def load_grading_sheet(exam_id, cached_versions=None):
+    """
+    Read an exam's grading sheet on a worker thread. Returns (versions, rows,
+    current): current is True when cached_versions are still up to date and
+    nothing was re-read; rows is None when the exam does not exist.
+    """
+    versions = fetch_table_versions(GRADING_TABLES)
+    if cached_versions is not None and versions and cached_versions == versions:
+        return versions, None, True
+    # Roster and existing marks in one query
+    return versions, fetch_grading_sheet(exam_id), False
+
+
+def fetch_exam_grades(exam_id):
+    """(exam_type, subject_name, date) and [(name, roll_number, marks, total)] of an exam; exam info is None if it is missing"""
+    conn = connect_db()
+    try:
+        exam_info = conn.execute("""
+            SELECT e.exam_type, s.subject_name, e.date
+            FROM exams e
+            JOIN subjects s ON e.subject_id = s.subject_id
+            WHERE e.exam_id = ?
+        """, (exam_id,)).fetchone()
+        if not exam_info:
+            return None, []
+        grades = conn.execute("""
+            SELECT s.name, s.roll_number, g.marks_obtained, g.total_marks
+            FROM grades g
+            JOIN students s ON g.student_id = s.student_id
+            WHERE g.exam_id = ?
+            ORDER BY s.name
+        """, (exam_id,)).fetchall()
+    finally:
+        conn.close()
+    return exam_info, grades
+
+
 class TeacherGrades:
     def __init__(self, parent_frame, teacher_id):
         self.parent_frame = parent_frame
         self.teacher_id = teacher_id
         self.frame = None
         self.db = DatabaseManager()
+        # Grading session cache: {exam_id: {"versions": ..., "marks": {student_id: row}}}
+        self.grading_sheets = {}
+        # Exports are streamed off the Tk thread
+        self.loader = BackgroundLoader(parent_frame)
+        # Exams on the Add Grades and View Grades tabs, kept current from the change log
+        self.grading_exam_id = None
+        self.viewed_exam_id = None
+        # Exam whose sheet is on screen; the mark entries belong to it
+        self.shown_grading_exam_id = None
+        self.student_mark_entries = {}
+        change_feed.subscribe(parent_frame, "grades", self.apply_grade_changes)
         
     def show(self):
         # Create a new frame each time show is called
@@ -38,6 +102,7 @@ class TeacherGrades:
         self.setup_add_grades_tab()
         self.setup_view_grades_tab()
         self.setup_export_tab()
+        self.load_teacher_exams()
         
     def setup_add_grades_tab(self):
         tab = self.tabview.tab("Add Grades")
@@ -48,9 +113,8 @@ class TeacherGrades:
         
         ctk.CTkLabel(exam_frame, text="Select Exam:").pack(side="left", padx=5)
         
-        # Get exam list for this teacher
-        exams = self.get_teacher_exams()
-        self.exam_combo = ctk.CTkComboBox(exam_frame, values=exams or ["No exams found"], width=300)
+        # Filled with this teacher's exams once they are fetched
+        self.exam_combo = ctk.CTkComboBox(exam_frame, values=["Loading..."], width=300)
         self.exam_combo.pack(side="left", padx=5)
         
         # Total marks entry
@@ -67,9 +131,12 @@ class TeacherGrades:
                               width=200)
         load_btn.pack(pady=10)
         
-        # Scrollable frame for students
-        self.students_frame = ctk.CTkScrollableFrame(tab)
+        # Students list; only the visible rows are built, scrolling rebinds them
+        self.students_frame = ctk.CTkFrame(tab)
         self.students_frame.pack(fill="both", expand=True, pady=10)
+        self.students_status = ctk.CTkLabel(self.students_frame, text="")
+        self.students_list = VirtualList(self.students_frame, self.make_grading_row, self.bind_grading_row)
+        self.students_list.pack(fill="both", expand=True)
         
         # Submit button at bottom
         submit_btn = ctk.CTkButton(tab, text="Submit All Grades", 
@@ -86,9 +153,7 @@ class TeacherGrades:
         
         ctk.CTkLabel(filter_frame, text="Select Exam:").pack(side="left", padx=5)
         
-        # Get exam list for this teacher
-        exams = self.get_teacher_exams()
-        self.view_exam_combo = ctk.CTkComboBox(filter_frame, values=exams or ["No exams found"], width=300)
+        self.view_exam_combo = ctk.CTkComboBox(filter_frame, values=["Loading..."], width=300)
         self.view_exam_combo.pack(side="left", padx=5)
         
         view_btn = ctk.CTkButton(filter_frame, text="View Grades", 
@@ -115,8 +180,7 @@ class TeacherGrades:
         
         ctk.CTkLabel(exam_frame, text="Select Exam:").pack(side="left", padx=5)
         
-        exams = self.get_teacher_exams()
-        self.export_exam_combo = ctk.CTkComboBox(exam_frame, values=exams or ["No exams found"], width=300)
+        self.export_exam_combo = ctk.CTkComboBox(exam_frame, values=["Loading..."], width=300)
         self.export_exam_combo.pack(side="left", padx=5)
         
         # Export format options
@@ -125,42 +189,67 @@ class TeacherGrades:
         
         ctk.CTkLabel(format_frame, text="Export Format:").pack(side="left", padx=5)
         
-        self.export_format = ctk.CTkComboBox(format_frame, values=["CSV", "Excel"], width=100)
+        self.export_format = ctk.CTkComboBox(format_frame, values=["CSV", "Excel", *SNAPSHOT_EXPORTS], width=160)
         self.export_format.set("CSV")
         self.export_format.pack(side="left", padx=5)
         
+        # What to export, relative to the selected exam
+        scope_frame = ctk.CTkFrame(export_frame, fg_color="transparent")
+        scope_frame.pack(fill="x", pady=10)
+        
+        ctk.CTkLabel(scope_frame, text="Export Scope:").pack(side="left", padx=5)
+        
+        self.export_scope = ctk.CTkComboBox(
+            scope_frame, values=["Selected Exam", "Exam's Subject", "Exam's Semester", "All My Exams"], width=200
+        )
+        self.export_scope.set("Selected Exam")
+        self.export_scope.pack(side="left", padx=5)
+        
         # Export button
-        export_btn = ctk.CTkButton(export_frame, text="Export Grades", 
+        self.export_btn = ctk.CTkButton(export_frame, text="Export Grades", 
                                 command=self.export_grades,
                                 width=200)
-        export_btn.pack(pady=20)
-        
-    def get_teacher_exams(self):
-        """Get exams associated with this teacher's subjects"""
-        try:
-            query = """
-                SELECT e.exam_id, e.exam_type, s.subject_name, e.date
-                FROM exams e
-                JOIN subjects s ON e.subject_id = s.subject_id
-                WHERE s.teacher_id = ?
-                ORDER BY e.date DESC
-            """
-            self.db.cursor.execute(query, (self.teacher_id,))
-            exams = self.db.cursor.fetchall()
-            
-            if not exams:
-                return ["No exams found"]
-                
-            return [f"{exam[0]} - {exam[1]} ({exam[2]}) on {exam[3]}" for exam in exams]
-        except sqlite3.Error as e:
-            print(f"Database error: {str(e)}")
-            return ["Error loading exams"]
+        self.export_btn.pack(pady=20)
+        
+    def load_teacher_exams(self):
+        """Fetch the exams of this teacher's subjects in the background and fill every exam dropdown"""
+        # Repeat loads are served from the query cache
+        self.loader.submit(
+            lambda: fetch_teacher_exams(self.teacher_id),
+            self.show_teacher_exams,
+            lambda error: self.show_teacher_exams(None),
+        )
+
+    def refresh(self):
+        """
+        Reload the exam lists and the grades on the View Grades tab, keeping
+        the selections. Marks typed on the Add Grades tab stay as they are;
+        Load Students re-reads the sheet when its tables have changed.
+        """
+        self.load_teacher_exams()
+        if self.viewed_exam_id is not None:
+            self.load_exam_grades(self.viewed_exam_id)
+
+    def show_teacher_exams(self, exams):
+        if exams is None:
+            values = ["Error loading exams"]
+        elif not exams:
+            values = ["No exams found"]
+        else:
+            values = [f"{exam[0]} - {exam[1]} ({exam[2]}) on {exam[3]}" for exam in exams]
+        for combo in (self.exam_combo, self.view_exam_combo, self.export_exam_combo):
+            selected = combo.get()
+            combo.configure(values=values)
+            # Keep the teacher's choice while it is still listed
+            combo.set(selected if selected in values else values[0])
     
     def load_students_for_grading(self):
         """Load students for grading based on selected exam"""
-        # Clear existing entries
-        for widget in self.students_frame.winfo_children():
-            widget.destroy()
+        # Clear existing entries; nothing can be submitted until the new sheet is shown
+        self.students_status.pack_forget()
+        self.students_list.set_items([])
+        self.student_mark_entries = {}
+        self.shown_grading_exam_id = None
             
         exam_text = self.exam_combo.get()
         if "No exams found" in exam_text or not exam_text:
@@ -174,75 +263,68 @@ class TeacherGrades:
             self.show_message("Invalid exam selection", "error")
             return
             
-        try:
-            # Get subject_id for this exam
-            self.db.cursor.execute("SELECT subject_id FROM exams WHERE exam_id = ?", (exam_id,))
-            result = self.db.cursor.fetchone()
-            if not result:
+        self.grading_exam_id = exam_id
+        cached = self.grading_sheets.get(exam_id)
+        cached_versions = cached["versions"] if cached is not None else None
+        self.loader.submit(
+            lambda: load_grading_sheet(exam_id, cached_versions),
+            lambda result: self.show_grading_sheet(exam_id, *result),
+            lambda error: self.show_message(f"Database error: {str(error)}", "error"),
+        )
+
+    def show_grading_sheet(self, exam_id, versions, rows, current):
+        """Show the exam's roster; current means the cached sheet is still up to date"""
+        if exam_id != self.grading_exam_id:
+            return  # Another exam was loaded since
+        if not current:
+            if rows is None:
                 self.show_message("Exam not found", "error")
                 return
-                
-            subject_id = result[0]
-            
-            # Get students eligible for this exam
-            query = """
-                SELECT s.student_id, s.name, s.roll_number, s.course
-                FROM students s
-                ORDER BY s.name
-            """
-            self.db.cursor.execute(query)
-            students = self.db.cursor.fetchall()
-            
-            if not students:
-                ctk.CTkLabel(self.students_frame, text="No students found").pack(pady=10)
-                return
-                
-            # Store entries for later submission
-            self.student_mark_entries = {}
+            self.grading_sheets[exam_id] = {"versions": versions, "marks": {row[0]: tuple(row) for row in rows}}
+        sheet = self.grading_sheets[exam_id]["marks"]
+        self.shown_grading_exam_id = exam_id
+
+        if not sheet:
+            self.students_status.configure(text="No students found")
+            self.students_status.pack(pady=10, before=self.students_list)
+            return
             
-            # List of students with entry fields
-            for student in students:
-                row_frame = ctk.CTkFrame(self.students_frame)
-                row_frame.pack(fill="x", pady=2)
-                
-                student_info = f"{student[1]} (Roll: {student[2]}, Course: {student[3]})"
-                ctk.CTkLabel(row_frame, text=student_info, width=400, anchor="w").pack(side="left", padx=5)
-                
-                # Check if student already has grade for this exam
-                self.db.cursor.execute("""
-                    SELECT marks_obtained FROM grades 
-                    WHERE student_id = ? AND exam_id = ?
-                """, (student[0], exam_id))
-                existing_mark = self.db.cursor.fetchone()
-                
-                # Mark entry field
-                mark_entry = ctk.CTkEntry(row_frame, width=80)
-                mark_entry.pack(side="right", padx=10)
-                
-                # Add to dict for later collection
-                self.student_mark_entries[student[0]] = mark_entry
-                
-                # Fill in existing mark if any
-                if existing_mark:
-                    mark_entry.insert(0, str(existing_mark[0]))
-                    
-        except sqlite3.Error as e:
-            self.show_message(f"Database error: {str(e)}", "error")
-    
+        # Marks live in one StringVar per student, since row widgets are recycled
+        self.student_mark_entries = {}
+        for student_id, name, roll_number, course, existing_mark in sheet.values():
+            # Fill in existing mark if any
+            self.student_mark_entries[student_id] = ctk.StringVar(
+                value="" if existing_mark is None else str(existing_mark)
+            )
+
+        self.students_list.set_items(list(sheet.values()))
+
+    def make_grading_row(self, parent):
+        """Build one empty grading row: student info plus a mark entry field"""
+        row_frame = ctk.CTkFrame(parent)
+        row_frame.pack(fill="both", expand=True, pady=2)
+
+        row_frame.info_label = ctk.CTkLabel(row_frame, text="", width=400, anchor="w")
+        row_frame.info_label.pack(side="left", padx=5)
+
+        row_frame.mark_entry = ctk.CTkEntry(row_frame, width=80)
+        row_frame.mark_entry.pack(side="right", padx=10)
+        return row_frame
+
+    def bind_grading_row(self, row_frame, row, index):
+        """Show a student in a recycled row and attach the entry to their mark variable"""
+        student_id, name, roll_number, course, _ = row
+        row_frame.info_label.configure(text=f"{name} (Roll: {roll_number}, Course: {course})")
+        row_frame.mark_entry.configure(textvariable=self.student_mark_entries[student_id])
+
     def submit_grades(self):
         """Submit all entered grades to database"""
-        exam_text = self.exam_combo.get()
-        if "No exams found" in exam_text or not exam_text:
-            self.show_message("No exam selected", "error")
+        # Marks go to the exam whose sheet is shown, whatever the combo says now
+        exam_id = self.shown_grading_exam_id
+        if exam_id is None:
+            self.show_message("Load the students of an exam first", "error")
             return
-            
-        # Extract exam_id
-        try:
-            exam_id = int(exam_text.split(" - ")[0])
-        except (ValueError, IndexError):
-            self.show_message("Invalid exam selection", "error")
-            return
-            
+
         # Get total marks
         total_marks = self.total_marks_entry.get().strip()
         if not total_marks:
@@ -258,49 +340,53 @@ class TeacherGrades:
             self.show_message("Total marks must be a number", "error")
             return
             
-        # Begin submission
+        # Validate every row before writing anything
+        entries = {student_id: mark_var.get() for student_id, mark_var in self.student_mark_entries.items()}
+        marks, errors = validate_grades(entries, total_marks)
+        if errors:
+            self.show_message(format_errors(errors), "error")
+            return
+
+        # Upsert the whole exam in one transaction
         try:
-            for student_id, mark_entry in self.student_mark_entries.items():
-                mark = mark_entry.get().strip()
-                if not mark:
-                    continue  # Skip empty entries
-                    
-                try:
-                    mark = int(mark)
-                    if mark < 0 or mark > total_marks:
-                        self.show_message(f"Invalid mark for student {student_id}: must be between 0 and {total_marks}", "error")
-                        return
-                except ValueError:
-                    self.show_message(f"Invalid mark for student {student_id}: must be a number", "error")
-                    return
-                    
-                # Check if grade already exists
-                self.db.cursor.execute("""
-                    SELECT grade_id FROM grades 
-                    WHERE student_id = ? AND exam_id = ?
-                """, (student_id, exam_id))
-                existing = self.db.cursor.fetchone()
-                
-                if existing:
-                    # Update existing grade
-                    self.db.cursor.execute("""
-                        UPDATE grades SET marks_obtained = ?, total_marks = ?
-                        WHERE student_id = ? AND exam_id = ?
-                    """, (mark, total_marks, student_id, exam_id))
-                else:
-                    # Insert new grade
-                    self.db.cursor.execute("""
-                        INSERT INTO grades (student_id, exam_id, marks_obtained, total_marks)
-                        VALUES (?, ?, ?, ?)
-                    """, (student_id, exam_id, mark, total_marks))
-                    
-            self.db.conn.commit()
+            save_grades(exam_id, marks, total_marks, conn=self.db.conn)
+            self.remember_marks(exam_id, marks)
+            change_feed.poll_now(self.parent_frame)
             self.show_message("Grades submitted successfully")
-            
+
         except sqlite3.Error as e:
-            self.db.conn.rollback()
             self.show_message(f"Database error: {str(e)}", "error")
     
+    def remember_marks(self, exam_id, marks):
+        """Apply our own submission to the cached sheet so it is not re-queried"""
+        cached = self.grading_sheets.get(exam_id)
+        if cached is None:
+            return
+        for student_id, mark in marks.items():
+            if student_id in cached["marks"]:
+                cached["marks"][student_id] = cached["marks"][student_id][:4] + (mark,)
+        cached["versions"] = fetch_table_versions(GRADING_TABLES)
+
+    def apply_grade_changes(self, changes):
+        """Re-read the marks of exams whose grades changed elsewhere and patch the open sheets"""
+        exam_ids = {change.scope_key for change in changes}
+        for exam_id in exam_ids & set(self.grading_sheets):
+            cached = self.grading_sheets[exam_id]
+            marks = fetch_exam_marks(exam_id, conn=self.db.conn)
+            for student_id, row in list(cached["marks"].items()):
+                mark = marks.get(student_id)
+                if row[4] == mark:
+                    continue
+                cached["marks"][student_id] = row[:4] + (mark,)
+                # Leave marks the teacher is in the middle of editing alone
+                mark_var = self.student_mark_entries.get(student_id) if exam_id == self.grading_exam_id else None
+                if mark_var is not None and mark_var.get() == ("" if row[4] is None else str(row[4])):
+                    mark_var.set("" if mark is None else str(mark))
+            cached["versions"] = fetch_table_versions(GRADING_TABLES)
+
+        if self.viewed_exam_id in exam_ids and self.frame is not None and self.frame.winfo_exists():
+            self.load_exam_grades(self.viewed_exam_id)
+
     def view_exam_grades(self):
         """View grades for the selected exam"""
         exam_text = self.view_exam_combo.get()
@@ -315,78 +401,71 @@ class TeacherGrades:
             self.show_message("Invalid exam selection", "error")
             return
             
-        try:
-            # Get exam info
-            self.db.cursor.execute("""
-                SELECT e.exam_type, s.subject_name, e.date
-                FROM exams e
-                JOIN subjects s ON e.subject_id = s.subject_id
-                WHERE e.exam_id = ?
-            """, (exam_id,))
-            exam_info = self.db.cursor.fetchone()
-            
-            if not exam_info:
-                self.show_message("Exam not found", "error")
-                return
-                
-            # Get grades
-            query = """
-                SELECT s.name, s.roll_number, g.marks_obtained, g.total_marks
-                FROM grades g
-                JOIN students s ON g.student_id = s.student_id
-                WHERE g.exam_id = ?
-                ORDER BY s.name
-            """
-            self.db.cursor.execute(query, (exam_id,))
-            grades = self.db.cursor.fetchall()
-            
-            # Clear and update the textbox
-            self.grades_textbox.delete("1.0", "end")
-            
-            # Exam header
-            exam_header = f"Exam: {exam_info[0]} - {exam_info[1]} on {exam_info[2]}\n"
-            self.grades_textbox.insert("end", exam_header)
-            self.grades_textbox.insert("end", "=" * len(exam_header) + "\n\n")
+        self.load_exam_grades(exam_id)
+
+    def load_exam_grades(self, exam_id):
+        self.viewed_exam_id = exam_id
+        self.loader.submit(
+            lambda: fetch_exam_grades(exam_id),
+            lambda result: self.show_exam_grades(exam_id, *result),
+            lambda error: self.show_message(f"Database error: {str(error)}", "error"),
+        )
+
+    def show_exam_grades(self, exam_id, exam_info, grades):
+        if exam_id != self.viewed_exam_id:
+            return  # Another exam was picked since
+        if not exam_info:
+            self.show_message("Exam not found", "error")
+            return
+
+        # Clear and update the textbox
+        self.grades_textbox.delete("1.0", "end")
+        
+        # Exam header
+        exam_header = f"Exam: {exam_info[0]} - {exam_info[1]} on {exam_info[2]}\n"
+        self.grades_textbox.insert("end", exam_header)
+        self.grades_textbox.insert("end", "=" * len(exam_header) + "\n\n")
+        
+        if not grades:
+            self.grades_textbox.insert("end", "No grades recorded for this exam.")
+            return
             
-            if not grades:
-                self.grades_textbox.insert("end", "No grades recorded for this exam.")
-                return
-                
-            # Calculate statistics
-            total_students = len(grades)
-            sum_percentage = 0
-            highest_mark = 0
-            lowest_mark = float('inf')
+        # Calculate statistics
+        total_students = len(grades)
+        sum_percentage = 0
+        highest_mark = 0
+        lowest_mark = float('inf')
+        
+        # Display grades and gather stats
+        for grade in grades:
+            name, roll, marks, total = grade
+            percentage = (marks / total) * 100 if total > 0 else 0
+            sum_percentage += percentage
+            highest_mark = max(highest_mark, percentage)
+            lowest_mark = min(lowest_mark, percentage)
             
-            # Display grades and gather stats
-            for grade in grades:
-                name, roll, marks, total = grade
-                percentage = (marks / total) * 100 if total > 0 else 0
-                sum_percentage += percentage
-                highest_mark = max(highest_mark, percentage)
-                lowest_mark = min(lowest_mark, percentage)
-                
-                self.grades_textbox.insert("end", f"Student: {name} (Roll: {roll})\n")
-                self.grades_textbox.insert("end", f"Marks: {marks}/{total} ({percentage:.2f}%)\n")
-                self.grades_textbox.insert("end", "-" * 40 + "\n")
-                
-            # Class statistics
-            self.grades_textbox.insert("end", "\nCLASS STATISTICS\n")
-            self.grades_textbox.insert("end", "-" * 20 + "\n")
-            self.grades_textbox.insert("end", f"Total Students: {total_students}\n")
+            self.grades_textbox.insert("end", f"Student: {name} (Roll: {roll})\n")
+            self.grades_textbox.insert("end", f"Marks: {marks}/{total} ({percentage:.2f}%)\n")
+            self.grades_textbox.insert("end", "-" * 40 + "\n")
             
-            if total_students > 0:
-                avg_percentage = sum_percentage / total_students
-                self.grades_textbox.insert("end", f"Average Percentage: {avg_percentage:.2f}%\n")
-                self.grades_textbox.insert("end", f"Highest Percentage: {highest_mark:.2f}%\n")
-                if lowest_mark != float('inf'):
-                    self.grades_textbox.insert("end", f"Lowest Percentage: {lowest_mark:.2f}%\n")
-                
-        except sqlite3.Error as e:
-            self.show_message(f"Database error: {str(e)}", "error")
+        # Class statistics
+        self.grades_textbox.insert("end", "\nCLASS STATISTICS\n")
+        self.grades_textbox.insert("end", "-" * 20 + "\n")
+        self.grades_textbox.insert("end", f"Total Students: {total_students}\n")
+        
+        if total_students > 0:
+            avg_percentage = sum_percentage / total_students
+            self.grades_textbox.insert("end", f"Average Percentage: {avg_percentage:.2f}%\n")
+            self.grades_textbox.insert("end", f"Highest Percentage: {highest_mark:.2f}%\n")
+            if lowest_mark != float('inf'):
+                self.grades_textbox.insert("end", f"Lowest Percentage: {lowest_mark:.2f}%\n")
     
     def export_grades(self):
-        """Export grades data to CSV or Excel"""
+        """Export grades data to CSV or Excel, streamed on a worker thread"""
+        if self.export_format.get() in SNAPSHOT_EXPORTS:
+            self.export_snapshot(SNAPSHOT_EXPORTS[self.export_format.get()])
+            return
+            
         exam_text = self.export_exam_combo.get()
         if "No exams found" in exam_text or not exam_text:
             self.show_message("No exam selected", "error")
@@ -400,79 +479,90 @@ class TeacherGrades:
             return
             
         export_format = self.export_format.get()
+        scope = self.export_scope.get()
         
         try:
-            # Get exam info for filename
+            # Get exam info for the filters and filename
             self.db.cursor.execute("""
-                SELECT exam_type, date FROM exams WHERE exam_id = ?
+                SELECT e.exam_type, e.date, e.subject_id, s.subject_name, s.semester
+                FROM exams e
+                JOIN subjects s ON e.subject_id = s.subject_id
+                WHERE e.exam_id = ?
             """, (exam_id,))
             exam_info = self.db.cursor.fetchone()
+        except sqlite3.Error as e:
+            self.show_message(f"Database error: {str(e)}", "error")
+            return
             
-            if not exam_info:
-                self.show_message("Exam not found", "error")
-                return
-                
-            # Create a safe filename
-            exam_name = f"{exam_info[0]}_{exam_info[1]}".replace(" ", "_").replace(":", "-")
-            
-            # Get grades data
-            query = """
-                SELECT s.student_id, s.name, s.roll_number, s.course, 
-                    g.marks_obtained, g.total_marks
-                FROM grades g
-                JOIN students s ON g.student_id = s.student_id
-                WHERE g.exam_id = ?
-                ORDER BY s.name
-            """
-            self.db.cursor.execute(query, (exam_id,))
-            grades = self.db.cursor.fetchall()
+        if not exam_info:
+            self.show_message("Exam not found", "error")
+            return
+        exam_type, exam_date, subject_id, subject_name, semester = exam_info
             
-            if not grades:
+        # Always limited to this teacher's subjects
+        if scope == "Selected Exam":
+            filters = {"exam_ids": [exam_id]}
+            name = f"{exam_type}_{exam_date}"
+        elif scope == "Exam's Subject":
+            filters = {"subject_id": subject_id}
+            name = f"{subject_name}_all_exams"
+        elif scope == "Exam's Semester":
+            filters = {"semester": semester}
+            name = f"semester_{semester}"
+        else:
+            filters = {}
+            name = "all_exams"
+        filters["teacher_id"] = self.teacher_id
+        
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        filename = os.path.join(EXPORT_DIR, f"grades_{safe_filename(name)}")
+        
+        def run():
+            try:
+                return export_format, filename + FORMATS[export_format], stream_grades(
+                    filename + FORMATS[export_format], export_format, **filters
+                )
+            except ImportError:
+                # openpyxl missing: fall back to CSV
+                return "CSV", filename + ".csv", stream_grades(filename + ".csv", "CSV", **filters)
+                
+        def done(result):
+            self.export_btn.configure(state="normal", text="Export Grades")
+            written_format, path, count = result
+            if not count:
                 self.show_message("No grades to export", "error")
-                return
+            elif written_format != export_format:
+                self.show_message(f"openpyxl is required for Excel export.\nExported {count} rows as CSV instead:\n{path}")
+            else:
+                self.show_message(f"Exported {count} rows to {written_format} file:\n{path}")
                 
-            # Convert to DataFrame
-            df = pd.DataFrame(grades, columns=[
-                "Student ID", "Student Name", "Roll Number", "Course",
-                "Marks Obtained", "Total Marks"
-            ])
-            
-            # Add percentage column
-            df["Percentage"] = (df["Marks Obtained"] / df["Total Marks"] * 100).round(2)
+        def failed(error):
+            self.export_btn.configure(state="normal", text="Export Grades")
+            self.show_message(f"Export error: {str(error)}", "error")
             
-            # Create a directory for exports if it doesn't exist
-            import os
-            export_dir = "exports"
-            os.makedirs(export_dir, exist_ok=True)
+        # Rows stream from the database to the file off the Tk thread
+        self.export_btn.configure(state="disabled", text="Exporting...")
+        self.loader.submit(run, done, failed)
+        
+    def export_snapshot(self, snapshot_format):
+        """Write typed grades/attendance/exams datasets for this teacher's subjects"""
+        out_dir = os.path.join(SNAPSHOT_DIR, f"teacher_{self.teacher_id}")
+        
+        def done(counts):
+            self.export_btn.configure(state="normal", text="Export Grades")
+            rows = ", ".join(f"{dataset}: {count}" for dataset, count in counts.items())
+            self.show_message(f"Snapshot written to {out_dir}\n({rows} rows)")
             
-            # Fix extension for different export formats
-            if export_format == "CSV":
-                filename = os.path.join(export_dir, f"grades_{exam_name}.csv")
-                df.to_csv(filename, index=False)
-                self.show_message(f"Grades exported successfully to CSV file:\n{filename}")
-            elif export_format == "Excel":
-                try:
-                    # Use .xlsx extension for Excel files
-                    filename = os.path.join(export_dir, f"grades_{exam_name}.xlsx")
-                    df.to_excel(filename, index=False, sheet_name="Grades", engine="openpyxl")
-                    self.show_message(f"Grades exported successfully to Excel file:\n{filename}")
-                except ImportError:
-                    self.show_message("Error: openpyxl package is required for Excel export.\nPlease install it with: pip install openpyxl", "error")
-                    # Fallback to CSV
-                    csv_filename = os.path.join(export_dir, f"grades_{exam_name}.csv")
-                    df.to_csv(csv_filename, index=False)
-                    self.show_message(f"Exported as CSV instead:\n{csv_filename}")
-                except Exception as e:
-                    self.show_message(f"Excel export error: {str(e)}\nTrying CSV format instead.", "error")
-                    # Fallback to CSV on any other error
-                    csv_filename = os.path.join(export_dir, f"grades_{exam_name}.csv")
-                    df.to_csv(csv_filename, index=False)
-                    self.show_message(f"Exported as CSV instead:\n{csv_filename}")
+        def failed(error):
+            self.export_btn.configure(state="normal", text="Export Grades")
+            if isinstance(error, ImportError):
+                self.show_message("Error: pyarrow package is required for snapshots.\nPlease install it with: pip install pyarrow", "error")
+            else:
+                self.show_message(f"Snapshot error: {str(error)}", "error")
                 
-        except sqlite3.Error as e:
-            self.show_message(f"Database error: {str(e)}", "error")
-        except Exception as e:
-            self.show_message(f"Export error: {str(e)}", "error")  
+        self.export_btn.configure(state="disabled", text="Exporting...")
+        self.loader.submit(lambda: write_snapshot(out_dir, snapshot_format, teacher_id=self.teacher_id), done, failed)
+        
     def show_message(self, message, msg_type="info"):
         """Show simple message dialog"""
         message_window = ctk.CTkToplevel(self.frame)
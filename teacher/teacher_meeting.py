@@ -1,6 +1,8 @@
 import customtkinter as ctk
 from tkinter import messagebox
-import sqlite3
+from database import connect_db, fetch_meetings
+import change_feed
+from background import BackgroundLoader
 from tkcalendar import DateEntry  # For selecting a date
 
 
@@ -10,6 +12,11 @@ class TeacherMeeting(ctk.CTkFrame):
         self.pack(fill="both", expand=True)  # Ensure the frame fills the parent area
         self.teacher_id = teacher_id
         self.current_option = ctk.StringVar(value="Create Meeting")  # Default option
+        self.loader = BackgroundLoader(self)  # Meetings are queried off the Tk thread
+        # {meeting_id: ((date, time, meeting_id), label)}; the key orders the labels
+        self.meeting_labels = {}
+        self.meetings_loading = False
+        self.reload_meetings = False
         self.create_widgets()
 
     def create_widgets(self):
@@ -44,8 +51,15 @@ class TeacherMeeting(ctk.CTkFrame):
         self.scheduled_meetings_label.pack(pady=10)
         self.meetings_frame = ctk.CTkFrame(self)
         self.meetings_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.no_meeting_label = ctk.CTkLabel(
+            self.meetings_frame,
+            text="No scheduled meetings.",
+            font=("Arial", 12)
+        )
 
-        # Load Scheduled Meetings
+        # Keep the meetings current from the change log; subscribed before loading
+        # so a meeting written while they load is not missed
+        change_feed.subscribe(self, "meetings", self.apply_meeting_changes, key=self.teacher_id)
         self.load_scheduled_meetings()
 
     def create_meeting_widgets(self):
@@ -156,7 +170,7 @@ class TeacherMeeting(ctk.CTkFrame):
 
         try:
             # Save the meeting details in the database
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO meetings (teacher_id, date, time, purpose, link)
@@ -169,8 +183,8 @@ class TeacherMeeting(ctk.CTkFrame):
             messagebox.showinfo("Success", "Meeting scheduled successfully!")
             self.clear_create_form()
 
-            # Reload Scheduled Meetings
-            self.load_scheduled_meetings()
+            # The meetings list applies the change from the change log
+            change_feed.poll_now(self)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to schedule meeting: {str(e)}")
 
@@ -181,7 +195,7 @@ class TeacherMeeting(ctk.CTkFrame):
         meeting_time = self.delete_time_entry.get()
 
         try:
-            conn = sqlite3.connect("edutrack.db")
+            conn = connect_db()
             cursor = conn.cursor()
 
             if meeting_id:
@@ -203,49 +217,87 @@ class TeacherMeeting(ctk.CTkFrame):
             else:
                 messagebox.showwarning("Not Found", "No matching meeting found.")
 
-            # Reload Scheduled Meetings
-            self.load_scheduled_meetings()
+            # The meetings list applies the change from the change log
+            change_feed.poll_now(self)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to delete meeting: {str(e)}")
 
     def load_scheduled_meetings(self):
         """Load and display the scheduled meetings for the teacher."""
-        try:
-            # Clear the meetings frame first
-            for widget in self.meetings_frame.winfo_children():
-                widget.destroy()
+        self.meetings_loading = True
+        self.loader.submit(
+            lambda: fetch_meetings(self.teacher_id),
+            self.show_scheduled_meetings,
+            self.meetings_failed,
+        )
 
-            # Connect to the database and fetch meetings
-            conn = sqlite3.connect("edutrack.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT meeting_id, date, time, purpose, link
-                FROM meetings
-                WHERE teacher_id = ?
-                ORDER BY date, time
-            """, (self.teacher_id,))
-            meetings = cursor.fetchall()
-            conn.close()
+    def show_scheduled_meetings(self, meetings):
+        self.meetings_loading = False
+        if self.reload_meetings:
+            # Meetings changed while these were being read
+            self.reload_meetings = False
+            self.load_scheduled_meetings()
+            return
+        try:
+            # Clear the meetings shown before
+            for _, meeting_label in self.meeting_labels.values():
+                meeting_label.destroy()
+            self.meeting_labels = {}
 
             # Display the meetings
-            if meetings:
-                for meeting in meetings:
-                    meeting_label = ctk.CTkLabel(
-                        self.meetings_frame,
-                        text=f"ID: {meeting[0]} | {meeting[1]} at {meeting[2]} - {meeting[3]} (Link: {meeting[4]})",
-                        font=("Arial", 12)
-                    )
-                    meeting_label.pack(anchor="w", padx=10, pady=2)
-            else:
-                no_meeting_label = ctk.CTkLabel(
-                    self.meetings_frame,
-                    text="No scheduled meetings.",
-                    font=("Arial", 12)
-                )
-                no_meeting_label.pack(anchor="center", padx=10, pady=10)
+            for meeting in meetings:
+                self.show_meeting(meeting)
+            self.update_no_meeting_label()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load scheduled meetings: {str(e)}")
 
+    def meetings_failed(self, error):
+        self.meetings_loading = False
+        messagebox.showerror("Error", f"Failed to load scheduled meetings: {str(error)}")
+
+    def apply_meeting_changes(self, changes):
+        """Re-read only the meetings in the change log entries and update their labels."""
+        if self.meetings_loading:
+            # The list being loaded may predate these changes; read it again once it arrives
+            self.reload_meetings = True
+            return
+        meeting_ids = {change.row_key for change in changes}
+        self.loader.submit(
+            lambda: {meeting[0]: meeting for meeting in fetch_meetings(self.teacher_id, meeting_ids)},
+            lambda meetings: self.update_meetings(meeting_ids, meetings),
+            lambda error: print(f"Failed to update scheduled meetings: {str(error)}"),
+        )
+
+    def update_meetings(self, meeting_ids, meetings):
+        for meeting_id in meeting_ids:
+            if meeting_id in self.meeting_labels:
+                self.meeting_labels.pop(meeting_id)[1].destroy()
+            if meeting_id in meetings:
+                self.show_meeting(meetings[meeting_id])
+        self.update_no_meeting_label()
+
+    def show_meeting(self, meeting):
+        """Add a label for one meeting, keeping the list ordered by date and time."""
+        meeting_id, date, time, purpose, link = meeting
+        sort_key = (str(date), str(time), meeting_id)
+        meeting_label = ctk.CTkLabel(
+            self.meetings_frame,
+            text=f"ID: {meeting_id} | {date} at {time} - {purpose} (Link: {link})",
+            font=("Arial", 12)
+        )
+        later = [entry for entry in self.meeting_labels.values() if entry[0] > sort_key]
+        if later:
+            meeting_label.pack(anchor="w", padx=10, pady=2, before=min(later, key=lambda entry: entry[0])[1])
+        else:
+            meeting_label.pack(anchor="w", padx=10, pady=2)
+        self.meeting_labels[meeting_id] = (sort_key, meeting_label)
+
+    def update_no_meeting_label(self):
+        if self.meeting_labels:
+            self.no_meeting_label.pack_forget()
+        else:
+            self.no_meeting_label.pack(anchor="center", padx=10, pady=10)
+
     def clear_create_form(self):
         """Clear the form inputs for creating a meeting."""
         self.link_entry.delete(0, 'end')
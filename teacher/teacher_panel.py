@@ -1,15 +1,17 @@
 import customtkinter as ctk
 from  teacher.teacher_sidebar import create_teacher_sidebar
-from  teacher.teacher_dashboard import show_teacher_dashboard  # Import the dashboard function
+from  teacher.teacher_dashboard import load_teacher_dashboard, render_teacher_dashboard  # Import the dashboard functions
 from  teacher.teacher_announcements import MakeAnnouncements  # Import the MakeAnnouncements class
-from  teacher.teacher_timetable import TeacherTimetable
-from  teacher.teacher_attendance import TeacherAttendance
-from  teacher.teacher_meeting import TeacherMeeting
-from  teacher.teacher_grades1 import TeacherGrades
-from  teacher.teacher_exam import TeacherExam
-from teacher.teacher_performance import TeacherPerformance
-from teacher.teacher_settings import create_teacher_settings
+from teacher.teacher_settings import load_teacher_settings, render_teacher_settings
 from  teacher.db_manager import DatabaseManager  # Import the DatabaseManager class
+from background import BackgroundLoader, show_skeleton
+from view_manager import ViewManager
+from timetable_engine import TIMETABLE_TABLES
+import lazy_imports
+
+# Pages imported on first visit instead of with the panel; warmed in the
+# background once the dashboard is up
+LAZY_PAGES = ("TeacherAttendance", "TeacherExam", "TeacherGrades", "TeacherPerformance", "TeacherMeeting", "TeacherTimetable")
 
 class TeacherPanelApp(ctk.CTk):
     def __init__(self, user_data=None):
@@ -22,6 +24,10 @@ class TeacherPanelApp(ctk.CTk):
         # Default to teacher_id = 4 unless overridden by user_data
         self.user_data = user_data or (None, "default_teacher", "password", "Teacher", None, 4)  # Example: teacher_id = 4
 
+        # Runs page queries off the Tk thread
+        self.loader = BackgroundLoader(self)
+        self.performance_module = None
+
         # Sidebar
         self.sidebar = create_teacher_sidebar(
             self,
@@ -43,62 +49,110 @@ class TeacherPanelApp(ctk.CTk):
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
 
+        # Built pages are kept and re-shown instead of rebuilt on every click
+        self.views = ViewManager(self.content_frame)
+
         # Show the dashboard by default
         self.on_dashboard()
+        self.after_idle(lambda: lazy_imports.warm(LAZY_PAGES))
 
     # Navigation Functions
     def on_dashboard(self):
-        self.clear_content()
-        show_teacher_dashboard(self.content_frame, self.user_data)  # Pass user_data to the dashboard function
+        teacher_id = self.user_data[5]
+        self.show_page("dashboard", lambda: load_teacher_dashboard(teacher_id), render_teacher_dashboard,
+                       tables=("teachers", "phototeacher", "announcements", "exams", "meetings"))
+
+    def show_page(self, key, load, render, tables):
+        """Show a page rendered from load(); a refresh keeps it on screen until the new data arrives."""
+        self.show_view(key, lambda host: self.load_page(host, load, render), tables=tables,
+                       refresh=lambda host: self.reload_page(host, load, render))
+
+    def load_page(self, host, load, render):
+        """Show a skeleton right away and render the page once load() finishes in the background."""
+        show_skeleton(host)
+        self.reload_page(host, load, render)
+        return host
+
+    def reload_page(self, host, load, render):
+        self.loader.submit(
+            load,
+            lambda data: render(host, data),
+            lambda error: print(f"Failed to load page: {error}"),
+        )
 
     def on_attendance(self):
-        self.clear_content()
         teacher_id = self.user_data[5]  # Extract teacher_id from user_data
-        TeacherAttendance(self.content_frame, teacher_id)  # Pass teacher_id as an integer
+        self.show_view("attendance", lambda host: lazy_imports.load("TeacherAttendance")(host, teacher_id),
+                       tables=("subjects", "students", "attendance"), refresh=lambda view: view.refresh())
 
     def on_exams(self):
-        self.clear_content()
-        TeacherExam(self.content_frame)
+        self.show_view("exams", lambda host: lazy_imports.load("TeacherExam")(host), tables=("subjects", "exams"),
+                       refresh=lambda view: view.refresh())
 
     def on_grades(self):
-        self.clear_content()
         teacher_id = self.user_data[5]
-        grades_module = TeacherGrades(self.content_frame, teacher_id)
-        grades_module.show()  # Make sure to call show() to display the interface
-        
+
+        def build(host):
+            grades_module = lazy_imports.load("TeacherGrades")(host, teacher_id)
+            grades_module.show()  # Make sure to call show() to display the interface
+            return grades_module
+
+        self.show_view("grades", build, tables=("exams", "subjects", "students", "grades"),
+                       refresh=lambda view: view.refresh())
+
     def on_performance(self):
-        self.clear_content()
         teacher_id = self.user_data[5]
-        self.performance_module = TeacherPerformance(self.content_frame, teacher_id)
-        self.performance_module.show()  # Display the performance analysis interface
 
+        def build(host):
+            self.performance_module = lazy_imports.load("TeacherPerformance")(host, teacher_id)
+            self.performance_module.show()  # Display the performance analysis interface
+            return self.performance_module
+
+        self.show_view("performance", build, tables=("exams", "subjects", "students", "grades"),
+                       refresh=lambda view: view.refresh())
 
     def on_meetings(self):
-        self.clear_content()
+        # No tables: the change feed keeps the meetings current
         teacher_id = self.user_data[5]
-        TeacherMeeting(self.content_frame, teacher_id)
+        self.show_view("meetings", lambda host: lazy_imports.load("TeacherMeeting")(host, teacher_id))
 
     def on_announcements(self):
-        self.clear_content()
-        MakeAnnouncements(self.content_frame)  # Display the MakeAnnouncements frame in the content area
+        # Display the MakeAnnouncements frame in the content area; the change feed keeps it current
+        self.show_view("announcements", MakeAnnouncements)
 
     def on_timetable(self):
-        self.clear_content()
-        TeacherTimetable(self.content_frame)  # Display the timetable in the content area
+        teacher_id = self.user_data[5]
+        # Display the timetable in the content area; a change only updates the cells that differ
+        self.show_view("timetable", lambda host: lazy_imports.load("TeacherTimetable")(host, teacher_id),
+                       tables=TIMETABLE_TABLES, refresh=lambda view: view.load_timetable())
 
     def on_settings(self):
-        self.clear_content()
         teacher_id = self.user_data[5]
-        create_teacher_settings(self.content_frame, teacher_id)
+        self.show_page("settings", lambda: load_teacher_settings(teacher_id), render_teacher_settings,
+                       tables=("users", "teachers", "subjects"))
 
     def logout_confirmation(self):
         self.quit()  # Exit the application
 
-    def clear_content(self):
-        """Clear all widgets in the content frame."""
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+    def show_view(self, key, build, tables=(), refresh=None):
+        """Show a cached page, building it on first use and refreshing it if its tables changed."""
+        # Drop any load still running for the page we are leaving; that page
+        # only holds a skeleton now, so it must reload next time
+        if self.loader.cancel_all() and self.views.current is not None:
+            self.views.invalidate(self.views.current)
+        # Same for the performance page's own loads (filters, reports being drawn)
+        if self.views.current == "performance" and key != "performance" and self.cancel_performance_loads():
+            self.views.invalidate("performance")
+        return self.views.show(key, build, tables, refresh)
+
+    def cancel_performance_loads(self):
+        return self.performance_module is not None and self.performance_module.cancel_loads()
 
+    def clear_content(self):
+        """Destroy every cached page in the content frame."""
+        self.loader.cancel_all()
+        self.cancel_performance_loads()
+        self.views.clear()
 
 if __name__ == "__main__":
     # Default teacher_id = 4 if no user_data is provided
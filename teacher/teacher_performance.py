@@ -1,11 +1,36 @@
 import customtkinter as ctk
 from tkinter import messagebox
-import sqlite3
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-from teacher.db_manager import DatabaseManager
+from database import connect_db, fetch_student_exam_report, fetch_table_versions, fetch_teacher_subjects
+from background import BackgroundLoader, show_skeleton
+from chart_renderer import get_renderer, show_chart
+
+
+def fetch_all_students():
+    """Every student as (student_id, name, roll_number, course), ordered by name."""
+    conn = connect_db()
+    try:
+        return conn.execute("""
+            SELECT student_id, name, roll_number, course
+            FROM students
+            ORDER BY name
+        """).fetchall()
+    finally:
+        conn.close()
+
+
+def fetch_subject_exams(subject_id):
+    """The subject's exams as (exam_id, exam_type, date), newest first."""
+    conn = connect_db()
+    try:
+        return conn.execute("""
+            SELECT exam_id, exam_type, date
+            FROM exams
+            WHERE subject_id = ?
+            ORDER BY date DESC
+        """, (subject_id,)).fetchall()
+    finally:
+        conn.close()
+
 
 class TeacherPerformance:
     def __init__(self, parent_frame, teacher_id):
@@ -13,10 +38,14 @@ class TeacherPerformance:
         self.parent_frame = parent_frame
         self.teacher_id = teacher_id
         self.frame = None
-        self.db = DatabaseManager()
+        self.subject_ids = {}
+        self.student_ids = {}
+        self.exam_ids = {}
         self.selected_exam_id = None
         self.selected_student_id = None
         self.selected_subject_id = None
+        # Reports are queried and drawn off the Tk thread
+        self.loader = BackgroundLoader(parent_frame)
         
     def show(self):
         """Create and display the performance graphs frame."""
@@ -25,6 +54,10 @@ class TeacherPerformance:
         self.frame.pack(fill="both", expand=True)
         self.setup_performance_graphs()
         
+    def cancel_loads(self):
+        """Drop the loads still running, e.g. when the page is left; return True if any was."""
+        return self.loader.cancel_all()
+
     def hide(self):
         """Hide the performance graphs frame."""
         if self.frame:
@@ -47,6 +80,7 @@ class TeacherPerformance:
         # Setup tabs
         self.setup_class_report_tab()
         self.setup_individual_report_tab()
+        self.load_filters()
         
     def setup_class_report_tab(self):
         """Set up the class report tab with filters and graph area."""
@@ -62,8 +96,7 @@ class TeacherPerformance:
         
         # Subject selection
         ctk.CTkLabel(filter_frame, text="Subject:").pack(side="left", padx=5)
-        self.subjects = self.get_teacher_subjects()
-        self.subject_combo = ctk.CTkComboBox(filter_frame, values=self.subjects, width=200, 
+        self.subject_combo = ctk.CTkComboBox(filter_frame, values=["Loading..."], width=200, 
                                            command=self.load_exams_for_subject)
         self.subject_combo.pack(side="left", padx=5)
         
@@ -99,8 +132,7 @@ class TeacherPerformance:
         
         # Student selection
         ctk.CTkLabel(filter_frame, text="Student:").pack(side="left", padx=5)
-        students = self.get_all_students()
-        self.student_combo = ctk.CTkComboBox(filter_frame, values=students, width=300)
+        self.student_combo = ctk.CTkComboBox(filter_frame, values=["Loading..."], width=300)
         self.student_combo.pack(side="left", padx=5)
         
         # Generate button
@@ -112,27 +144,49 @@ class TeacherPerformance:
         self.individual_report_frame = ctk.CTkFrame(scrollable_frame, fg_color="transparent")
         self.individual_report_frame.pack(fill="both", expand=True, pady=10)
         
-    def get_teacher_subjects(self):
-        """Get subjects taught by this teacher."""
-        try:
-            query = """
-                SELECT subject_id, subject_name
-                FROM subjects
-                WHERE teacher_id = ?
-                ORDER BY subject_name
-            """
-            self.db.cursor.execute(query, (self.teacher_id,))
-            subjects = self.db.cursor.fetchall()
-            
-            if not subjects:
-                return ["No subjects found"]
-                
+    def load_filters(self):
+        """Fetch the teacher's subjects and the student list in the background."""
+        self.loader.submit(
+            lambda: (fetch_teacher_subjects(self.teacher_id), fetch_all_students()),
+            self.show_filters,
+            self.filters_failed,
+        )
+
+    def refresh(self):
+        """Reload the subject, student and exam lists, keeping the selections."""
+        self.load_filters()
+        if self.selected_subject_id is not None:
+            self.load_exams_for_subject(self.subject_combo.get())
+
+    def show_filters(self, result):
+        subjects, students = result
+        if subjects:
             # Store subject IDs for later use
             self.subject_ids = {f"{subject[1]}": subject[0] for subject in subjects}
-            return [subject[1] for subject in subjects]
-        except sqlite3.Error as e:
-            print(f"Database error: {str(e)}")
-            return ["Error loading subjects"]
+            subject_values = [subject[1] for subject in subjects]
+        else:
+            subject_values = ["No subjects found"]
+        if students:
+            # Store student IDs for later use
+            self.student_ids = {f"{student[1]} (Roll: {student[2]}, Course: {student[3]})": student[0]
+                               for student in students}
+            student_values = list(self.student_ids)
+        else:
+            student_values = ["No students found"]
+        self.subjects = subject_values
+        self.set_values(self.subject_combo, subject_values)
+        self.set_values(self.student_combo, student_values)
+
+    def filters_failed(self, error):
+        print(f"Database error: {str(error)}")
+        self.set_values(self.subject_combo, ["Error loading subjects"])
+        self.set_values(self.student_combo, ["Error loading students"])
+
+    def set_values(self, combo, values):
+        # Keep the current choice while it is still listed
+        selected = combo.get()
+        combo.configure(values=values)
+        combo.set(selected if selected in values else values[0])
     
     def load_exams_for_subject(self, subject_name):
         """Load exams for the selected subject."""
@@ -140,63 +194,35 @@ class TeacherPerformance:
             self.exam_combo.configure(values=["No exams found"])
             return
             
-        try:
-            subject_id = self.subject_ids.get(subject_name)
-            if not subject_id:
-                self.exam_combo.configure(values=["Invalid subject"])
-                return
-                
-            # Store the selected subject ID
-            self.selected_subject_id = subject_id
-                
-            # Get exams for this subject
-            query = """
-                SELECT exam_id, exam_type, date
-                FROM exams
-                WHERE subject_id = ?
-                ORDER BY date DESC
-            """
-            self.db.cursor.execute(query, (subject_id,))
-            exams = self.db.cursor.fetchall()
-            
-            if not exams:
-                self.exam_combo.configure(values=["No exams found for this subject"])
-                return
-                
-            # Create a mapping of exam display text to exam ID
-            self.exam_ids = {f"{exam[1]} on {exam[2]}": exam[0] for exam in exams}
-            
-            # Update the exam combo box
-            exam_values = [f"{exam[1]} on {exam[2]}" for exam in exams]
-            self.exam_combo.configure(values=exam_values)
-            self.exam_combo.set(exam_values[0])  # Select the first exam by default
-            
-        except sqlite3.Error as e:
-            print(f"Database error: {str(e)}")
-            self.exam_combo.configure(values=["Error loading exams"])
-    
-    def get_all_students(self):
-        """Get all students for individual reports."""
-        try:
-            query = """
-                SELECT student_id, name, roll_number, course
-                FROM students
-                ORDER BY name
-            """
-            self.db.cursor.execute(query)
-            students = self.db.cursor.fetchall()
+        subject_id = self.subject_ids.get(subject_name)
+        if not subject_id:
+            self.exam_combo.configure(values=["Invalid subject"])
+            return
             
-            if not students:
-                return ["No students found"]
-                
-            # Store student IDs for later use
-            self.student_ids = {f"{student[1]} (Roll: {student[2]}, Course: {student[3]})": student[0] 
-                               for student in students}
+        # Store the selected subject ID
+        self.selected_subject_id = subject_id
+        self.loader.submit(
+            lambda: fetch_subject_exams(subject_id),
+            lambda exams: self.show_subject_exams(subject_id, exams),
+            self.subject_exams_failed,
+        )
+
+    def show_subject_exams(self, subject_id, exams):
+        if subject_id != self.selected_subject_id:
+            return  # Another subject was picked since
+        if not exams:
+            self.exam_combo.configure(values=["No exams found for this subject"])
+            return
             
-            return [f"{student[1]} (Roll: {student[2]}, Course: {student[3]})" for student in students]
-        except sqlite3.Error as e:
-            print(f"Database error: {str(e)}")
-            return ["Error loading students"]
+        # Create a mapping of exam display text to exam ID
+        self.exam_ids = {f"{exam[1]} on {exam[2]}": exam[0] for exam in exams}
+        
+        # Update the exam combo box; the first exam is selected by default
+        self.set_values(self.exam_combo, [f"{exam[1]} on {exam[2]}" for exam in exams])
+
+    def subject_exams_failed(self, error):
+        print(f"Database error: {str(error)}")
+        self.exam_combo.configure(values=["Error loading exams"])
     
     def generate_class_report(self):
         """Generate and display class performance report."""
@@ -213,49 +239,55 @@ class TeacherPerformance:
             
         # Store the selected exam ID
         self.selected_exam_id = exam_id
-            
+        
+        # Query, compute and draw in the background; Tk only shows the result
+        for widget in self.stats_frame.winfo_children():
+            widget.destroy()
+        show_skeleton(self.class_report_frame, rows=1, text="Generating report...")
+        self.loader.submit(
+            lambda: self.load_class_report(exam_id),
+            self.show_class_report,
+            lambda error: self.show_message(f"Error generating report: {str(error)}", "error"),
+        )
+            
+    def load_class_report(self, exam_id):
+        """Build the class report for an exam; runs on a worker thread."""
+        # The chart only changes when grades do
+        grades_version = fetch_table_versions(("grades",)).get("grades")
+        
+        conn = connect_db()
         try:
             # Get exam grades
-            query = """
+            grades = conn.execute("""
                 SELECT s.name, g.marks_obtained, g.total_marks
                 FROM grades g
                 JOIN students s ON g.student_id = s.student_id
                 WHERE g.exam_id = ?
                 ORDER BY g.marks_obtained DESC
-            """
-            self.db.cursor.execute(query, (exam_id,))
-            grades = self.db.cursor.fetchall()
+            """, (exam_id,)).fetchall()
+        finally:
+            conn.close()
             
-            if not grades:
-                self.show_message("No grades found for this exam", "error")
-                return
-                
-            # Process the data
-            names = [grade[0] for grade in grades]
-            marks = [grade[1] for grade in grades]
-            total_marks = grades[0][2]  # Assuming total marks is the same for all students
-            
-            # Calculate percentages
-            percentages = [(mark / total_marks) * 100 for mark in marks]
-            
-            # Clear previous plots
-            for widget in self.class_report_frame.winfo_children():
-                widget.destroy()
-                
-            # Clear previous stats
-            for widget in self.stats_frame.winfo_children():
-                widget.destroy()
-                
-            # Create figure with 2 subplots (removed pie charts)
-            fig = plt.figure(figsize=(10, 6), dpi=100)  # Reduced height to fit better
+        if not grades:
+            return None
             
+        # Process the data
+        names = [grade[0] for grade in grades]
+        marks = [grade[1] for grade in grades]
+        total_marks = grades[0][2]  # Assuming total marks is the same for all students
+        
+        # Calculate percentages
+        percentages = [(mark / total_marks) * 100 for mark in marks]
+        
+        def draw(fig):
             # First subplot - Bar chart of marks (enlarged to take full width)
             ax1 = fig.add_subplot(2, 1, 1)
-            bars = ax1.bar(names, marks, color='skyblue')
+            ax1.bar(names, marks, color='skyblue')
             ax1.set_title('Student Marks')
             ax1.set_xlabel('Students')
             ax1.set_ylabel('Marks')
             ax1.axhline(y=total_marks * 0.4, color='r', linestyle='--', label='Pass Threshold (40%)')
+            ax1.set_xticks(range(len(names)))
             ax1.set_xticklabels(names, rotation=90, ha='center', fontsize=8)  # Adjusted for more students
             ax1.tick_params(axis='x', which='major', pad=5)
             ax1.legend()
@@ -266,60 +298,69 @@ class TeacherPerformance:
             ax2.set_title('Distribution of Marks (%)')
             ax2.set_xlabel('Percentage')
             ax2.set_ylabel('Number of Students')
+        
+        # Figure with 2 subplots, reused from the cache while the grades are unchanged
+        key = ("class", exam_id, grades_version) if grades_version is not None else None
+        image = get_renderer().render(key, draw)
+        
+        # Calculate statistics
+        avg_percentage = sum(percentages) / len(percentages)
+        highest_percentage = max(percentages)
+        lowest_percentage = min(percentages)
+        pass_count = sum(1 for p in percentages if p >= 40)
+        pass_percentage = (pass_count / len(percentages)) * 100
+        
+        stats_text = (
+            f"Total Students: {len(percentages)}  |  "
+            f"Average Mark: {avg_percentage:.2f}%  |  "
+            f"Highest Mark: {highest_percentage:.2f}%  |  "
+            f"Lowest Mark: {lowest_percentage:.2f}%  |  "
+            f"Pass Rate: {pass_percentage:.2f}%"
+        )
+        
+        # Add performance comments
+        comment = "Performance Analysis: "
+        if avg_percentage >= 75:
+            comment += "Excellent class performance. Most students are performing well above expectations."
+        elif avg_percentage >= 60:
+            comment += "Good class performance. Most students are performing at or above expectations."
+        elif avg_percentage >= 40:
+            comment += "Average class performance. Many students are just meeting minimum requirements."
+        else:
+            comment += "Below average class performance. Intervention may be needed to improve results."
+            
+        return {"image": image, "stats": stats_text, "comment": comment}
+        
+    def show_class_report(self, report):
+        """Display a class report built by load_class_report."""
+        # Clear previous plots
+        for widget in self.class_report_frame.winfo_children():
+            widget.destroy()
+            
+        # Clear previous stats
+        for widget in self.stats_frame.winfo_children():
+            widget.destroy()
+            
+        if report is None:
+            self.show_message("No grades found for this exam", "error")
+            return
             
-            # Adjust layout
-            plt.tight_layout()
-            
-            # Create canvas and add to frame
-            canvas = FigureCanvasTkAgg(fig, master=self.class_report_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True)
-            
-            # Calculate statistics
-            avg_percentage = sum(percentages) / len(percentages)
-            highest_percentage = max(percentages)
-            lowest_percentage = min(percentages)
-            pass_count = sum(1 for p in percentages if p >= 40)
-            pass_percentage = (pass_count / len(percentages)) * 100
-            
-            # Display statistics
-            stats_header = ctk.CTkLabel(self.stats_frame, 
-                                      text="Class Statistics", 
-                                      font=("Arial", 14, "bold"))
-            stats_header.pack(anchor="w", padx=10, pady=5)
-            
-            stats_text = (
-                f"Total Students: {len(percentages)}  |  "
-                f"Average Mark: {avg_percentage:.2f}%  |  "
-                f"Highest Mark: {highest_percentage:.2f}%  |  "
-                f"Lowest Mark: {lowest_percentage:.2f}%  |  "
-                f"Pass Rate: {pass_percentage:.2f}%"
-            )
-            
-            stats_label = ctk.CTkLabel(self.stats_frame, text=stats_text, 
-                                     font=("Arial", 12))
-            stats_label.pack(anchor="w", padx=10, pady=5)
-            
-            # Add performance comments
-            comment = "Performance Analysis: "
-            if avg_percentage >= 75:
-                comment += "Excellent class performance. Most students are performing well above expectations."
-            elif avg_percentage >= 60:
-                comment += "Good class performance. Most students are performing at or above expectations."
-            elif avg_percentage >= 40:
-                comment += "Average class performance. Many students are just meeting minimum requirements."
-            else:
-                comment += "Below average class performance. Intervention may be needed to improve results."
-                
-            comment_label = ctk.CTkLabel(self.stats_frame, text=comment, 
-                                       font=("Arial", 12), 
-                                       wraplength=700)
-            comment_label.pack(anchor="w", padx=10, pady=5)
-            
-        except sqlite3.Error as e:
-            self.show_message(f"Database error: {str(e)}", "error")
-        except Exception as e:
-            self.show_message(f"Error generating report: {str(e)}", "error")
+        show_chart(self.class_report_frame, report["image"])
+        
+        # Display statistics
+        stats_header = ctk.CTkLabel(self.stats_frame, 
+                                  text="Class Statistics", 
+                                  font=("Arial", 14, "bold"))
+        stats_header.pack(anchor="w", padx=10, pady=5)
+        
+        stats_label = ctk.CTkLabel(self.stats_frame, text=report["stats"], 
+                                 font=("Arial", 12))
+        stats_label.pack(anchor="w", padx=10, pady=5)
+        
+        comment_label = ctk.CTkLabel(self.stats_frame, text=report["comment"], 
+                                   font=("Arial", 12), 
+                                   wraplength=700)
+        comment_label.pack(anchor="w", padx=10, pady=5)
             
     def generate_individual_report(self):
         """Generate and display individual student report."""
@@ -336,41 +377,47 @@ class TeacherPerformance:
             
         # Store the selected student ID
         self.selected_student_id = student_id
-            
-        try:
-            # Get all grades for this student
-            query = """
-                SELECT e.exam_type, s.subject_name, g.marks_obtained, g.total_marks, e.date
-                FROM grades g
-                JOIN exams e ON g.exam_id = e.exam_id
-                JOIN subjects s ON e.subject_id = s.subject_id
-                JOIN teachers t ON s.teacher_id = t.teacher_id
-                WHERE g.student_id = ? AND t.teacher_id = ?
-                ORDER BY e.date DESC
-            """
-            self.db.cursor.execute(query, (student_id, self.teacher_id))
-            grades = self.db.cursor.fetchall()
-            
-            if not grades:
-                self.show_message("No grades found for this student", "error")
-                return
-                
-            # Process the data
-            exam_names = [f"{grade[0]} - {grade[1]}" for grade in grades]
-            marks = [grade[2] for grade in grades]
-            total_marks = [grade[3] for grade in grades]
-            dates = [grade[4] for grade in grades]
-            
-            # Calculate percentages
-            percentages = [(mark / total) * 100 for mark, total in zip(marks, total_marks)]
-            
-            # Clear previous plots
-            for widget in self.individual_report_frame.winfo_children():
-                widget.destroy()
-                
-            # Create figure with multiple subplots - reduced figure size
-            fig = plt.figure(figsize=(10, 6), dpi=100)  # Reduced height to fit better
-            
+        
+        # Get student name
+        student_name = student_text.split(" (")[0]
+        
+        # Query, compute and draw in the background; Tk only shows the result
+        show_skeleton(self.individual_report_frame, rows=1, text="Generating report...")
+        self.loader.submit(
+            lambda: self.load_individual_report(student_id, student_name),
+            self.show_individual_report,
+            lambda error: self.show_message(f"Error generating report: {str(error)}", "error"),
+        )
+            
+    def load_individual_report(self, student_id, student_name):
+        """Build the report for one student; runs on a worker thread."""
+        import numpy as np  # Imported on first use, off the Tk thread
+
+        # The charts only change when grades or the exams they belong to do
+        versions = fetch_table_versions(("grades", "exams", "subjects"))
+        
+        # All grades for this student, joined once with each exam's class statistics
+        grades = fetch_student_exam_report(student_id, self.teacher_id)
+        
+        if not grades:
+            return None
+            
+        # Process the data
+        exam_names = [f"{grade[0]} - {grade[1]}" for grade in grades]
+        marks = np.array([grade[2] for grade in grades], dtype=float)
+        total_marks = np.array([grade[3] for grade in grades], dtype=float)
+        dates = [grade[4] for grade in grades]
+        class_averages = np.array([np.nan if grade[5] is None else grade[5] for grade in grades], dtype=float)
+        class_stddevs = np.array([np.nan if grade[6] is None else grade[6] for grade in grades], dtype=float)
+        class_medians = np.array([np.nan if grade[7] is None else grade[7] for grade in grades], dtype=float)
+        
+        # Calculate percentages and the comparison with the class, vectorized
+        percentages = np.divide(marks * 100, total_marks, out=np.zeros_like(marks), where=total_marks > 0)
+        vs_average = percentages - class_averages
+        z_scores = np.divide(vs_average, class_stddevs, out=np.zeros_like(vs_average), where=class_stddevs > 0)
+        above_median = int(np.sum(percentages > class_medians))
+        
+        def draw(fig):
             # First subplot - Line chart of performance over time
             ax1 = fig.add_subplot(2, 1, 1)
             ax1.plot(dates, percentages, marker='o', linestyle='-', color='blue')
@@ -378,45 +425,19 @@ class TeacherPerformance:
             ax1.set_xlabel('Exam Date')
             ax1.set_ylabel('Percentage (%)')
             ax1.axhline(y=40, color='r', linestyle='--', label='Pass Threshold (40%)')
-            ax1.set_xticklabels(dates, rotation=45, ha='right')
+            ax1.tick_params(axis='x', labelrotation=45)
             ax1.grid(True, linestyle='--', alpha=0.7)
             ax1.legend()
             
             # Second subplot - Bar chart comparing with class average
             ax2 = fig.add_subplot(2, 1, 2)
             
-            # Get class average for each exam
-            class_averages = []
-            
-            for i, grade in enumerate(grades):
-                # Get the exam_id for this grade
-                self.db.cursor.execute("""
-                    SELECT exam_id FROM exams 
-                    WHERE exam_type = ? AND subject_id = (SELECT subject_id FROM subjects WHERE subject_name = ?)
-                    AND date = ?
-                """, (grade[0], grade[1], grade[4]))
-                
-                exam_id = self.db.cursor.fetchone()
-                
-                if exam_id:
-                    # Get all grades for this exam
-                    self.db.cursor.execute("""
-                        SELECT AVG(marks_obtained * 100.0 / total_marks) 
-                        FROM grades 
-                        WHERE exam_id = ?
-                    """, (exam_id[0],))
-                    
-                    avg = self.db.cursor.fetchone()[0]
-                    class_averages.append(avg)
-                else:
-                    class_averages.append(0)  # Default if exam not found
-            
             # Set up bar chart data
             x = np.arange(len(exam_names))
             width = 0.35
             
             ax2.bar(x - width/2, percentages, width, label='Student')
-            ax2.bar(x + width/2, class_averages, width, label='Class Average')
+            ax2.bar(x + width/2, np.nan_to_num(class_averages), width, label='Class Average')
             
             ax2.set_title('Student vs Class Average')
             ax2.set_xlabel('Exams')
@@ -425,94 +446,111 @@ class TeacherPerformance:
             ax2.set_xticklabels(exam_names, rotation=45, ha='right')
             ax2.legend()
             ax2.grid(True, linestyle='--', alpha=0.3)
-            
-            # Adjust layout
-            plt.tight_layout()
-            
-            # Create canvas and add to frame
-            canvas = FigureCanvasTkAgg(fig, master=self.individual_report_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True)
-            
-            # Add statistics and comments
-            stats_frame = ctk.CTkFrame(self.individual_report_frame, fg_color="transparent")
-            stats_frame.pack(fill="x", pady=10)
-            
-            # Get student name
-            student_name = student_text.split(" (")[0]
-            
-            # Calculate overall performance
-            avg_percentage = sum(percentages) / len(percentages)
-            highest_percentage = max(percentages)
-            lowest_percentage = min(percentages)
-            pass_count = sum(1 for p in percentages if p >= 40)
-            pass_rate = (pass_count / len(percentages)) * 100
-            
-            # Check for improvement trend
-            if len(percentages) >= 2:
-                # Check the trend of most recent exams (last 3 or all if less than 3)
-                recent_count = min(3, len(percentages))
-                recent_percentages = percentages[:recent_count]  # Most recent first
-                
-                if all(recent_percentages[i] >= recent_percentages[i+1] for i in range(len(recent_percentages)-1)):
-                    trend = "improving"
-                elif all(recent_percentages[i] <= recent_percentages[i+1] for i in range(len(recent_percentages)-1)):
-                    trend = "declining"
-                else:
-                    trend = "stable"
+        
+        # Figure with multiple subplots, reused from the cache while the data is unchanged
+        key = None
+        if versions:
+            key = ("student", student_id, self.teacher_id) + tuple(sorted(versions.items()))
+        image = get_renderer().render(key, draw)
+        
+        # Calculate overall performance
+        avg_percentage = percentages.mean()
+        highest_percentage = percentages.max()
+        lowest_percentage = percentages.min()
+        pass_rate = np.mean(percentages >= 40) * 100
+        
+        # Check for improvement trend
+        if len(percentages) >= 2:
+            # Check the trend of most recent exams (last 3 or all if less than 3)
+            steps = np.diff(percentages[:3])  # Most recent first
+            
+            if np.all(steps <= 0):
+                trend = "improving"
+            elif np.all(steps >= 0):
+                trend = "declining"
             else:
-                trend = "not enough data"
-            
-            # Display statistics
-            stats_header = ctk.CTkLabel(stats_frame, 
-                                      text=f"Performance Report for {student_name}", 
-                                      font=("Arial", 14, "bold"))
-            stats_header.pack(anchor="w", padx=10, pady=5)
-            
-            stats_text = (
-                f"Total Exams: {len(percentages)}  |  "
-                f"Average Performance: {avg_percentage:.2f}%  |  "
-                f"Highest: {highest_percentage:.2f}%  |  "
-                f"Lowest: {lowest_percentage:.2f}%  |  "
-                f"Pass Rate: {pass_rate:.2f}%"
+                trend = "stable"
+        else:
+            trend = "not enough data"
+        
+        stats_text = (
+            f"Total Exams: {len(percentages)}  |  "
+            f"Average Performance: {avg_percentage:.2f}%  |  "
+            f"Highest: {highest_percentage:.2f}%  |  "
+            f"Lowest: {lowest_percentage:.2f}%  |  "
+            f"Pass Rate: {pass_rate:.2f}%"
+        )
+        
+        # Comparison with the class, from the per-exam statistics
+        class_text = None
+        compared = ~np.isnan(class_averages)
+        if compared.any():
+            class_text = (
+                f"Vs Class Average: {np.mean(vs_average[compared]):+.2f}%  |  "
+                f"Average Z-Score: {np.mean(z_scores[compared]):+.2f}  |  "
+                f"Above Class Median: {above_median}/{int(compared.sum())} exams"
             )
+        
+        # Add performance comments
+        comment = "Performance Analysis: "
+        
+        # Overall performance comment
+        if avg_percentage >= 75:
+            comment += f"{student_name} is performing excellently. "
+        elif avg_percentage >= 60:
+            comment += f"{student_name} is performing well. "
+        elif avg_percentage >= 40:
+            comment += f"{student_name} is performing adequately but has room for improvement. "
+        else:
+            comment += f"{student_name} is performing below expectations. Additional support may be needed. "
+        
+        # Trend comment
+        if trend == "improving":
+            comment += "Their performance shows an improving trend in recent exams."
+        elif trend == "declining":
+            comment += "Their performance shows a declining trend in recent exams. This may require attention."
+        elif trend == "stable":
+            comment += "Their performance has been relatively stable across exams."
+        else:
+            comment += "Not enough data to determine performance trends."
+            
+        return {"image": image, "name": student_name, "stats": stats_text, "class": class_text, "comment": comment}
+        
+    def show_individual_report(self, report):
+        """Display a student report built by load_individual_report."""
+        # Clear previous plots
+        for widget in self.individual_report_frame.winfo_children():
+            widget.destroy()
+            
+        if report is None:
+            self.show_message("No grades found for this student", "error")
+            return
             
-            stats_label = ctk.CTkLabel(stats_frame, text=stats_text, 
+        show_chart(self.individual_report_frame, report["image"])
+        
+        # Add statistics and comments
+        stats_frame = ctk.CTkFrame(self.individual_report_frame, fg_color="transparent")
+        stats_frame.pack(fill="x", pady=10)
+        
+        # Display statistics
+        stats_header = ctk.CTkLabel(stats_frame, 
+                                  text=f"Performance Report for {report['name']}", 
+                                  font=("Arial", 14, "bold"))
+        stats_header.pack(anchor="w", padx=10, pady=5)
+        
+        stats_label = ctk.CTkLabel(stats_frame, text=report["stats"], 
+                                 font=("Arial", 12))
+        stats_label.pack(anchor="w", padx=10, pady=5)
+        
+        if report["class"]:
+            class_label = ctk.CTkLabel(stats_frame, text=report["class"], 
                                      font=("Arial", 12))
-            stats_label.pack(anchor="w", padx=10, pady=5)
-            
-            # Add performance comments
-            comment = "Performance Analysis: "
-            
-            # Overall performance comment
-            if avg_percentage >= 75:
-                comment += f"{student_name} is performing excellently. "
-            elif avg_percentage >= 60:
-                comment += f"{student_name} is performing well. "
-            elif avg_percentage >= 40:
-                comment += f"{student_name} is performing adequately but has room for improvement. "
-            else:
-                comment += f"{student_name} is performing below expectations. Additional support may be needed. "
-            
-            # Trend comment
-            if trend == "improving":
-                comment += "Their performance shows an improving trend in recent exams."
-            elif trend == "declining":
-                comment += "Their performance shows a declining trend in recent exams. This may require attention."
-            elif trend == "stable":
-                comment += "Their performance has been relatively stable across exams."
-            else:
-                comment += "Not enough data to determine performance trends."
-                
-            comment_label = ctk.CTkLabel(stats_frame, text=comment, 
-                                       font=("Arial", 12), 
-                                       wraplength=700)
-            comment_label.pack(anchor="w", padx=10, pady=5)
+            class_label.pack(anchor="w", padx=10, pady=5)
             
-        except sqlite3.Error as e:
-            self.show_message(f"Database error: {str(e)}", "error")
-        except Exception as e:
-            self.show_message(f"Error generating report: {str(e)}", "error")
+        comment_label = ctk.CTkLabel(stats_frame, text=report["comment"], 
+                                   font=("Arial", 12), 
+                                   wraplength=700)
+        comment_label.pack(anchor="w", padx=10, pady=5)
             
     def show_message(self, message, msg_type="info"):
         """Show simple message dialog."""
@@ -1,5 +1,6 @@
 import customtkinter as ctk
 import sqlite3
+from database import connect_db
 from tkinter import messagebox
 import re  # For password validation
 
@@ -20,7 +21,7 @@ def validate_password(password):
 def change_password(user_id, current_password, new_password, confirm_password):
     """Handle password change functionality."""
     try:
-        conn = sqlite3.connect("edutrack.db")
+        conn = connect_db()
         cursor = conn.cursor()
 
         # Verify current password
@@ -54,89 +55,92 @@ def change_password(user_id, current_password, new_password, confirm_password):
 
 def create_teacher_settings(parent, teacher_id):
     """Function to display the Settings page for teachers."""
+    render_teacher_settings(parent, load_teacher_settings(teacher_id))
+
+
+def load_teacher_settings(teacher_id):
+    """Fetch (user_id, username, teacher_name, department, subject_list); None if the user or teacher is missing."""
+    conn = connect_db()
     try:
-        # Database connection
-        conn = sqlite3.connect("edutrack.db")
         cursor = conn.cursor()
 
         # Fetch user details
         cursor.execute("SELECT username, user_id FROM users WHERE teacher_id = ?", (teacher_id,))
         user_details = cursor.fetchone()
-
         if not user_details:
-            messagebox.showerror("Error", "User details not found.")
-            return
-
+            return None
         username, user_id = user_details
 
         # Fetch Teacher Details
         cursor.execute("SELECT name, department FROM teachers WHERE teacher_id = ?", (teacher_id,))
         teacher_details = cursor.fetchone()
-
         if not teacher_details:
-            messagebox.showerror("Error", "Teacher details not found.")
-            return
-
+            return None
         teacher_name, department = teacher_details
 
         cursor.execute("SELECT DISTINCT subject_name FROM subjects WHERE teacher_id = ?", (teacher_id,))
         subjects = cursor.fetchall()
         subject_list= ", ".join([subject[0] for subject in subjects]) if subjects else "No courses assigned"
+        return user_id, username, teacher_name, department, subject_list
+    finally:
+        conn.close()
 
-        # Clear previous widgets
-        for widget in parent.winfo_children():
-            widget.destroy()
 
-        # Create Header for Settings
-        title_label = ctk.CTkLabel(parent, text="Teacher Settings", font=("Arial", 24, "bold"))
-        title_label.pack(pady=20)
+def render_teacher_settings(parent, settings):
+    # Clear previous widgets
+    for widget in parent.winfo_children():
+        widget.destroy()
 
-        # Create a frame for teacher details with padding and border
-        details_frame = ctk.CTkFrame(parent, fg_color="gray20", corner_radius=10)
-        details_frame.pack(pady=20, padx=20, fill="both", expand=False)
+    if not settings:
+        messagebox.showerror("Error", "Teacher details not found.")
+        return
 
-        # Display Teacher Details
-        teacher_info = (
-            f"Name: {teacher_name}\n"
-            f"Department: {department}\n"
-            f"Subject: {subject_list}\n"
-            f"Username: {username}"
-        )
-        teacher_label = ctk.CTkLabel(details_frame, text=teacher_info, font=("Calibri", 20), justify="left")
-        teacher_label.pack(pady=10)
+    user_id, username, teacher_name, department, subject_list = settings
 
-        # Create Change Password Section
-        password_frame = ctk.CTkFrame(parent, fg_color="gray20", corner_radius=10)
-        password_frame.pack(pady=20, padx=20, fill="both", expand=False)
+    # Create Header for Settings
+    title_label = ctk.CTkLabel(parent, text="Teacher Settings", font=("Arial", 24, "bold"))
+    title_label.pack(pady=20)
 
-        change_password_label = ctk.CTkLabel(password_frame, text="Change Password", font=("Calibri", 20, "bold"))
-        change_password_label.pack(pady=10)
+    # Create a frame for teacher details with padding and border
+    details_frame = ctk.CTkFrame(parent, fg_color="gray20", corner_radius=10)
+    details_frame.pack(pady=20, padx=20, fill="both", expand=False)
 
-        current_password_entry = ctk.CTkEntry(password_frame, placeholder_text="Current Password", show="*")
-        current_password_entry.pack(pady=5)
+    # Display Teacher Details
+    teacher_info = (
+        f"Name: {teacher_name}\n"
+        f"Department: {department}\n"
+        f"Subject: {subject_list}\n"
+        f"Username: {username}"
+    )
+    teacher_label = ctk.CTkLabel(details_frame, text=teacher_info, font=("Calibri", 20), justify="left")
+    teacher_label.pack(pady=10)
 
-        new_password_entry = ctk.CTkEntry(password_frame, placeholder_text="New Password", show="*")
-        new_password_entry.pack(pady=5)
+    # Create Change Password Section
+    password_frame = ctk.CTkFrame(parent, fg_color="gray20", corner_radius=10)
+    password_frame.pack(pady=20, padx=20, fill="both", expand=False)
 
-        confirm_password_entry = ctk.CTkEntry(password_frame, placeholder_text="Confirm New Password", show="*")
-        confirm_password_entry.pack(pady=5)
+    change_password_label = ctk.CTkLabel(password_frame, text="Change Password", font=("Calibri", 20, "bold"))
+    change_password_label.pack(pady=10)
 
-        def handle_change_password():
-            current_password = current_password_entry.get()
-            new_password = new_password_entry.get()
-            confirm_password = confirm_password_entry.get()
+    current_password_entry = ctk.CTkEntry(password_frame, placeholder_text="Current Password", show="*")
+    current_password_entry.pack(pady=5)
 
-            result = change_password(user_id, current_password, new_password, confirm_password)
-            messagebox.showinfo("Change Password", result)
+    new_password_entry = ctk.CTkEntry(password_frame, placeholder_text="New Password", show="*")
+    new_password_entry.pack(pady=5)
 
-        change_password_button = ctk.CTkButton(password_frame, text="Change Password", command=handle_change_password)
-        change_password_button.pack(pady=10)
+    confirm_password_entry = ctk.CTkEntry(password_frame, placeholder_text="Confirm New Password", show="*")
+    confirm_password_entry.pack(pady=5)
 
-    except sqlite3.Error as e:
-        messagebox.showerror("Database Error", f"An error occurred: {e}")
-    finally:
-        if conn:
-            conn.close()
+    def handle_change_password():
+        current_password = current_password_entry.get()
+        new_password = new_password_entry.get()
+        confirm_password = confirm_password_entry.get()
+
+        result = change_password(user_id, current_password, new_password, confirm_password)
+        messagebox.showinfo("Change Password", result)
+
+    change_password_button = ctk.CTkButton(password_frame, text="Change Password", command=handle_change_password)
+    change_password_button.pack(pady=10)
 
 
 # Execution Entry Point
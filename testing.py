@@ -97,6 +97,28 @@ CREATE TABLE IF NOT EXISTS users (
     FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE SET NULL,
     FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE SET NULL
 );
+
+CREATE TABLE IF NOT EXISTS announcements (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    announcement_text TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS photostudent (
+    photo_id INT AUTO_INCREMENT PRIMARY KEY,
+    student_id INT,
+    name VARCHAR(100),
+    photo_path VARCHAR(255),
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS phototeacher (
+    photo_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    teacher_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    photo_path TEXT NOT NULL,
+    FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE CASCADE
+);
 ''')
 
 # Insert sample data into the tables
@@ -0,0 +1,67 @@
+"""
+Regression tests for the exam_stats triggers (migrations 7 and 11).
+
+Run from the repository root on a throwaway copy of edutrack.db:
+
+    python -m pytest tests
+"""
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database import GRADES_UPSERT, save_grades
+from migrations import migrate
+
+
+@pytest.fixture
+def conn(tmp_path):
+    db_path = tmp_path / "edutrack.db"
+    shutil.copy(os.path.join(ROOT, "edutrack.db"), db_path)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    migrate(conn)
+    yield conn
+    conn.close()
+
+
+def exam_stats(conn, exam_id):
+    return conn.execute("SELECT count, total FROM exam_stats WHERE exam_id = ?", (exam_id,)).fetchone()
+
+
+def upsert(conn, exam_id, marks, total_marks):
+    conn.execute("BEGIN")
+    conn.executemany(GRADES_UPSERT, [(student_id, exam_id, mark, total_marks) for student_id, mark in marks.items()])
+    conn.execute("COMMIT")
+
+
+def test_resubmitting_an_exam_updates_stats_in_place(conn):
+    conn.execute("DELETE FROM grades WHERE exam_id = 8")
+    upsert(conn, 8, {1: 10, 2: 12}, 20)
+    upsert(conn, 8, {1: 10, 2: 12}, 20)
+    assert exam_stats(conn, 8) == (2, pytest.approx(110.0))
+
+    upsert(conn, 8, {1: 20, 2: 12}, 20)
+    assert exam_stats(conn, 8) == (2, pytest.approx(160.0))
+
+
+def test_resubmitting_an_exam_creates_no_duplicate_stats_row(conn):
+    # Exam 8 already has grades, so the upsert goes through the update trigger
+    before = exam_stats(conn, 8)
+    upsert(conn, 8, {1: 10, 2: 12}, 20)
+    count = conn.execute("SELECT COUNT(*) FROM grades WHERE exam_id = 8").fetchone()[0]
+    assert exam_stats(conn, 8)[0] == count
+    assert conn.execute("SELECT COUNT(*) FROM exam_stats WHERE exam_id = 8").fetchone()[0] == 1
+    assert before[0] <= count
+
+
+def test_save_grades_twice(conn):
+    pytest.importorskip("numpy")
+    assert save_grades(8, {1: 10, 2: 12}, 20, conn=conn) == 2
+    assert save_grades(8, {1: 10, 2: 12}, 20, conn=conn) == 2
+    count, _ = exam_stats(conn, 8)
+    assert count == conn.execute("SELECT COUNT(*) FROM grades WHERE exam_id = 8").fetchone()[0]
@@ -0,0 +1,59 @@
+"""
+Migrations must apply both to the shipped edutrack.db and to a fresh
+database created by testing.py.
+"""
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from migrations import MIGRATIONS, migrate
+
+LATEST = MIGRATIONS[-1][0]
+
+
+def test_migrate_fresh_database(tmp_path):
+    # testing.py writes edutrack.db in the working directory
+    subprocess.run([sys.executable, os.path.join(ROOT, "testing.py")], cwd=tmp_path, check=True)
+    conn = sqlite3.connect(tmp_path / "edutrack.db", isolation_level=None)
+    try:
+        assert migrate(conn) == LATEST
+        assert migrate(conn) == LATEST
+    finally:
+        conn.close()
+
+
+def test_migrate_shipped_database(tmp_path):
+    shutil.copy(os.path.join(ROOT, "edutrack.db"), tmp_path / "edutrack.db")
+    conn = sqlite3.connect(tmp_path / "edutrack.db", isolation_level=None)
+    try:
+        assert migrate(conn) == LATEST
+    finally:
+        conn.close()
+
+
+def test_attendance_without_subject_is_not_summarized(tmp_path):
+    shutil.copy(os.path.join(ROOT, "edutrack.db"), tmp_path / "edutrack.db")
+    conn = sqlite3.connect(tmp_path / "edutrack.db", isolation_level=None)
+    try:
+        migrate(conn)
+        summary = "SELECT COUNT(*), SUM(total) FROM attendance_summary"
+        before = conn.execute(summary).fetchone()
+        conn.execute("INSERT INTO attendance (student_id, subject_id, date, status) VALUES (1, NULL, '2030-01-01', 'Present')")
+        assert conn.execute(summary).fetchone() == before
+
+        # Moving a counted mark to no subject takes it off that subject's counts
+        attendance_id, student_id, subject_id = conn.execute(
+            "SELECT attendance_id, student_id, subject_id FROM attendance "
+            "WHERE status IN ('Present', 'Absent') AND subject_id IS NOT NULL LIMIT 1"
+        ).fetchone()
+        total = "SELECT total FROM attendance_summary WHERE student_id = ? AND subject_id = ?"
+        counted = conn.execute(total, (student_id, subject_id)).fetchone()[0]
+        conn.execute("UPDATE attendance SET subject_id = NULL WHERE attendance_id = ?", (attendance_id,))
+        assert conn.execute(total, (student_id, subject_id)).fetchone()[0] == counted - 1
+    finally:
+        conn.close()
@@ -0,0 +1,55 @@
+"""
+Rosters and student timetables when only some course names match, e.g.
+subjects stored as "IT" and students as "Information Technology".
+"""
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database import fetch_subject_roster
+from migrations import migrate
+from timetable_engine import fetch_student_slots
+
+
+@pytest.fixture
+def conn(tmp_path):
+    shutil.copy(os.path.join(ROOT, "edutrack.db"), tmp_path / "edutrack.db")
+    conn = sqlite3.connect(tmp_path / "edutrack.db", isolation_level=None)
+    migrate(conn)
+    yield conn
+    conn.close()
+
+
+def add_student(conn, course, semester):
+    return conn.execute(
+        "INSERT INTO students (name, roll_number, email, phone, course, semester) VALUES (?, ?, ?, ?, ?, ?)",
+        ("Matched Student", "M1", "matched@example.com", None, course, semester),
+    ).lastrowid
+
+
+def test_one_matching_student_keeps_the_rest_of_the_class(conn):
+    subject_id, course, semester = conn.execute("SELECT subject_id, course, semester FROM subjects LIMIT 1").fetchone()
+    before = {row[0] for row in fetch_subject_roster(subject_id, conn=conn)}
+    assert before
+
+    student_id = add_student(conn, course, semester)
+    after = {row[0] for row in fetch_subject_roster(subject_id, conn=conn)}
+    assert after == before | {student_id}
+
+
+def test_one_matching_student_keeps_the_others_timetable(conn):
+    subject_id, subject_name, course, semester = conn.execute("""
+        SELECT sub.subject_id, sub.subject_name, sub.course, sub.semester
+        FROM subjects sub JOIN timetable t ON t.subject_id = sub.subject_id
+        LIMIT 1
+    """).fetchone()
+    other = fetch_subject_roster(subject_id, conn=conn)[0][0]
+
+    add_student(conn, course, semester)
+    assert subject_name in {slot[4] for slot in fetch_student_slots(other, conn=conn)}
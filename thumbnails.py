@@ -0,0 +1,109 @@
+"""
+Thumbnail pipeline for student and teacher photos.
+
+Uploaded photos are multi-megabyte JPEGs, but screens only ever show them
+at a few fixed sizes. make_thumbnails() renders every size once, when the
+photo is uploaded, into THUMBNAIL_DIR under a key derived from the file's
+contents, so re-uploading the same picture reuses its thumbnails and a
+changed file gets new ones. get_thumbnail() serves decoded thumbnails from
+an in-memory LRU, falling back to the disk cache and, for photos uploaded
+before thumbnails existed, generating them once from the original.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageOps
+
+THUMBNAIL_DIR = "thumbnails"
+
+# Sizes screens ask for, in pixels
+THUMBNAIL_SIZES = {
+    "dashboard": (150, 150),
+    "preview": (100, 100),
+}
+
+# Decoded thumbnails kept in memory; the least recently used one is dropped first
+MAX_CACHED_THUMBNAILS = 64
+
+_images = OrderedDict()  # (content key, size name) -> PIL image
+_keys = {}  # (path, mtime, size in bytes) -> content key, so the original is hashed once
+_lock = threading.Lock()
+
+
+def content_key(path):
+    """Return the SHA-256 of a file's contents, reusing the last result while the file is unchanged."""
+    stat = os.stat(path)
+    file_id = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        key = _keys.get(file_id)
+    if key is not None:
+        return key
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as photo:
+        for chunk in iter(lambda: photo.read(1 << 20), b""):
+            digest.update(chunk)
+    key = digest.hexdigest()
+    with _lock:
+        _keys[file_id] = key
+    return key
+
+
+def thumbnail_path(key, size_name):
+    width, height = THUMBNAIL_SIZES[size_name]
+    return os.path.join(THUMBNAIL_DIR, f"{key}_{width}x{height}.jpg")
+
+
+def make_thumbnails(path):
+    """Write every thumbnail size of a photo to the disk cache (if missing) and return its content key."""
+    key = content_key(path)
+    missing = [name for name in THUMBNAIL_SIZES if not os.path.exists(thumbnail_path(key, name))]
+    if not missing:
+        return key
+
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    with Image.open(path) as original:
+        # Let the JPEG decoder scale down while decoding instead of decoding full size
+        largest = max(THUMBNAIL_SIZES[name] for name in missing)
+        original.draft("RGB", largest)
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    for name in missing:
+        thumbnail = ImageOps.fit(image, THUMBNAIL_SIZES[name], Image.LANCZOS)
+        target = thumbnail_path(key, name)
+        # Write then rename, so a reader never sees a half-written file
+        partial = f"{target}.{threading.get_ident()}.tmp"
+        thumbnail.save(partial, "JPEG", quality=90)
+        os.replace(partial, target)
+    return key
+
+
+def get_thumbnail(path, size_name="dashboard"):
+    """Return the decoded thumbnail of a photo as a PIL image."""
+    key = content_key(path)
+    with _lock:
+        image = _images.get((key, size_name))
+        if image is not None:
+            _images.move_to_end((key, size_name))
+            return image
+
+    target = thumbnail_path(key, size_name)
+    if not os.path.exists(target):
+        make_thumbnails(path)
+    with Image.open(target) as thumbnail:
+        image = thumbnail.copy()  # Decode now and release the file
+
+    with _lock:
+        _images[(key, size_name)] = image
+        while len(_images) > MAX_CACHED_THUMBNAILS:
+            _images.popitem(last=False)
+    return image
+
+
+def clear():
+    """Drop every decoded thumbnail from memory (the disk cache is kept)."""
+    with _lock:
+        _images.clear()
+        _keys.clear()
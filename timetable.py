@@ -1,54 +1,105 @@
 import customtkinter as ctk
 
+from background import BackgroundLoader
+from timetable_engine import build_grid, fetch_student_slots, format_period
+
+# Header and day cells have a different color
+HEADER_STYLE = {"fg_color": "#9aa0a1", "text_color": "white", "font": ("Arial", 16, "bold")}
+CELL_STYLE = {"fg_color": "#d9dbdb", "text_color": "black", "font": ("Arial", 14)}
+
+
+class TimetableGrid(ctk.CTkFrame):
+    """
+    Day-by-period grid of labels for a timetable_engine.Grid.
+
+    Labels are created once per grid position and kept: show() only
+    reconfigures the cells whose text changed and hides the positions the
+    new grid no longer uses, so refreshing an open timetable touches just
+    the slots that moved.
+    """
+
+    def __init__(self, parent, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(parent, **kwargs)
+        self.cells = {}  # (row, column) -> label
+        self.texts = {}  # (row, column) -> text shown
+        self.shown = set()
+        self.empty_label = ctk.CTkLabel(self, text="No classes scheduled.", font=("Arial", 16))
+
+    def show(self, grid):
+        """Display grid; returns the number of cells that changed."""
+        wanted = {(0, 0): "Day \\ Time"} if grid.periods else {}
+        for col, (start, end) in enumerate(grid.periods, start=1):
+            wanted[(0, col)] = format_period(start, end)
+        for row, day in enumerate(grid.days if grid.periods else [], start=1):
+            wanted[(row, 0)] = day.upper()
+            for col, (start, end) in enumerate(grid.periods, start=1):
+                wanted[(row, col)] = grid.cells.get((day, start, end), "")
+
+        changed = 0
+        for position, text in wanted.items():
+            changed += self._set_cell(position, text)
+        for position in self.shown - set(wanted):
+            self.cells[position].grid_remove()
+            changed += 1
+        self.shown = set(wanted)
+
+        # Configure grid weights for responsiveness; unused rows and columns collapse
+        rows, columns = (len(grid.days) + 1, len(grid.periods) + 1) if grid.periods else (1, 1)
+        for row in range(max(rows, self.grid_size()[1])):
+            self.grid_rowconfigure(row, weight=1 if row < rows else 0)
+        for col in range(max(columns, self.grid_size()[0])):
+            self.grid_columnconfigure(col, weight=1 if col < columns else 0)
+
+        if grid.periods:
+            self.empty_label.grid_remove()
+        else:
+            self.empty_label.grid(row=0, column=0, pady=20)
+        return changed
+
+    def _set_cell(self, position, text):
+        label = self.cells.get(position)
+        if label is None:
+            style = HEADER_STYLE if 0 in position else CELL_STYLE
+            label = self.cells[position] = ctk.CTkLabel(self, text=text, corner_radius=5, **style)
+            label.grid(row=position[0], column=position[1], padx=5, pady=5, sticky="nsew")
+            self.texts[position] = text
+            return 1
+        changed = 0
+        if self.texts[position] != text:
+            label.configure(text=text)
+            self.texts[position] = text
+            changed = 1
+        if position not in self.shown:
+            label.grid()
+            changed = 1
+        return changed
+
 
 class StudentTimetable(ctk.CTkFrame):
-    def __init__(self, parent):
+    def __init__(self, parent, student_id):
         super().__init__(parent)
         self.pack(fill="both", expand=True)  # Ensure the frame fills the parent area
-        self.create_timetable()
-
-    def create_timetable(self):
-        # Timetable Data
-        timetable = [
-            ["Day \\ Time", "8:30 - 9:30", "9:30 - 10:30", "10:30 - 11:30", "11:30 - 12:30", "1:30 - 2:30", "2:30 - 3:30", "3:30 - 4:30"],
-            ["MONDAY", "Remedial Lecture", "Remedial Lecture", "EM-IV MK(1001)", "AT KS(1001)", "OS AK(1001)", "S21 UL AK (1003)\nS22 PL NRJ (1003)\nS23 PL ABK (1004)", "S21 UL AK (1003)\nS22 PL NRJ (1003)\nS23 PL ABK (1004)"],
-            ["TUESDAY", "Remedial Lecture", "Mini Project Meet", "S21 MPL MI (906)\nS22 NL SKP (1003)\nS23 MPL ABM (906)", "S21 MPL MI (906)\nS22 NL SKP (1003)\nS23 MPL ABM (906)", "COA RM(1104)", "EM-IV MK(1001)", "CNND SKP(1001)"],
-            ["WEDNESDAY", "Remedial Lecture", "Mini Project Meet", "CNND SKP(1104)", "AT KS(1104)", "COA RM(1104)", "PL S21 SP (1003)\nUL S22 AK (1003)\nNL S23 SKP (1004)", "PL S21 SP (1003)\nUL S22 AK (1003)\nNL S23 SKP (1004)"],
-            ["THURSDAY", "Remedial Lecture", "EM-IV Tutorial", "S21 NL SKP (1003)\nS22 PL NRJ (1004)\nS23 PL ABK (1004)", "S21 NL SKP (1003)\nS22 PL NRJ (1004)\nS23 PL ABK (1004)", "CNND SKP(1104)", "EM-IV MK(1104)", "OS AK(1104)"],
-            ["FRIDAY", "EM-IV Tutorial", "EM-IV Tutorial", "AT KS(1001)", "OS AK(1001)", "COA RM(1104)", "S21 PL SP (1004)\nS22 MPL RM(906)\nS23 UL AK (1003)", "S21 PL SP (1004)\nS22 MPL RM(906)\nS23 UL AK (1003)"],
-        ]
-
-        # Create Timetable Header
-        for row_idx, row in enumerate(timetable):
-            for col_idx, cell in enumerate(row):
-                # Create cell
-                fg_color = "#9aa0a1" if row_idx == 0 or col_idx == 0 else "#d9dbdb"  # Header and Day cells have a different color
-                text_color = "white" if row_idx == 0 or col_idx == 0 else "black"
-                font = ("Arial", 16, "bold") if row_idx == 0 or col_idx == 0 else ("Arial", 14)
-
-                cell_label = ctk.CTkLabel(
-                    self,
-                    text=cell,
-                    font=font,
-                    fg_color=fg_color,
-                    text_color=text_color,
-                    corner_radius=5,
-                )
-                cell_label.grid(row=row_idx, column=col_idx, padx=5, pady=5, sticky="nsew")
-
-        # Configure grid weights for responsiveness
-        total_columns = len(timetable[0])
-        total_rows = len(timetable)
-        for col_idx in range(total_columns):
-            self.grid_columnconfigure(col_idx, weight=1)
-        for row_idx in range(total_rows):
-            self.grid_rowconfigure(row_idx, weight=1)
+        self.student_id = student_id
+        self.loader = BackgroundLoader(self)
+        self.grid_view = TimetableGrid(self)
+        self.grid_view.pack(fill="both", expand=True)
+        self.load_timetable()
+
+    def load_timetable(self):
+        # One query for the student's week, off the Tk thread; cells that did not change are left alone
+        self.loader.cancel_all()
+        self.loader.submit(
+            lambda: build_grid(fetch_student_slots(self.student_id)),
+            self.grid_view.show,
+            lambda error: print(f"Failed to load timetable: {error}"),
+        )
 
 
 if __name__ == "__main__":
     # Test the timetable as a standalone application
     app = ctk.CTk()
-    app.title("Teacher Timetable")
+    app.title("Student Timetable")
     app.geometry("1920x1080")
-    timetable = StudentTimetable(app)
-    app.mainloop()
\ No newline at end of file
+    timetable = StudentTimetable(app, student_id=1)
+    app.mainloop()
@@ -0,0 +1,179 @@
+"""
+Timetable slots stored in the timetable table (see migration 13).
+
+A slot is a subject, or just a label such as "Remedial Lecture", on one
+day between a start and an end time, optionally in a room. Lookups by
+(day_of_week, start_time) and by subject_id are indexed. A student's grid
+holds the subjects they are enrolled in (or, for subjects nobody is
+enrolled in and for students enrolled in nothing, those of their
+semester), a teacher's grid the subjects they teach, and both hold every
+labelled slot without a subject. Each grid
+is read with one query through the query cache, so re-opening the
+timetable costs a table_versions check until a slot, subject, teacher or
+enrollment changes.
+"""
+from collections import namedtuple
+
+import query_cache
+from database import connect_db
+
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday")
+
+# Always shown, even without classes; Saturday only when something is on
+WEEKDAYS = DAYS[:5]
+
+# Tables a grid is read from (students for their enrollments)
+TIMETABLE_TABLES = ("timetable", "subjects", "teachers", "students")
+
+# days: row order, periods: [(start, end)] column order, cells: {(day, start, end): text}
+Grid = namedtuple("Grid", "days periods cells")
+
+SLOT_QUERY = """
+    SELECT t.timetable_id, t.day_of_week, t.start_time, t.end_time, sub.subject_name, te.name, t.room, t.label
+    FROM timetable t
+    LEFT JOIN subjects sub ON sub.subject_id = t.subject_id
+    LEFT JOIN teachers te ON te.teacher_id = sub.teacher_id
+    WHERE {where}
+    ORDER BY t.start_time, t.timetable_id
+"""
+
+_TITLES = {"dr", "mr", "mrs", "ms", "prof"}
+
+
+def _fetch_slots(where, params, conn):
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        return query_cache.cached_query(conn, SLOT_QUERY.format(where=where), params, tables=TIMETABLE_TABLES)
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def fetch_student_slots(student_id, conn=None):
+    """Slots of the subjects a student is enrolled in, plus the labelled ones."""
+    # Same rule as database.ROSTER_CTE: a subject nobody is enrolled in, or
+    # any subject for a student enrolled in nothing, goes by semester
+    return _fetch_slots("""
+        t.subject_id IS NULL OR t.subject_id IN (
+            SELECT subject_id FROM enrollments WHERE student_id = ?
+            UNION ALL
+            SELECT sub.subject_id
+            FROM subjects sub
+            JOIN students s ON s.semester = sub.semester
+            WHERE s.student_id = ?
+                AND (
+                    NOT EXISTS (SELECT 1 FROM enrollments e WHERE e.subject_id = sub.subject_id)
+                    OR NOT EXISTS (SELECT 1 FROM enrollments e WHERE e.student_id = s.student_id)
+                )
+        )""", (student_id, student_id), conn,
+    )
+
+
+def fetch_teacher_slots(teacher_id, conn=None):
+    """Slots of the subjects a teacher teaches, plus the labelled ones."""
+    return _fetch_slots(
+        "t.subject_id IS NULL OR t.subject_id IN (SELECT subject_id FROM subjects WHERE teacher_id = ?)",
+        (teacher_id,), conn,
+    )
+
+
+def slots_at(day, start_time, conn=None):
+    """[(timetable_id, subject_id, teacher_id, room, label)] starting at day/start_time."""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        return conn.execute("""
+            SELECT t.timetable_id, t.subject_id, sub.teacher_id, t.room, t.label
+            FROM timetable t
+            LEFT JOIN subjects sub ON sub.subject_id = t.subject_id
+            WHERE t.day_of_week = ? AND t.start_time = ?
+        """, (day, start_time)).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def add_slot(subject_id, day, start_time, end_time, room=None, label=None, conn=None):
+    """
+    Add a slot and return its timetable_id. Raises ValueError when the room
+    or the subject's teacher is already booked at that day and time.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        teacher = None
+        if subject_id is not None:
+            row = conn.execute("SELECT teacher_id FROM subjects WHERE subject_id = ?", (subject_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"Subject {subject_id} does not exist")
+            teacher = row[0]
+        for _, _, other_teacher, other_room, _ in slots_at(day, start_time, conn):
+            if room is not None and other_room == room:
+                raise ValueError(f"Room {room} is already booked on {day} at {start_time}")
+            if teacher is not None and other_teacher == teacher:
+                raise ValueError(f"The subject's teacher already has a class on {day} at {start_time}")
+        with conn:
+            return conn.execute("""
+                INSERT INTO timetable (subject_id, day_of_week, start_time, end_time, room, label)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (subject_id, day, start_time, end_time, room, label)).lastrowid
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def remove_slot(timetable_id, conn=None):
+    """Delete a slot; return True if it existed."""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
+    try:
+        with conn:
+            return conn.execute("DELETE FROM timetable WHERE timetable_id = ?", (timetable_id,)).rowcount > 0
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def teacher_initials(name):
+    """Initials without titles, e.g. "SKP" for "Dr. Sanjay Kumar Pandey"."""
+    words = [word for word in (name or "").replace(".", " ").split() if word.lower() not in _TITLES]
+    return "".join(word[0].upper() for word in words)
+
+
+def slot_text(subject_name, teacher_name, room, label):
+    """Cell text for one slot, e.g. "COA RM (1104)"."""
+    if label:
+        text = label
+    else:
+        text = " ".join(part for part in (subject_name, teacher_initials(teacher_name)) if part)
+    return f"{text} ({room})" if room else text
+
+
+def build_grid(slots):
+    """Arrange slot rows into a Grid; slots sharing a cell are listed one per line."""
+    periods = sorted({(start, end) for _, _, start, end, *_ in slots})
+    cells = {}
+    for _, day, start, end, subject_name, teacher_name, room, label in slots:
+        text = slot_text(subject_name, teacher_name, room, label)
+        key = (day, start, end)
+        cells[key] = f"{cells[key]}\n{text}" if key in cells else text
+    days = [day for day in DAYS if day in WEEKDAYS or any(key[0] == day for key in cells)]
+    return Grid(days, periods, cells)
+
+
+def _clock(time):
+    # "08:30" -> "8:30", "13:30" -> "1:30"
+    hour, _, minute = str(time).partition(":")
+    if hour.isdigit():
+        hour = str(int(hour) - 12 if int(hour) > 12 else int(hour))
+    return f"{hour}:{minute}" if minute else hour
+
+
+def format_period(start, end):
+    """Column heading for a period, written as on the printed timetable: "1:30 - 2:30"."""
+    return f"{_clock(start)} - {_clock(end)}"
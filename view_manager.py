@@ -0,0 +1,134 @@
+from collections import OrderedDict
+
+import customtkinter as ctk
+
+from background import BackgroundLoader
+from database import fetch_table_versions
+
+# Built pages kept alive at once; the least recently shown one is destroyed first
+MAX_VIEWS = 5
+
+
+class _View:
+    def __init__(self, host, build, tables, refresh):
+        self.host = host
+        self.build = build
+        self.tables = tuple(tables)
+        self.refresh = refresh
+        self.page = None
+        self.versions = None  # None until the first version check returns
+        self.stale = False
+        self.check = None  # In-flight version check
+
+
+class ViewManager:
+    """
+    Keeps built pages alive inside a container instead of destroying and
+    rebuilding them on every sidebar click.
+
+    Each page lives in its own host frame that is packed when shown and
+    pack_forget()-ed when hidden. A page lists the tables it reads; when it is
+    shown again and any of those tables has changed (see table_versions), its
+    data is refreshed, by calling refresh(page) if given or by rebuilding the
+    page inside the same host frame otherwise. refresh should reload the data
+    and keep what the user selected or typed.
+
+    The table versions are read on a background loader, so showing a page
+    never waits on the database; a changed page refreshes once they arrive.
+    """
+
+    def __init__(self, container, max_views=MAX_VIEWS):
+        self.container = container
+        self.max_views = max(1, max_views)
+        self.current = None
+        self._views = OrderedDict()
+        self.loader = BackgroundLoader(container)
+
+    def show(self, key, build, tables=(), refresh=None):
+        """Show the page registered under key, building it with build(host) on first use."""
+        if self.current is not None and self.current != key and self.current in self._views:
+            self._views[self.current].host.pack_forget()
+
+        self.current = key
+        view = self._views.get(key)
+        if view is None:
+            host = ctk.CTkFrame(self.container, fg_color="transparent")
+            view = self._views[key] = _View(host, build, tables, refresh)
+            host.pack(fill="both", expand=True)
+            # Read before the page loads its data, so a write in between only causes an extra refresh
+            self._check(key, view)
+            view.page = build(host)
+            self._evict()
+        else:
+            self._views.move_to_end(key)
+            view.host.pack(fill="both", expand=True)
+            if view.tables:
+                self._check(key, view)
+            elif view.stale:
+                view.stale = False
+                self._refresh(view)
+        return view.page
+
+    def invalidate(self, key=None):
+        """Mark a page (or every page) as needing a refresh the next time it is shown."""
+        views = self._views.values() if key is None else [self._views[key]] if key in self._views else []
+        for view in views:
+            view.stale = True
+
+    def discard(self, key):
+        """Destroy a cached page."""
+        view = self._views.pop(key, None)
+        if view is not None:
+            if view.check is not None:
+                view.check.cancel()
+            view.host.destroy()
+            if self.current == key:
+                self.current = None
+
+    def clear(self):
+        """Destroy every cached page."""
+        for key in list(self._views):
+            self.discard(key)
+
+    def _check(self, key, view):
+        if not view.tables:
+            return
+        if view.check is not None:
+            view.check.cancel()
+        tables = view.tables
+        view.check = self.loader.submit(
+            lambda: fetch_table_versions(tables),
+            lambda versions: self._checked(key, view, versions),
+            lambda error: self._check_failed(view, error),
+        )
+
+    def _checked(self, key, view, versions):
+        view.check = None
+        if self._views.get(key) is not view:
+            return  # Discarded while the versions were read
+        if view.versions is None:
+            # First check of a page that was just built from current data
+            view.versions = versions
+            if not view.stale:
+                return
+        if view.stale or versions != view.versions:
+            view.versions = versions
+            view.stale = False
+            self._refresh(view)
+
+    def _check_failed(self, view, error):
+        view.check = None
+        print(f"Table version check failed: {error}")
+
+    def _refresh(self, view):
+        if view.refresh is not None:
+            view.refresh(view.page)
+            return
+        for widget in view.host.winfo_children():
+            widget.destroy()
+        view.page = view.build(view.host)
+
+    def _evict(self):
+        # The current page is always the most recently used, so it is never evicted
+        while len(self._views) > self.max_views:
+            self.discard(next(iter(self._views)))
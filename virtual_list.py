@@ -0,0 +1,173 @@
+import math
+
+import customtkinter as ctk
+
+# Extra rows built beyond the visible ones so scrolling never shows a gap
+ROW_BUFFER = 4
+
+# Lists alive now; the wheel is bound once per window and dispatched to them
+_lists = set()
+
+
+def _dispatch_wheel(event):
+    for vlist in list(_lists):
+        vlist._on_wheel(event)
+
+
+def _bind_wheel(widget):
+    root = widget._root()
+    if getattr(root, "_virtual_list_wheel", False):
+        return
+    root._virtual_list_wheel = True
+    root.bind_all("<MouseWheel>", _dispatch_wheel, add="+")
+    root.bind_all("<Button-4>", _dispatch_wheel, add="+")
+    root.bind_all("<Button-5>", _dispatch_wheel, add="+")
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list that only builds widgets for the rows on screen.
+
+    make_row(parent) builds one empty row inside a slot frame of row_height
+    pixels and returns it; bind_row(row, item, index) fills an existing row
+    with an item. Rows are kept in a small pool (the visible rows plus
+    ROW_BUFFER) and item n is always drawn by pool slot n % pool size, so
+    scrolling by one row rebinds one row instead of rebuilding the list.
+    Per-item state such as checkbox or entry values must live in Tk variables
+    held by the caller, not in the row widgets, since a row shows different
+    items over time.
+
+    on_end(), if given, is called whenever the last ROW_BUFFER rows come
+    into view, so callers can load the next page and append_items() it.
+    """
+
+    def __init__(self, parent, make_row, bind_row, row_height=40, on_end=None, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(parent, **kwargs)
+        # Keep the size the list was given; its placed rows request no space
+        self.pack_propagate(False)
+        self.make_row = make_row
+        self.bind_row = bind_row
+        self.row_height = row_height
+        self.on_end = on_end
+        self.items = []
+        self.offset = 0
+        self._slots = []
+        self._rows = []
+        self._bound = []
+
+        self.scrollbar = ctk.CTkScrollbar(self, orientation="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.bind("<Configure>", lambda event: self._layout())
+
+        # Same approach as CTkScrollableFrame: a global wheel binding that
+        # only reacts when the pointer is over this list. It is shared by all
+        # lists, since bind_all cannot remove one handler on destroy
+        _lists.add(self)
+        _bind_wheel(self)
+
+    def destroy(self):
+        _lists.discard(self)
+        super().destroy()
+
+    def set_items(self, items):
+        """Replace the list contents and scroll back to the top."""
+        self.items = list(items)
+        self.offset = 0
+        self._bound = [None] * len(self._rows)
+        self._layout()
+
+    def append_items(self, items):
+        """Add items to the end of the list, keeping the scroll position."""
+        self.items.extend(items)
+        self._layout()
+
+    def insert_items(self, index, items):
+        """Insert items before position index; rows already on screen stay where they are."""
+        items = list(items)
+        self.items[index:index] = items
+        if index * self.row_height < self.offset:
+            self.offset += len(items) * self.row_height
+        self.refresh()
+
+    def remove_items(self, indexes):
+        """Remove the items at the given positions; rows already on screen stay where they are."""
+        indexes = set(indexes)
+        above = sum(1 for index in indexes if index * self.row_height < self.offset)
+        self.items = [item for index, item in enumerate(self.items) if index not in indexes]
+        self.offset -= above * self.row_height
+        self.refresh()
+
+    def refresh(self):
+        """Rebind the visible rows, e.g. after the items changed in place."""
+        self._bound = [None] * len(self._rows)
+        self._layout()
+
+    def scroll_to(self, index):
+        """Scroll so that item index is the first visible row."""
+        self.offset = index * self.row_height
+        self._layout()
+
+    def _max_offset(self):
+        return max(0, len(self.items) * self.row_height - self.body.winfo_height())
+
+    def _layout(self):
+        height = max(self.body.winfo_height(), 1)
+        self.offset = min(max(self.offset, 0), self._max_offset())
+
+        # Grow the pool to cover the visible area; rows are never destroyed
+        needed = min(len(self.items), math.ceil(height / self.row_height) + ROW_BUFFER)
+        while len(self._rows) < needed:
+            # CTk widgets take their height at construction, not from place()
+            slot_frame = ctk.CTkFrame(self.body, height=self.row_height, fg_color="transparent")
+            slot_frame.pack_propagate(False)
+            self._slots.append(slot_frame)
+            self._rows.append(self.make_row(slot_frame))
+            self._bound.append(None)
+
+        pool = len(self._rows)
+        first = int(self.offset // self.row_height)
+        visible = set()
+        for index in range(first, min(first + pool, len(self.items))):
+            slot = index % pool
+            visible.add(slot)
+            if self._bound[slot] != index:
+                self.bind_row(self._rows[slot], self.items[index], index)
+                self._bound[slot] = index
+            self._slots[slot].place(x=0, y=index * self.row_height - self.offset, relwidth=1)
+        for slot, slot_frame in enumerate(self._slots):
+            if slot not in visible:
+                slot_frame.place_forget()
+
+        total = len(self.items) * self.row_height
+        if total <= height:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + height) / total)
+
+        last_visible = int((self.offset + height) // self.row_height)
+        if self.on_end is not None and last_visible >= len(self.items) - ROW_BUFFER:
+            self.on_end()
+
+    def _on_scrollbar(self, action, value, units=None):
+        if action == "moveto":
+            self.offset = float(value) * len(self.items) * self.row_height
+        elif action == "scroll":
+            step = self.row_height if units == "units" else self.body.winfo_height()
+            self.offset += int(value) * step
+        self._layout()
+
+    def _on_wheel(self, event):
+        widget = str(event.widget)
+        if widget != str(self) and not widget.startswith(str(self) + "."):
+            return
+        if event.num == 4:
+            steps = -1
+        elif event.num == 5:
+            steps = 1
+        else:
+            steps = -1 if event.delta > 0 else 1
+        self.offset += steps * self.row_height
+        self._layout()